@@ -1,8 +1,16 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
+import flatlib
 from pydantic import BaseModel
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from vedicastro import VedicAstro, horary_chart, utils
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime
+from vedicastro import VedicAstro, horary_chart, utils, response_encoding, transit_stream, request_aggregator, ruling_planets
+from vedicastro.ephemeris import resolve_ephemeris_backend
 
 app = FastAPI()
 
@@ -19,6 +27,8 @@ class ChartInput(BaseModel):
     ayanamsa: str = "Lahiri"
     house_system: str = "Equal"
     return_style: Optional[str] = None
+    ## Ephemeris backend ("swiss", "moshier", "cache") or precision tier ("high", "standard", "fast")
+    ephemeris_backend: str = "swiss"
 
 class HoraryChartInput(BaseModel):
     horary_number: int
@@ -34,6 +44,22 @@ class HoraryChartInput(BaseModel):
     ayanamsa: str = "Krishnamurti"
     house_system: str = "Placidus"
     return_style: Optional[str] = None
+    ephemeris_backend: str = "swiss"
+
+class RulingPlanetsInput(BaseModel):
+    latitude: float
+    longitude: float
+    utc: str = "UTC"
+    ayanamsa: str = "Krishnamurti"
+    ## Moment of judgment in local time; now when the date (all of year, month and day) is left out
+    year: Optional[int] = None
+    month: Optional[int] = None
+    day: Optional[int] = None
+    hour: int = 0
+    minute: int = 0
+    second: int = 0
+    ## "sunrise" (KP) or "midnight": when the day lord changes
+    day_start: str = "sunrise"
 
 # Add CORS middleware
 app.add_middleware(
@@ -44,34 +70,94 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+## One background transit computation per (location, ayanamsa, house system), shared by all its subscribers
+TRANSIT_STREAMS = transit_stream.TransitStreamHub()
+
+## Ephemeris cache (`.npy` path) serving the requests with the "cache" backend
+EPHEMERIS_CACHE_ENV = "VEDICASTRO_EPHEMERIS_CACHE"
+
+@lru_cache(maxsize=None)
+def get_ephemeris_cache():
+    """The `EphemerisCache` named by `VEDICASTRO_EPHEMERIS_CACHE`, loaded on first use; None when the variable is not set"""
+    path = os.environ.get(EPHEMERIS_CACHE_ENV)
+    if not path:
+        return None
+    from vedicastro.ephemeris_cache import EphemerisCache
+    return EphemerisCache(path)
+
+def ephemeris_options(ephemeris_backend: str, ayanamsa: str):
+    """
+    The `ephemeris_backend` / `ephemeris_cache` arguments of `VedicHoroscopeData` for a request.
+    Raises a 400 error for an unknown backend, or the "cache" backend without a matching cache.
+    """
+    try:
+        backend = resolve_ephemeris_backend(ephemeris_backend)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if backend != "cache":
+        return {"ephemeris_backend": backend}
+    ephemeris_cache = get_ephemeris_cache()
+    if ephemeris_cache is None or ephemeris_cache.ayanamsa != ayanamsa:
+        raise HTTPException(status_code=400, detail=f"No ephemeris cache for the '{ayanamsa}' ayanamsa on this server "
+                                                    f"(set {EPHEMERIS_CACHE_ENV})")
+    return {"ephemeris_backend": backend, "ephemeris_cache": ephemeris_cache}
+
+def encoded_response(request: Request, payload: dict):
+    """
+    Encodes the payload in the format negotiated from the `Accept` header: JSON (default, also for unsupported
+    types), MessagePack, or an Arrow IPC stream of the tabular section named by the `section` query parameter.
+    Only an explicit MessagePack / Arrow request that cannot be served gets a 406.
+    """
+    media_type = response_encoding.negotiate_media_type(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Supported media types: {response_encoding.available_media_types()}")
+    try:
+        content = response_encoding.encode_payload(payload, media_type, request.query_params.get("section"))
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    return Response(content=content, media_type=media_type)
+
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to VedicAstro FastAPI Service!",
             "info": "Visit http://127.0.0.1:8088/docs to test the API functions"}
 
 
-@app.post("/get_all_horoscope_data")
-async def get_chart_data(input: ChartInput):
+def compute_horoscope_data(inputs: list):
     """
-    Generates all data for a given time and location, based on the selected ayanamsa & house system
+    Computes the `/get_all_horoscope_data` payloads of a batch of `ChartInput` dicts. Inputs that differ
+    only in `return_style` share one chart. Returns one payload (or the exception it raised) per input.
     """
-    horoscope = VedicAstro.VedicHoroscopeData(input.year, input.month, input.day, 
-                                              input.hour, input.minute, input.second,
-                                              input.latitude, input.longitude, 
-                                              input.utc,
-                                              input.ayanamsa, input.house_system)
+    charts = {}
+    payloads = []
+    for params in inputs:
+        chart_key = tuple(value for name, value in params.items() if name != "return_style")
+        try:
+            if chart_key not in charts:
+                charts[chart_key] = _compute_chart_tables(params)
+            horoscope, chart_tables, debug_rl_nl_sl = charts[chart_key]
+            consolidated_chart_data = horoscope.get_consolidated_chart_data(planets_data=chart_tables["planets_data"],
+                                                                            houses_data=chart_tables["houses_data"],
+                                                                            return_style = params["return_style"])
+            payloads.append({**chart_tables,
+                             "consolidated_chart_data": consolidated_chart_data,
+                             "debug_rl_nl_sl": debug_rl_nl_sl})  # ← 🧠 added debug output for validation
+        except Exception as e:
+            payloads.append(e)
+    return payloads
+
+def _compute_chart_tables(params: dict):
+    horoscope = VedicAstro.VedicHoroscopeData(params["year"], params["month"], params["day"],
+                                              params["hour"], params["minute"], params["second"],
+                                              params["latitude"], params["longitude"],
+                                              params["utc"],
+                                              params["ayanamsa"], params["house_system"],
+                                              **ephemeris_options(params["ephemeris_backend"], params["ayanamsa"]))
     chart = horoscope.generate_chart()
 
     # Main chart data
     planets_data = horoscope.get_planets_data_from_chart(chart)
     houses_data = horoscope.get_houses_data_from_chart(chart)
-    planet_significators = horoscope.get_planet_wise_significators(planets_data, houses_data)
-    planetary_aspects = horoscope.get_planetary_aspects(chart)
-    house_significators = horoscope.get_house_wise_significators(planets_data, houses_data)
-    vimshottari_dasa_table = horoscope.compute_vimshottari_dasa(chart)
-    consolidated_chart_data = horoscope.get_consolidated_chart_data(planets_data=planets_data, 
-                                                                    houses_data=houses_data,
-                                                                    return_style = input.return_style)
 
     # ✅ DEBUG OUTPUTS from get_rl_nl_sl_data()
     debug_rl_nl_sl = []
@@ -84,28 +170,59 @@ async def get_chart_data(input: ChartInput):
             "rl_nl_sl_result": result
         })
 
-    return {
-        "planets_data": [planet._asdict() for planet in planets_data],
-        "houses_data": [house._asdict() for house in houses_data],
-        "planet_significators": planet_significators,
-        "planetary_aspects": planetary_aspects,
-        "house_significators": house_significators,
-        "vimshottari_dasa_table": vimshottari_dasa_table,
-        "consolidated_chart_data": consolidated_chart_data,
-        "debug_rl_nl_sl": debug_rl_nl_sl  # ← 🧠 added debug output for validation
-    }
+    return horoscope, {
+        "planets_data": planets_data,
+        "houses_data": houses_data,
+        "planet_significators": horoscope.get_planet_wise_significators(planets_data, houses_data),
+        "planetary_aspects": horoscope.get_planetary_aspects(chart),
+        "house_significators": horoscope.get_house_wise_significators(planets_data, houses_data),
+        "vimshottari_dasa_table": horoscope.compute_vimshottari_dasa(chart),
+    }, debug_rl_nl_sl
+
+def _init_chart_worker():
+    ## The swisseph ephemeris path is per thread; flatlib only sets it in the importing thread
+    from flatlib.ephem import setPath
+    setPath(flatlib.PATH_RES + "swefiles")
+
+## Concurrent /get_all_horoscope_data requests: identical ones share one computation, distinct ones are batched
+CHART_BATCH_WORKERS = int(os.environ.get("VEDICASTRO_BATCH_WORKERS", 1))
+CHART_REQUESTS = request_aggregator.RequestAggregator(
+    compute_horoscope_data,
+    max_batch_size=int(os.environ.get("VEDICASTRO_BATCH_SIZE", request_aggregator.DEFAULT_MAX_BATCH_SIZE)),
+    max_delay_ms=float(os.environ.get("VEDICASTRO_BATCH_DELAY_MS", request_aggregator.DEFAULT_MAX_DELAY_MS)),
+    executor=ThreadPoolExecutor(max_workers=CHART_BATCH_WORKERS, initializer=_init_chart_worker),
+    max_concurrent_batches=CHART_BATCH_WORKERS,
+)
+
+@app.post("/get_all_horoscope_data")
+async def get_chart_data(input: ChartInput, request: Request):
+    """
+    Generates all data for a given time and location, based on the selected ayanamsa & house system
+    """
+    ephemeris_options(input.ephemeris_backend, input.ayanamsa)
+    params = input.model_dump()
+    payload = await CHART_REQUESTS.submit(tuple(params.values()), params)
+    return encoded_response(request, payload)
+
+
+@app.get("/get_all_horoscope_data/stats")
+async def chart_request_stats():
+    """Request sharing and batching counters of `/get_all_horoscope_data`"""
+    return CHART_REQUESTS.stats()
 
 
 @app.post("/get_all_horary_data")
-async def get_horary_data(input: HoraryChartInput):
+async def get_horary_data(input: HoraryChartInput, request: Request):
     """
     Generates all data for a given horary number, time and location as per KP Astrology system
     """
     matched_time, vhd_hora_houses_chart, houses_data  = horary_chart.find_exact_ascendant_time(input.year, input.month, input.day, input.utc, input.latitude, input.longitude, input.horary_number, input.ayanamsa)
     vhd_hora = VedicAstro.VedicHoroscopeData(input.year, input.month, input.day, 
                                               input.hour, input.minute, input.second,
-                                              input.utc, input.latitude, input.longitude, 
-                                              input.ayanamsa, input.house_system)
+                                              latitude = input.latitude, longitude = input.longitude,
+                                              tz = input.utc, ayanamsa = input.ayanamsa,
+                                              house_system = input.house_system,
+                                              **ephemeris_options(input.ephemeris_backend, input.ayanamsa))
     
     vhd_hora_planets_chart = vhd_hora.generate_chart()
     planets_data = vhd_hora.get_planets_data_from_chart(vhd_hora_planets_chart, vhd_hora_houses_chart)
@@ -117,19 +234,19 @@ async def get_horary_data(input: HoraryChartInput):
                                                                     houses_data=houses_data,
                                                                     return_style = input.return_style)
 
-    return {
-        "planets_data": [planet._asdict() for planet in planets_data],
-        "houses_data": [house._asdict() for house in houses_data],
+    return encoded_response(request, {
+        "planets_data": planets_data,
+        "houses_data": houses_data,
         "planet_significators": planet_significators,
         "planetary_aspects": planetary_aspects,
         "house_significators": house_significators,
         "vimshottari_dasa_table": vimshottari_dasa_table,
         "consolidated_chart_data": consolidated_chart_data
-    }
+    })
 
 
 @app.post("/get_kp_chart_by_horary")
-async def get_kp_chart(input: HoraryChartInput):
+async def get_kp_chart(input: HoraryChartInput, request: Request):
     """Return basic KP chart data for a supplied horary number."""
     result = horary_chart.generate_basic_kp_chart(
         horary_number=input.horary_number,
@@ -142,4 +259,55 @@ async def get_kp_chart(input: HoraryChartInput):
         ayanamsa=input.ayanamsa,
         house_system=input.house_system,
     )
-    return result
+    return encoded_response(request, result)
+
+
+@app.post("/get_ruling_planets")
+async def get_ruling_planets(input: RulingPlanetsInput, request: Request):
+    """
+    KP ruling planets (day lord, Ascendant and Moon sign / star / sub lords) at the start of the given local minute,
+    shared by all requests for the same minute and place
+    """
+    date = (input.year, input.month, input.day)
+    if any(field is None for field in date) and any(field is not None for field in date):
+        raise HTTPException(status_code=400, detail="Give all of year, month and day, or none of them for now")
+    try:
+        moment = None if input.year is None else datetime(*date, input.hour, input.minute, input.second)
+        result = ruling_planets.get_ruling_planets(
+            moment, input.latitude, input.longitude, input.utc, input.ayanamsa, input.day_start
+        )
+    except (ValueError, KeyError) as e:
+        ## KeyError: pytz.UnknownTimeZoneError for an unknown `utc` zone
+        raise HTTPException(status_code=400, detail=str(e))
+    return encoded_response(request, result._asdict())
+
+
+@app.get("/transit_stream")
+async def stream_transits(request: Request, latitude: float, longitude: float, ayanamsa: str = "Krishnamurti",
+                          house_system: str = "Placidus", mode: str = "diff"):
+    """
+    Server-Sent Events stream of the current transits for a location. The first event ("transits") is the full
+    table; then `mode=full` sends the table every tick and `mode=diff` only the changed fields ("changes" events).
+    """
+    try:
+        key, queue = TRANSIT_STREAMS.subscribe(latitude, longitude, ayanamsa, house_system, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=transit_stream.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield transit_stream.HEARTBEAT_EVENT
+        finally:
+            TRANSIT_STREAMS.unsubscribe(key, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/transit_stream/stats")
+async def transit_stream_stats():
+    """Subscribers and ticks of each running transit stream"""
+    return TRANSIT_STREAMS.stats()
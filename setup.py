@@ -21,7 +21,8 @@ setup(
         "Operating System :: OS Independent",
     ],
     python_requires='>=3.11',
-    install_requires=["tqdm","polars","fastapi","uvicorn","prettytable","ipykernel","pyswisseph"],
+    install_requires=["tqdm","numpy","polars","fastapi","uvicorn","prettytable","ipykernel","pyswisseph"],
+    extras_require={"load_test": ["httpx"]},
     dependency_links=["git+https://github.com/diliprk/flatlib.git@sidereal#egg=flatlib"]
 )
 
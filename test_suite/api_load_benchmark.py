@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+"""
+Load generator for VedicAstroAPI, run against uvicorn on localhost.
+
+    python test_suite/api_load_benchmark.py --start-server --concurrency 50 200 1000 --duration 30 --output report.json
+    python test_suite/api_load_benchmark.py --base-url http://127.0.0.1:8088 --compare old_report.json
+
+Each concurrency level runs that many clients, each sending one request after the other for `--duration`
+seconds, with endpoints drawn from a weighted mix of `/get_all_horoscope_data`, `/get_all_horary_data` and
+`/get_kp_chart_by_horary`. Payloads are random birth / consultation moments at a list of cities, with a share
+of repeats of a few popular payloads, all drawn from `--seed`. Throughput, latency percentiles and error rates
+are printed per endpoint and written to a JSON report (sorted keys, so two reports can be diffed directly);
+`--compare` prints the change of each number against an earlier report.
+"""
+
+ENDPOINT_MIX = {
+    "/get_all_horoscope_data": 0.6,
+    "/get_all_horary_data": 0.2,
+    "/get_kp_chart_by_horary": 0.2,
+}
+## (latitude, longitude, utc offset)
+CITIES = [
+    (12.97, 77.59, "+05:30"),
+    (19.08, 72.88, "+05:30"),
+    (28.61, 77.21, "+05:30"),
+    (13.08, 80.27, "+05:30"),
+    (27.72, 85.32, "+05:45"),
+    (51.51, -0.13, "+00:00"),
+    (40.71, -74.01, "-05:00"),
+    (37.77, -122.42, "-08:00"),
+    (1.35, 103.82, "+08:00"),
+    (-33.87, 151.21, "+10:00"),
+]
+## Share of requests that repeat one of `N_POPULAR_PAYLOADS` payloads of their endpoint (eg: the same chart reloaded)
+REPEAT_FRACTION = 0.2
+N_POPULAR_PAYLOADS = 5
+PERCENTILES = [50, 95, 99]
+WARMUP_REQUESTS = 3
+DEFAULT_PORT = 8089
+SERVER_START_TIMEOUT = 60.0
+
+
+def random_moment(rng: random.Random, first_year: int, last_year: int):
+    return {
+        "year": rng.randint(first_year, last_year),
+        "month": rng.randint(1, 12),
+        "day": rng.randint(1, 28),
+        "hour": rng.randint(0, 23),
+        "minute": rng.randint(0, 59),
+        "second": rng.randint(0, 59),
+    }
+
+
+def random_payload(endpoint: str, rng: random.Random):
+    latitude, longitude, utc = rng.choice(CITIES)
+    location = {"latitude": latitude, "longitude": longitude, "utc": utc}
+    if endpoint == "/get_all_horoscope_data":
+        return {
+            **random_moment(rng, 1940, 2015),
+            **location,
+            "ayanamsa": rng.choice(["Lahiri", "Krishnamurti"]),
+            "house_system": rng.choice(["Equal", "Placidus"]),
+            "return_style": rng.choice([None, "dataframe_records"]),
+        }
+    return {
+        **random_moment(rng, 2020, 2026),
+        **location,
+        "horary_number": rng.randint(1, 249),
+        "ayanamsa": "Krishnamurti",
+        "house_system": "Placidus",
+    }
+
+
+class PayloadMix:
+    """Draws (endpoint, payload) pairs following `ENDPOINT_MIX`, with `REPEAT_FRACTION` repeats of popular payloads"""
+
+    def __init__(self, seed: int, mix: dict = None, repeat_fraction: float = REPEAT_FRACTION):
+        self.rng = random.Random(seed)
+        self.mix = mix or ENDPOINT_MIX
+        self.repeat_fraction = repeat_fraction
+        self.popular = {endpoint: [random_payload(endpoint, self.rng) for _ in range(N_POPULAR_PAYLOADS)] for endpoint in self.mix}
+
+    def draw(self):
+        endpoint = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if self.rng.random() < self.repeat_fraction:
+            return endpoint, self.rng.choice(self.popular[endpoint])
+        return endpoint, random_payload(endpoint, self.rng)
+
+
+async def _client(client: "httpx.AsyncClient", mix: PayloadMix, deadline: float, results: list):
+    while time.perf_counter() < deadline:
+        endpoint, payload = mix.draw()
+        start = time.perf_counter()
+        try:
+            response = await client.post(endpoint, json=payload)
+            outcome = str(response.status_code)
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        results.append((endpoint, time.perf_counter() - start, outcome))
+
+
+def summarize(results: list, elapsed: float):
+    """Per endpoint (and "all") request counts, throughput, error rate and latency percentiles in ms"""
+    summary = {}
+    for endpoint in sorted({r[0] for r in results}) + ["all"]:
+        rows = [r for r in results if endpoint in ("all", r[0])]
+        latencies_ms = np.array([r[1] for r in rows]) * 1e3
+        outcomes = {}
+        for r in rows:
+            outcomes[r[2]] = outcomes.get(r[2], 0) + 1
+        n_errors = sum(count for outcome, count in outcomes.items() if outcome != "200")
+        summary[endpoint] = {
+            "requests": len(rows),
+            "errors": n_errors,
+            "error_rate": round(n_errors / len(rows), 4),
+            "throughput_rps": round(len(rows) / elapsed, 2),
+            "latency_ms": {
+                **{f"p{p}": round(float(np.percentile(latencies_ms, p)), 2) for p in PERCENTILES},
+                "mean": round(float(latencies_ms.mean()), 2),
+                "max": round(float(latencies_ms.max()), 2),
+            },
+            "outcomes": outcomes,
+        }
+    return summary
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, seed: int, timeout: float):
+    """Runs `concurrency` clients for `duration` seconds and returns the summary of their requests"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        warmup = PayloadMix(seed)
+        for _ in range(WARMUP_REQUESTS):
+            endpoint, payload = warmup.draw()
+            try:
+                await client.post(endpoint, json=payload)
+            except httpx.HTTPError:
+                pass
+
+        results = []
+        ## One payload stream per client, so a level replays the same requests whatever the scheduling
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(_client(client, PayloadMix(seed * 100_003 + i), deadline, results) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "elapsed_s": round(elapsed, 2), "endpoints": summarize(results, elapsed)}
+
+
+def print_level(level: dict):
+    print(f"\nconcurrency {level['concurrency']} ({level['elapsed_s']} s)")
+    print(f"{'Endpoint':<26}{'Requests':>9}{'req/s':>9}{'Err %':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, stats in level["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{endpoint:<26}{stats['requests']:>9}{stats['throughput_rps']:>9.1f}{stats['error_rate'] * 100:>7.2f}"
+            f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['p99']:>9.1f}"
+        )
+
+
+def compare_reports(report: dict, baseline: dict):
+    """Prints the relative change of throughput and percentiles against a baseline report, per level and endpoint"""
+    baseline_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in report["levels"]:
+        old_level = baseline_levels.get(level["concurrency"])
+        if old_level is None:
+            continue
+        print(f"\nconcurrency {level['concurrency']} vs baseline")
+        for endpoint, stats in level["endpoints"].items():
+            old = old_level["endpoints"].get(endpoint)
+            if old is None:
+                continue
+            pairs = [("req/s", stats["throughput_rps"], old["throughput_rps"])]
+            pairs += [(f"p{p}", stats["latency_ms"][f"p{p}"], old["latency_ms"][f"p{p}"]) for p in PERCENTILES]
+            changes = "  ".join(f"{name} {(new - prev) / prev * 100:+.1f}%" if prev else f"{name} n/a" for name, new, prev in pairs)
+            print(f"  {endpoint:<26}{changes}  errors {old['error_rate'] * 100:.2f}% -> {stats['error_rate'] * 100:.2f}%")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(port: int, workers: int):
+    """Starts uvicorn with VedicAstroAPI on localhost and waits until it answers"""
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "uvicorn", "VedicAstroAPI:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    server = subprocess.Popen(command, cwd=repo_dir)
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return server
+        except httpx.HTTPError:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"uvicorn did not answer on port {port} within {SERVER_START_TIMEOUT} s")
+
+
+def run_api_load_test(base_url: str, concurrency_levels: list, duration: float, seed: int = 1, timeout: float = 60.0):
+    """Runs every concurrency level in turn and returns the report dict"""
+    report = {
+        "config": {
+            "base_url": base_url,
+            "duration_s": duration,
+            "seed": seed,
+            "endpoint_mix": ENDPOINT_MIX,
+            "repeat_fraction": REPEAT_FRACTION,
+        },
+        "environment": {"git_revision": _git_revision(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "levels": [],
+    }
+    for concurrency in concurrency_levels:
+        level = asyncio.run(run_level(base_url, concurrency, duration, seed, timeout))
+        print_level(level)
+        report["levels"].append(level)
+    return report
+
+
+def main(argv: list = None):
+    if httpx is None:
+        raise SystemExit("The load generator requires the `httpx` package: pip install httpx (or vedicastro[load_test])")
+    parser = argparse.ArgumentParser(description="Load generator for VedicAstroAPI with per endpoint latency percentiles")
+    parser.add_argument("--base-url", default=None, help=f"server to test, defaults to http://127.0.0.1:{DEFAULT_PORT}")
+    parser.add_argument("--start-server", action="store_true", help="start uvicorn on --port for the run")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes with --start-server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per concurrency level")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="api_load_report.json")
+    parser.add_argument("--compare", default=None, help="earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port, args.server_workers) if args.start_server else None
+    try:
+        report = run_api_load_test(base_url, args.concurrency, args.duration, args.seed, args.timeout)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nReport written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import polars as pl
+from vedicastro.batch_cli import MANIFEST_FILE, main, run_batch
+from vedicastro.VedicAstro import VedicHoroscopeData
+
+"""
+Validates the batch pipeline of `batch_cli`: a small CSV is computed by two worker processes in chunks, and the
+planets / houses parts must match charts computed directly, with the invalid record in the errors table.
+Rerunning with the same settings resumes (nothing is recomputed, a chunk dropped from the manifest is), other
+settings, including another ephemeris cache, are refused, and the CLI reads Parquet input.
+"""
+
+RECORDS = [
+    {"year": 1990 + i, "month": 1 + i % 12, "day": 1 + 2 * i, "hour": i % 24, "minute": 7 * i % 60, "second": 0,
+     "latitude": 11.02 + i, "longitude": 76.98 - 3 * i, "tz": "Asia/Kolkata"}
+    for i in range(11)
+] + [{"year": 2000, "month": 13, "day": 1, "hour": 0, "minute": 0, "second": 0, "latitude": 0.0, "longitude": 0.0,
+      "tz": "UTC"}]
+CHUNK_SIZE = 5
+WORKERS = 2
+
+def read_table(output_dir, table):
+    return pl.read_parquet(os.path.join(output_dir, table, "*.parquet")).sort("ChartId", maintain_order=True)
+
+def check_against_direct(output_dir):
+    planets, houses = read_table(output_dir, "planets"), read_table(output_dir, "houses")
+    for chart_id in (0, 6, 10):
+        record = RECORDS[chart_id]
+        horoscope = VedicHoroscopeData(*(record[col] for col in list(record)[:8]), tz=record["tz"])
+        chart = horoscope.generate_chart()
+        for table, rows in [(planets, horoscope.get_planets_data_from_chart(chart)),
+                            (houses, horoscope.get_houses_data_from_chart(chart))]:
+            got = table.filter(table["ChartId"] == chart_id).drop("ChartId")
+            assert got.to_dicts() == [row._asdict() for row in rows], chart_id
+    errors = read_table(output_dir, "errors")
+    assert errors["ChartId"].to_list() == [len(RECORDS) - 1], errors
+    assert set(planets["ChartId"]) == set(range(len(RECORDS) - 1))
+
+def run_batch_cli_tests():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path, out_dir = os.path.join(tmp_dir, "births.csv"), os.path.join(tmp_dir, "out")
+        pl.DataFrame(RECORDS).write_csv(csv_path)
+
+        manifest = run_batch(csv_path, out_dir, WORKERS, CHUNK_SIZE)
+        assert manifest["completed_chunks"] == [0, 1, 2] and (manifest["charts"], manifest["errors"]) == (11, 1)
+        check_against_direct(out_dir)
+        print(f"{len(RECORDS)} records in {len(manifest['completed_chunks'])} chunks match direct charts "
+              f"({manifest['last_run']['charts_per_sec']} charts/sec)")
+
+        ## Resume: nothing left to do, then only the chunk dropped from the manifest is recomputed
+        assert run_batch(csv_path, out_dir, WORKERS, CHUNK_SIZE)["last_run"]["charts"] == 0
+        with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+            saved = json.load(f)
+        saved["completed_chunks"].remove(1)
+        with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+            json.dump(saved, f)
+        os.remove(os.path.join(out_dir, "planets", "part-00001.parquet"))
+        assert run_batch(csv_path, out_dir, WORKERS, CHUNK_SIZE)["last_run"]["charts"] == CHUNK_SIZE
+        check_against_direct(out_dir)
+
+        for kwargs in [{"chunk_size": 4}, {"ayanamsa": "Lahiri"}, {"ephemeris_cache_path": os.path.join(tmp_dir, "eph.npy")}]:
+            try:
+                run_batch(csv_path, out_dir, **{"workers": WORKERS, "chunk_size": CHUNK_SIZE, **kwargs})
+                raise AssertionError(f"resuming with {kwargs} should raise ValueError")
+            except ValueError:
+                pass
+        print("an interrupted run resumes with the same settings and is refused with other ones")
+
+        parquet_path, cli_dir = os.path.join(tmp_dir, "births.parquet"), os.path.join(tmp_dir, "cli_out")
+        pl.DataFrame(RECORDS).write_parquet(parquet_path)
+        main([parquet_path, cli_dir, "--workers", str(WORKERS), "--chunk-size", str(CHUNK_SIZE)])
+        check_against_direct(cli_dir)
+
+if __name__ == "__main__":
+    run_batch_cli_tests()
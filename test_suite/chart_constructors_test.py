@@ -0,0 +1,65 @@
+import datetime
+import swisseph as swe
+from vedicastro.timezones import UNIX_EPOCH_JD
+from vedicastro.VedicAstro import VedicHoroscopeData
+
+"""
+Validates `VedicHoroscopeData.from_jd` / `from_timestamp` against the default constructor: the same instant
+gives the same chart and the same attributes, fractions of a second survive into the local calendar fields
+and the chart's Julian day, and `get_transit_details` at a Julian day or timestamp is the transit of a chart
+built with those constructors.
+"""
+
+LAT, LON, TZ = 11.02, 76.98, "Asia/Kolkata"
+## 2024-02-05 12:30:15.25 IST
+LOCAL = (2024, 2, 5, 12, 30, 15.25)
+UTC_OFFSET_HOURS = 5.5
+MAX_JD_ERROR_SECONDS = 1e-3
+
+def run_chart_constructors_tests():
+    utc = swe.utc_time_zone(*LOCAL, UTC_OFFSET_HOURS)
+    jd_ut = swe.julday(*utc[:3], utc[3] + utc[4] / 60 + utc[5] / 3600)
+    from_jd = VedicHoroscopeData.from_jd(jd_ut, LAT, LON, TZ)
+    assert (from_jd.year, from_jd.month, from_jd.day, from_jd.hour, from_jd.minute) == LOCAL[:5]
+    assert abs(from_jd.second - LOCAL[5]) < MAX_JD_ERROR_SECONDS, from_jd.second
+    assert from_jd.utc == "+05:30" and from_jd.time_zone == TZ
+    chart = from_jd.generate_chart()
+    assert abs(chart.date.jd - jd_ut) * 86400 < MAX_JD_ERROR_SECONDS, chart.date.jd - jd_ut
+    print(f"from_jd keeps the second fraction: {from_jd.second:.3f} s, chart JD off by {abs(chart.date.jd - jd_ut) * 86400:.1e} s")
+
+    ## Unix timestamps and aware datetimes land on the same Julian day
+    timestamp = (jd_ut - UNIX_EPOCH_JD) * 86400
+    aware = datetime.datetime(*LOCAL[:5], 15, 250000, tzinfo=datetime.timezone(datetime.timedelta(hours=UTC_OFFSET_HOURS)))
+    for horoscope in (VedicHoroscopeData.from_timestamp(timestamp, LAT, LON, TZ),
+                      VedicHoroscopeData.from_timestamp(aware, LAT, LON, TZ)):
+        assert abs(horoscope.jd - jd_ut) * 86400 < MAX_JD_ERROR_SECONDS
+        assert abs(horoscope.second - LOCAL[5]) < MAX_JD_ERROR_SECONDS
+    try:
+        VedicHoroscopeData.from_timestamp(aware.replace(tzinfo=None), LAT, LON, TZ)
+        raise AssertionError("a naive datetime should raise ValueError")
+    except ValueError:
+        pass
+
+    ## A whole second instant: the default constructor and from_jd give the same object and chart
+    whole = VedicHoroscopeData(*LOCAL[:5], 15, LAT, LON, TZ)
+    whole_jd = VedicHoroscopeData.from_jd(jd_ut - 0.25 / 86400, LAT, LON, TZ)
+    assert vars(whole).keys() == vars(whole_jd).keys()
+    rows = [[(row.Object, round(row.LonDecDeg, 4)) for row in horoscope.get_planets_data_from_chart(horoscope.generate_chart())]
+            for horoscope in (whole, whole_jd)]
+    assert rows[0] == rows[1], rows
+    print("from_jd / from_timestamp match the default constructor")
+
+    transits = whole.get_transit_details(jd_ut=jd_ut)
+    assert transits == from_jd.get_transit_details()
+    assert transits == whole.get_transit_details(timestamp=aware)
+    assert transits[0].timestamp == "2024-02-05 12:30:15"
+    assert whole.get_transit_details()[0].timestamp == "2024-02-05 12:30:15"
+    try:
+        whole.get_transit_details(jd_ut=jd_ut, timestamp=timestamp)
+        raise AssertionError("jd_ut and timestamp together should raise ValueError")
+    except ValueError:
+        pass
+    print(f"get_transit_details at a Julian day / timestamp: {len(transits)} planets")
+
+if __name__ == "__main__":
+    run_chart_constructors_tests()
@@ -0,0 +1,129 @@
+import collections
+import os
+import tempfile
+import time
+import numpy as np
+import polars as pl
+from vedicastro.chart_search import MISSING_CODE, ChartTable
+from vedicastro.ephemeris import GRAHAS
+from vedicastro.kp_divisions import decode_codes, get_rl_nl_sl_codes
+
+"""
+Validates `ChartTable` on synthetic charts: bitmap / range queries must return the same charts as a polars filter
+over the long planets / houses tables, whether the table is built from DataFrames or from data table rows, and
+after a save / load round trip. Also checks missing values and bad predicates, and times queries over 1M charts.
+"""
+
+N_CHARTS = 3000
+N_QUERIES = 200
+SEED = 17
+PLANET_FIELDS = ["Object", "Rasi", "Nakshatra", "RasiLord", "NakshatraLord", "SubLord", "LonDecDeg", "HouseNr"]
+HOUSE_FIELDS = ["HouseNr", "Rasi", "Nakshatra", "RasiLord", "NakshatraLord", "SubLord", "LonDecDeg"]
+Planet = collections.namedtuple("Planet", PLANET_FIELDS)
+House = collections.namedtuple("House", HOUSE_FIELDS)
+
+def synthetic_frames(n, rng):
+    planet_lons = rng.uniform(0, 360, (n, len(GRAHAS)))
+    cusps = (rng.uniform(0, 360, (n, 1)) + 30 * np.arange(12)) % 360
+    planets, houses = decode_codes(get_rl_nl_sl_codes(planet_lons)), decode_codes(get_rl_nl_sl_codes(cusps))
+    planets_df = pl.DataFrame({
+        "ChartId": np.repeat(np.arange(n), len(GRAHAS)),
+        "Object": np.tile(GRAHAS, n),
+        **{field: planets[field].ravel() for field in PLANET_FIELDS[1:6]},
+        "LonDecDeg": planet_lons.ravel(),
+        "HouseNr": rng.integers(1, 13, n * len(GRAHAS)),
+    })
+    houses_df = pl.DataFrame({
+        "ChartId": np.repeat(np.arange(n), 12),
+        "HouseNr": np.tile(np.arange(1, 13), n),
+        **{field: houses[field].ravel() for field in HOUSE_FIELDS[1:6]},
+        "LonDecDeg": cusps.ravel(),
+    })
+    return planets_df, houses_df
+
+def random_predicates(planets_df, houses_df, rng):
+    """Two or three predicates on random columns, with values taken from a random chart so that some match"""
+    chart = int(rng.integers(N_CHARTS))
+    planet_rows = planets_df.filter(pl.col("ChartId") == chart)
+    house_rows = houses_df.filter(pl.col("ChartId") == chart)
+    predicates = {}
+    for _ in range(rng.integers(2, 4)):
+        if rng.random() < 0.6:
+            row = planet_rows.row(int(rng.integers(len(GRAHAS))), named=True)
+            obj, field = row["Object"], str(rng.choice(PLANET_FIELDS[1:]))
+        else:
+            row = house_rows.row(int(rng.integers(12)), named=True)
+            obj, field = f"House{row['HouseNr']}", str(rng.choice(HOUSE_FIELDS[1:]))
+        value = row[field]
+        if field == "LonDecDeg":
+            value = (value - 5.0, value + 5.0)
+        elif field != "HouseNr" and rng.random() < 0.3:
+            value = [value, "Ketu" if "Lord" in field else value]
+        predicates[f"{obj}.{field}"] = value
+    return predicates
+
+def expected_ids(planets_df, houses_df, predicates):
+    matching = set(range(N_CHARTS))
+    for key, value in predicates.items():
+        obj, field = key.split(".")
+        df = houses_df.filter(pl.col("HouseNr") == int(obj[5:])) if obj.startswith("House") else planets_df.filter(pl.col("Object") == obj)
+        if isinstance(value, tuple):
+            condition = pl.col(field).cast(pl.Float32).is_between(np.float32(value[0]), np.float32(value[1]))
+        else:
+            condition = pl.col(field).is_in(value if isinstance(value, list) else [value])
+        matching &= set(df.filter(condition)["ChartId"].to_list())
+    return sorted(matching)
+
+def data_tables(planets_df, houses_df, chart_id):
+    planets = [Planet(**{f: row[f] for f in PLANET_FIELDS}) for row in planets_df.filter(pl.col("ChartId") == chart_id).iter_rows(named=True)]
+    houses = [House(**{f: row[f] for f in HOUSE_FIELDS}) for row in houses_df.filter(pl.col("ChartId") == chart_id).iter_rows(named=True)]
+    return planets, houses
+
+def run_chart_search_tests():
+    rng = np.random.default_rng(SEED)
+    planets_df, houses_df = synthetic_frames(N_CHARTS, rng)
+    from_frames = ChartTable.from_frames(planets_df, houses_df)
+    from_charts = ChartTable.from_charts(data_tables(planets_df, houses_df, i) for i in range(N_CHARTS))
+    assert from_frames.columns.keys() == from_charts.columns.keys()
+    assert all(np.array_equal(from_frames.columns[key], from_charts.columns[key], equal_nan=True) for key in from_frames.columns)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "charts.npz")
+        from_frames.save(path)
+        loaded = ChartTable.load(path)
+    for _ in range(N_QUERIES):
+        predicates = random_predicates(planets_df, houses_df, rng)
+        expected = expected_ids(planets_df, houses_df, predicates)
+        for table in (from_frames, from_charts, loaded):
+            assert table.query(predicates).tolist() == expected, predicates
+            assert table.count(predicates) == len(expected)
+    moon = planets_df.filter(pl.col("Object") == "Moon").sort("ChartId")
+    assert from_frames.decode("Moon.Nakshatra").tolist() == moon["Nakshatra"].to_list()
+    print(f"{N_QUERIES} random queries over {N_CHARTS} charts match a polars filter (frames, rows, saved table)")
+
+    ## A chart without houses data has missing house columns, which match no predicate and decode to None
+    planets, _ = data_tables(planets_df, houses_df, 0)
+    partial = ChartTable.from_charts([(planets, None), data_tables(planets_df, houses_df, 1)], chart_ids=["a", "b"])
+    assert partial.columns["House7.SubLord"][0] == MISSING_CODE and np.isnan(partial.columns["House7.LonDecDeg"][0])
+    assert partial.decode("House7.SubLord")[0] is None
+    assert partial.query({"House1.LonDecDeg": (0, 360)}).tolist() == ["b"]
+    for predicates, error in [({"Moon.Colour": "Red"}, KeyError), ({"Moon.SubLord": "Pluto"}, ValueError)]:
+        try:
+            from_frames.query(predicates)
+            raise AssertionError(f"{predicates} should raise {error.__name__}")
+        except error:
+            pass
+
+    n = 1_000_000
+    columns = {"Moon.Nakshatra": rng.integers(0, 27, n).astype(np.uint8), "Moon.SubLord": rng.integers(0, 9, n).astype(np.uint8),
+               "House7.SubLord": rng.integers(0, 9, n).astype(np.uint8), "Sun.LonDecDeg": rng.uniform(0, 360, n).astype(np.float32)}
+    big = ChartTable(columns)
+    predicates = {"Moon.Nakshatra": "Rohini", "Moon.SubLord": "Saturn", "House7.SubLord": ["Venus", "Jupiter"], "Sun.LonDecDeg": (30, 60)}
+    big.count(predicates)
+    start = time.perf_counter()
+    for _ in range(20):
+        matches = big.count(predicates)
+    print(f"{n} charts: {matches} matches in {(time.perf_counter() - start) / 20 * 1000:.1f} ms per query once indexed")
+
+if __name__ == "__main__":
+    run_chart_search_tests()
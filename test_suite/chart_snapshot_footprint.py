@@ -0,0 +1,58 @@
+import pickle
+import timeit
+import tracemalloc
+import numpy as np
+from vedicastro.VedicAstro import VedicHoroscopeData
+from vedicastro.chart_snapshot import ChartSnapshot
+
+"""
+Measures the memory and pickle footprint of a `ChartSnapshot` against the current representation of a computed
+chart (the `flatlib.Chart` plus its planets and houses data tables), and checks that the snapshot's lazy table
+views are equal to the tables it was built from, before and after a pickle round trip.
+"""
+
+N_CHARTS = 200
+N_REPEATS = 200
+SEED = 11
+
+def random_horoscopes(n, seed = SEED):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield VedicHoroscopeData(int(rng.integers(1900, 2030)), int(rng.integers(1, 13)), int(rng.integers(1, 29)),
+                                 int(rng.integers(0, 24)), int(rng.integers(0, 60)), int(rng.integers(0, 60)),
+                                 float(rng.uniform(-60, 60)), float(rng.uniform(-180, 180)), "+00:00")
+
+def retained_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [build(horoscope) for horoscope in random_horoscopes(N_CHARTS)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")) / len(kept)
+
+def build_tables(horoscope):
+    chart = horoscope.generate_chart()
+    return chart, horoscope.get_planets_data_from_chart(chart), horoscope.get_houses_data_from_chart(chart)
+
+def run_chart_snapshot_footprint():
+    for horoscope in random_horoscopes(N_CHARTS):
+        chart, planets_data, houses_data = build_tables(horoscope)
+        snapshot = ChartSnapshot.from_chart(horoscope, chart, planets_data, houses_data)
+        restored = pickle.loads(pickle.dumps(snapshot))
+        assert restored == snapshot
+        for views in (snapshot, restored):
+            assert views.planets_data == planets_data and views.houses_data == houses_data
+
+    chart, planets_data, houses_data = build_tables(horoscope)
+    tables = (chart, planets_data, houses_data)
+    ## namedtuple classes made per call are not picklable, so the tables are pickled as dicts (as sent by the API)
+    tables_for_pickle = ([row._asdict() for row in planets_data], [row._asdict() for row in houses_data])
+    chart_bytes = retained_bytes(build_tables)
+    snapshot_bytes = retained_bytes(lambda horoscope: horoscope.get_snapshot())
+    print(f"{'':<28}{'Memory / chart':>16}{'Pickle bytes':>14}{'Pickle+load (us)':>18}")
+    for name, memory, obj in [("chart + tables (dicts)", chart_bytes, tables_for_pickle), ("ChartSnapshot", snapshot_bytes, snapshot)]:
+        seconds = timeit.timeit(lambda: pickle.loads(pickle.dumps(obj)), number=N_REPEATS) / N_REPEATS
+        print(f"{name:<28}{memory:>16.0f}{len(pickle.dumps(obj)):>14}{seconds * 1e6:>18.1f}")
+
+if __name__ == "__main__":
+    run_chart_snapshot_footprint()
@@ -0,0 +1,65 @@
+import time
+import numpy as np
+import swisseph as swe
+from vedicastro.chart_variants import VARIANT_COLS, compute_chart_variants
+from vedicastro.ephemeris import GRAHAS, SWE_AYANAMSA_MAPPING, SWE_HOUSE_SYSTEM_MAPPING, SWE_PLANETS, set_ayanamsa
+from vedicastro.house_cusps import get_house_numbers
+from vedicastro.kp_divisions import decode_codes, get_rl_nl_sl_codes
+
+"""
+Validates `compute_chart_variants` against separate sidereal swe evaluations: for every (ayanamsa, house system)
+variant, the grahas from `swe.calc_ut(..., FLG_SIDEREAL)` and the cusps / ascendant from `swe.houses_ex` must
+match within `MAX_ERROR_ARCSEC`, with the same lords, houses and retrograde flags. Also times the fan-out against
+one full set of swe calls and lord lookups per variant.
+"""
+
+MOMENTS = [(2460345.25, 11.02, 76.98), (2451545.0, 51.51, -0.13), (2433282.5, -33.87, 151.21)]
+MAX_ERROR_ARCSEC = 0.01
+ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+
+def swe_variant(jd, lat, lon, ayanamsa, house_system):
+    """Sidereal (lons of Asc + grahas + cusps, speeds of the grahas) computed from scratch for one variant"""
+    set_ayanamsa(ayanamsa)
+    flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
+    positions = [swe.calc_ut(jd, SWE_PLANETS["Rahu" if obj == "Ketu" else obj], flags)[0] for obj in GRAHAS]
+    planet_lons = np.array([(pos[0] + 180.0) % 360.0 if obj == "Ketu" else pos[0] for obj, pos in zip(GRAHAS, positions)])
+    cusps, ascmc = swe.houses_ex(jd, lat, lon, SWE_HOUSE_SYSTEM_MAPPING[house_system], swe.FLG_SIDEREAL)
+    return np.concatenate([[ascmc[0]], planet_lons, cusps[:12]]), np.array([pos[3] for pos in positions])
+
+def run_chart_variants_tests():
+    n_variants = len(SWE_AYANAMSA_MAPPING) * len(SWE_HOUSE_SYSTEM_MAPPING)
+    for jd, lat, lon in MOMENTS:
+        table = compute_chart_variants(jd, lat, lon)
+        assert table.columns == VARIANT_COLS and table.height == n_variants * (1 + len(GRAHAS) + 12)
+        worst = 0.0
+        for ayanamsa in SWE_AYANAMSA_MAPPING:
+            for house_system in SWE_HOUSE_SYSTEM_MAPPING:
+                variant = table.filter((table["Ayanamsa"] == ayanamsa) & (table["HouseSystem"] == house_system))
+                assert variant["Object"].to_list() == ["Asc"] + GRAHAS + ROMAN
+                lons, speeds = swe_variant(jd, lat, lon, ayanamsa, house_system)
+                error = np.abs((variant["LonDecDeg"].to_numpy() - lons + 180.0) % 360.0 - 180.0) * 3600
+                worst = max(worst, error.max())
+                assert error.max() < MAX_ERROR_ARCSEC, (ayanamsa, house_system, error.max())
+                lords = decode_codes(get_rl_nl_sl_codes(lons))
+                for field in ["Rasi", "Nakshatra", "RasiLord", "NakshatraLord", "SubLord", "SubSubLord"]:
+                    assert variant[field].to_list() == lords[field].tolist(), (ayanamsa, house_system, field)
+                houses = get_house_numbers(lons[None, 1 : 1 + len(GRAHAS)], lons[None, -12:])[0]
+                assert variant["HouseNr"].to_list() == [1, *houses.tolist(), *range(1, 13)]
+                assert variant["isRetroGrade"].to_list()[1 : 1 + len(GRAHAS)] == (speeds < 0).tolist()
+        print(f"JD {jd}: {n_variants} variants match swe within {worst:.5f}\"")
+
+    jd, lat, lon = MOMENTS[0]
+    start = time.perf_counter()
+    for _ in range(20):
+        compute_chart_variants(jd, lat, lon)
+    fan_out = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for ayanamsa in SWE_AYANAMSA_MAPPING:
+        for house_system in SWE_HOUSE_SYSTEM_MAPPING:
+            lons, _ = swe_variant(jd, lat, lon, ayanamsa, house_system)
+            decode_codes(get_rl_nl_sl_codes(lons))
+    separate = time.perf_counter() - start
+    print(f"{n_variants} variants: {fan_out * 1000:.1f} ms fanned out vs {separate * 1000:.1f} ms of separate swe calls and lookups")
+
+if __name__ == "__main__":
+    run_chart_variants_tests()
@@ -0,0 +1,82 @@
+import time
+import numpy as np
+from vedicastro.compatibility import (
+    GANA_POINTS, KOOTA_MAX_POINTS, KOOTAS, MAITRI_LORDS, MAITRI_POINTS, MAX_TOTAL_POINTS, NAKSHATRA_GANA, NAKSHATRA_NADI,
+    NAKSHATRA_YONI, RASI_VARNA, VASHYA_POINTS, YONI_POINTS, get_pada_index, match_profiles, pada_index_from_nakshatra, score_pairs,
+)
+from vedicastro.VedicAstro import SIGN_LORDS
+
+"""
+Checks the precomputed koota tables against a plain per pair scorer working from the Moon longitudes, the
+top-k selection of `match_profiles` against a full sort, and times one profile against a large population.
+"""
+
+N_PAIRS = 20_000
+POPULATION_SIZE = 300_000
+SEED = 5
+
+def vashya_group(lon: float):
+    ## Sagittarius and Capricorn change group at 15°; the pada holding 15° counts as second half, as in the tables
+    rasi, deg = int(lon // 30), (lon % 30) // (30 / 9) * (30 / 9)
+    if rasi == 8:
+        return 1 if deg < 13 else 0
+    if rasi == 9:
+        return 0 if deg < 13 else 2
+    return {0: 0, 1: 0, 2: 1, 3: 2, 4: 3, 5: 1, 6: 1, 7: 4, 10: 1, 11: 2}[rasi]
+
+def tara_points(start: int, end: int):
+    return 0 if ((end - start) % 27 + 1) % 9 in (3, 5, 7) else 1.5
+
+def pair_points(boy_lon: float, girl_lon: float):
+    """Ashtakoota points of one pair, one koota at a time"""
+    rb, rg = int(boy_lon // 30), int(girl_lon // 30)
+    nb, ng = int(boy_lon // (360 / 27)), int(girl_lon // (360 / 27))
+    lb, lg = MAITRI_LORDS.index(SIGN_LORDS[rb]), MAITRI_LORDS.index(SIGN_LORDS[rg])
+    return {
+        "Varna": 1 if RASI_VARNA[rb] >= RASI_VARNA[rg] else 0,
+        "Vashya": VASHYA_POINTS[vashya_group(boy_lon)][vashya_group(girl_lon)],
+        "Tara": tara_points(ng, nb) + tara_points(nb, ng),
+        "Yoni": YONI_POINTS[NAKSHATRA_YONI[nb]][NAKSHATRA_YONI[ng]],
+        "GrahaMaitri": MAITRI_POINTS[lb][lg],
+        "Gana": GANA_POINTS[NAKSHATRA_GANA[nb]][NAKSHATRA_GANA[ng]],
+        "Bhakoot": 0 if (rb - rg) % 12 + 1 in (2, 12, 5, 9, 6, 8) else 7,
+        "Nadi": 0 if NAKSHATRA_NADI[nb] == NAKSHATRA_NADI[ng] else 8,
+    }
+
+def run_compatibility_tests():
+    rng = np.random.default_rng(SEED)
+    boy_lons, girl_lons = rng.uniform(0, 360, N_PAIRS), rng.uniform(0, 360, N_PAIRS)
+    scores = score_pairs(get_pada_index(boy_lons), get_pada_index(girl_lons))
+    for i in range(N_PAIRS):
+        expected = pair_points(boy_lons[i], girl_lons[i])
+        for koota in KOOTAS:
+            assert scores[koota][i] == expected[koota], f"{koota} {boy_lons[i]:.3f} {girl_lons[i]:.3f}: {scores[koota][i]} != {expected[koota]}"
+        assert abs(scores["Total"][i] - sum(expected.values())) < 1e-4
+    assert all(scores[koota].max() <= KOOTA_MAX_POINTS[koota] for koota in KOOTAS) and scores["Total"].max() <= MAX_TOTAL_POINTS
+    print(f"{N_PAIRS} random pairs match the per pair scorer")
+
+    assert pada_index_from_nakshatra("Ashwini", 1) == 0 and pada_index_from_nakshatra(["Revati"], [4])[0] == 107
+
+    population = get_pada_index(rng.uniform(0, 360, POPULATION_SIZE))
+    profiles = get_pada_index(rng.uniform(0, 360, 20))
+    for profile_is_boy in [True, False]:
+        matches = match_profiles(profiles, population, profile_is_boy=profile_is_boy, top_k=25)
+        for i, pada in enumerate(profiles):
+            boy, girl = (pada, population) if profile_is_boy else (population, pada)
+            order = np.argsort(-score_pairs(boy, girl)["Total"], kind="stable")[:25]
+            assert matches.filter(matches["ProfileIdx"] == i)["MatchIdx"].to_list() == order.tolist()
+    print("top-k matches equal a full stable sort, for boy and girl profiles")
+
+    start = time.perf_counter()
+    n_runs = 20
+    for pada in profiles[:n_runs]:
+        match_profiles(pada, population, top_k=10)
+    elapsed = (time.perf_counter() - start) / n_runs
+    start = time.perf_counter()
+    for i in range(10_000):
+        pair_points(boy_lons[0], girl_lons[i])
+    per_pair = (time.perf_counter() - start) / 10_000
+    print(f"one profile vs {POPULATION_SIZE} profiles: {elapsed * 1e3:.1f} ms (per pair scoring: ~{per_pair * POPULATION_SIZE:.1f} s)")
+
+if __name__ == "__main__":
+    run_compatibility_tests()
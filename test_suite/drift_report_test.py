@@ -0,0 +1,38 @@
+import os
+import tempfile
+from vedicastro.drift_report import compute_drift_report, recommend_tier, summarize_tiers
+from vedicastro.ephemeris_cache import build_ephemeris_cache
+from vedicastro.VedicAstro import VedicHoroscopeData
+
+"""
+Runs the precision tier drift report over a short date range with a freshly built ephemeris cache, and checks
+that the reference tier has no drift, the other tiers stay within a few arc-seconds of it, and a tier is recommended.
+"""
+
+START_YEAR, END_YEAR = 2000, 2030
+AYANAMSA = "Krishnamurti"
+N_SAMPLES = 3000
+MAX_LON_ERROR_ARCSEC = 5.0
+
+def run_drift_report_tests():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, "eph_cache.npy")
+        build_ephemeris_cache(cache_path, START_YEAR, END_YEAR, AYANAMSA, n_validation=200)
+        report = compute_drift_report(START_YEAR, END_YEAR, N_SAMPLES, AYANAMSA, ephemeris_cache=cache_path)
+
+    summary = summarize_tiers(report)
+    print(summary)
+    assert set(report["Tier"]) == {"high", "standard", "fast"}
+    assert report.filter(report["Tier"] == "high")["MaxLonDiffArcsec"].max() == 0.0
+    assert report["MaxLonDiffArcsec"].max() < MAX_LON_ERROR_ARCSEC
+    print(f"Fastest tier without lord flips: {recommend_tier(report)}")
+
+    ## The cache backend cannot be selected without a cache
+    try:
+        VedicHoroscopeData(2024, 3, 1, 10, 30, 0, 12.97, 77.59, "+05:30", AYANAMSA, ephemeris_backend="fast")
+        raise AssertionError("expected a ValueError")
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    run_drift_report_tests()
@@ -0,0 +1,68 @@
+import logging
+import os
+import tempfile
+import numpy as np
+from flatlib.geopos import GeoPos
+from vedicastro.VedicAstro import VedicHoroscopeData
+from vedicastro.ephemeris_cache import build_ephemeris_cache, EphemerisCache
+from vedicastro.transit_events import make_position_func, solve_crossings
+
+"""
+Builds a small Chebyshev ephemeris cache and validates it against swe at random instants.
+The measured error bounds (arc-seconds for longitude / latitude, deg/day for speed) are printed
+per object and the script fails if any longitude error exceeds `MAX_LON_ERROR_ARCSEC`. Also checks the swe
+fallback of charts outside the cached range.
+For a full validation change `START_YEAR` / `END_YEAR` to the range you intend to ship (eg: 1900 - 2100).
+"""
+
+START_YEAR, END_YEAR = 2000, 2030
+AYANAMSA = "Krishnamurti"
+MAX_LON_ERROR_ARCSEC = 5.0
+
+def run_ephemeris_cache_tests():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, "eph_cache.npy")
+        cache = build_ephemeris_cache(cache_path, START_YEAR, END_YEAR, AYANAMSA)
+        print(f"Cache size: {os.path.getsize(cache_path) / 1e6:.2f} MB")
+
+        ## Re-validate on a fresh, memory mapped load with a different random sample
+        errors = EphemerisCache(cache_path).validate(n_samples=5000, seed=42)
+        for obj, err in errors.items():
+            print(f"{obj:<8} lon: {err['lon_arcsec']:.6f}\"  lat: {err['lat_arcsec']:.6f}\"  speed: {err['speed']:.2e} deg/day")
+            assert err["lon_arcsec"] <= MAX_LON_ERROR_ARCSEC, f"{obj} longitude error too large"
+        assert cache.max_error.keys() == errors.keys()
+
+        ## Around the Moon's entry into Aries the interpolated longitude must stay in [0, 360), never 360.0
+        moon = make_position_func("Moon", AYANAMSA, cache)
+        days = cache.jd_start + np.arange(0, 60, 0.5)
+        lons, _ = moon(days)
+        entry = np.flatnonzero(np.diff(lons) < -180)[0]
+        jd_aries = solve_crossings(moon, days[entry : entry + 1], days[entry + 1 : entry + 2], [0.0], 1e-9)[0]
+        lons, _, _ = cache.positions("Moon", jd_aries + np.linspace(-1e-6, 1e-6, 2001))
+        assert ((lons >= 0) & (lons < 360)).all() and lons.min() < 1e-4 and lons.max() > 360 - 1e-4
+        print(f"Moon longitudes within 0.1 s of its Aries entry (JD {jd_aries:.6f}) all in [0, 360)")
+
+        ## A date outside the cache falls back to swe with a warning, and the chart records the backend it used
+        warnings = []
+        handler = logging.Handler(logging.WARNING)
+        handler.emit = warnings.append
+        logging.getLogger("vedicastro.VedicAstro").addHandler(handler)
+        try:
+            for year, backend in [(2024, "cache"), (END_YEAR + 5, "swiss")]:
+                horoscope = VedicHoroscopeData(year, 1, 1, 12, 0, 0, 12.97, 77.59, "+5:30", AYANAMSA, ephemeris_cache=cache)
+                horoscope.generate_chart()
+                assert (horoscope.ephemeris_backend, horoscope.chart_backend) == ("cache", backend)
+        finally:
+            logging.getLogger("vedicastro.VedicAstro").removeHandler(handler)
+        assert len(warnings) == 1 and "outside the ephemeris cache" in warnings[0].getMessage()
+        print("dates outside the cache are computed with swe, with a warning and chart_backend set")
+
+    ## The chart builder places a longitude that wrapped to 360.0 in Aries rather than indexing past Pisces
+    horoscope = VedicHoroscopeData(2024, 1, 1, 12, 0, 0, 12.97, 77.59, "+5:30", AYANAMSA, "Placidus")
+    date, geopos = horoscope.get_datetime(), GeoPos(horoscope.latitude, horoscope.longitude)
+    wrapped = lambda obj, jd: (np.float64(-1e-15) % 360.0, 0.0, 13.0)
+    chart = horoscope.generate_chart_from_positions(date, geopos, ["Moon"], wrapped)
+    assert chart.getObject("Moon").sign == "Aries"
+
+if __name__ == "__main__":
+    run_ephemeris_cache_tests()
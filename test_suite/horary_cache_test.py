@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from vedicastro import horary_chart
+from vedicastro.horary_chart import HoraryResultCache, configure_horary_cache, find_exact_ascendant_time
+
+"""
+Validates `HoraryResultCache`: LRU eviction of the in-memory tier, hits returned as copies, hits from the
+SQLite tier once the memory is cleared (also in a forked child, which must open its own connection), and
+entries of another `LIBRARY_VERSION` being ignored and purged. Then checks that `find_exact_ascendant_time` returns the same
+match from the cache as the uncached search, and times both.
+"""
+
+QUERY = {"year": 2024, "month": 2, "day": 5, "utc_offset": "+5:30", "lat": 11.02, "lon": 76.98, "horary_number": 127,
+         "ayanamsa": "Krishnamurti"}
+
+def _get_in_child(cache, key, queue):
+    queue.put((cache.get(key), cache._conn_pid == os.getpid()))
+
+def check_cache_tiers(db_path):
+    cache = HoraryResultCache(maxsize=3)
+    for key in "abc":
+        cache.set(key, key.upper())
+    assert cache.get("a") == "A"  # "a" is now the most recently used
+    cache.set("d", "D")
+    assert cache.get("b") is None and [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert (cache.hits, cache.misses) == (4, 1)
+    ## Hits are copies: changing one does not change the cached value
+    cache.set("chart", {"houses": [1, 2]})
+    cache.get("chart")["houses"].append(3)
+    assert cache.get("chart") == {"houses": [1, 2]}
+
+    cache = HoraryResultCache(maxsize=2, db_path=db_path)
+    for key in "abc":
+        cache.set(key, {"value": key})
+    cache._memory.clear()
+    assert cache.get("a") == {"value": "a"} and cache.hits == 1
+    cache.get("a")["value"] = "changed"
+    assert cache.get("a") == {"value": "a"}
+    ## Another process (eg: an API worker) sees the same entries through its own connection
+    assert HoraryResultCache(db_path=db_path).get("c") == {"value": "c"}
+    queue = multiprocessing.get_context("fork").Queue()
+    child = multiprocessing.get_context("fork").Process(target=_get_in_child, args=(cache, "b", queue))
+    child.start()
+    child.join()
+    assert queue.get() == ({"value": "b"}, True)
+    print("in-memory LRU evicts the least recently used entry; SQLite tier serves cleared and forked caches")
+
+    ## Rows of another library version are ignored (keys carry the version), and purged when a process opens the database
+    current = horary_chart.LIBRARY_VERSION
+    horary_chart.LIBRARY_VERSION = "0.0.0-old"
+    try:
+        HoraryResultCache(db_path=db_path).set(HoraryResultCache.make_key("ascendant_time", 127), "stale")
+    finally:
+        horary_chart.LIBRARY_VERSION = current
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM horary_results WHERE version != ?", (current,)).fetchone()[0] == 1
+    assert HoraryResultCache(db_path=db_path).get(HoraryResultCache.make_key("ascendant_time", 127)) is None
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM horary_results WHERE version != ?", (current,)).fetchone()[0] == 0
+    print("entries of another LIBRARY_VERSION are ignored and purged")
+
+def check_ascendant_time_cache(db_path):
+    configure_horary_cache(db_path=db_path)
+    start = time.perf_counter()
+    expected = find_exact_ascendant_time(**QUERY, use_cache=False)
+    uncached = time.perf_counter() - start
+    assert expected is not None
+    first = find_exact_ascendant_time(**QUERY, use_cache=True)  # miss, stores the match
+    start = time.perf_counter()
+    from_memory = find_exact_ascendant_time(**QUERY, use_cache=True)
+    cached = time.perf_counter() - start
+    horary_chart.HORARY_CACHE._memory.clear()
+    from_db = find_exact_ascendant_time(**QUERY, use_cache=True)
+    assert horary_chart.HORARY_CACHE.hits == 2
+    for result in (first, from_memory, from_db):
+        assert result[0] == expected[0]
+        assert [house.LonDecDeg for house in result[2]] == [house.LonDecDeg for house in expected[2]]
+        assert result[2][0].SubLord == expected[2][0].SubLord
+    print(f"find_exact_ascendant_time: {expected[0]} from the search ({uncached:.2f} s) and the cache ({cached * 1000:.1f} ms)")
+
+def run_horary_cache_tests():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_cache_tiers(os.path.join(tmp_dir, "tiers.sqlite"))
+        check_ascendant_time_cache(os.path.join(tmp_dir, "horary.sqlite"))
+    configure_horary_cache()
+
+if __name__ == "__main__":
+    run_horary_cache_tests()
@@ -0,0 +1,69 @@
+import time
+import numpy as np
+import swisseph as swe
+from vedicastro.horary_chart import HORARY_MATCH_OFFSET_DEG, find_exact_ascendant_times, get_horary_ascendant_degree
+from vedicastro.utils import utc_offset_str_to_float
+
+"""
+Validates `find_exact_ascendant_times` against `swe.houses_ex`: for every (horary number, location) pair the
+sidereal Placidus ascendant at the matched Julian day must sit `HORARY_MATCH_OFFSET_DEG` past the start of the
+horary sub division (inside the 0.0001 - 0.001 degree window of `find_exact_ascendant_time`), with that
+division's sub lord, and be its first crossing since local midnight; the returned cusps must match swe.
+Also checks the ways of passing dates, and times the vectorized call.
+"""
+
+HORARY_NUMBERS = [1, 27, 127, 200, 249]
+LOCATIONS = [(11.02, 76.98, "+5:30"), (51.51, -0.13, "+0:00"), (-33.87, 151.21, "+10:00")]
+DATES = [(2024, 2, 5), (2024, 6, 21), (2023, 12, 31)]
+ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+MAX_MATCH_ERROR_DEG = 1e-5
+MAX_CUSP_ERROR_ARCSEC = 0.01
+SCAN_MINUTES = 4
+
+def swe_cusps(jd, lat, lon):
+    return np.array(swe.houses_ex(jd, lat, lon, b"P", swe.FLG_SIDEREAL)[0][:12])
+
+def run_horary_multi_location_tests():
+    start = time.perf_counter()
+    table = find_exact_ascendant_times(HORARY_NUMBERS, LOCATIONS, DATES)
+    elapsed = time.perf_counter() - start
+    assert table.height == len(HORARY_NUMBERS) * len(LOCATIONS)
+
+    swe.set_sid_mode(swe.SIDM_KRISHNAMURTI)
+    for row in table.iter_rows(named=True):
+        location_idx = [loc[:2] for loc in LOCATIONS].index((row["Latitude"], row["Longitude"]))
+        lat, lon, utc_offset = LOCATIONS[location_idx]
+        horary_asc = get_horary_ascendant_degree(row["HoraryNumber"])
+        target = horary_asc["ZodiacDegreeLocation"]
+        assert row["MatchedTime"] is not None and row["SubLord"] == horary_asc["SubLord"], row
+
+        cusps = swe_cusps(row["JulianDay"], lat, lon)
+        assert abs((cusps[0] - target - HORARY_MATCH_OFFSET_DEG + 180) % 360 - 180) < MAX_MATCH_ERROR_DEG, (row, cusps[0])
+        error = np.abs((np.array([row[roman] for roman in ROMAN]) - cusps + 180) % 360 - 180).max() * 3600
+        assert error < MAX_CUSP_ERROR_ARCSEC, (row, error)
+        ## No earlier crossing of the target since local midnight
+        utc = swe.utc_time_zone(*DATES[location_idx], 0, 0, 0, utc_offset_str_to_float(utc_offset))
+        day_start = swe.utc_to_jd(*utc)[1]
+        scan = np.arange(day_start, row["JulianDay"], SCAN_MINUTES / 1440)
+        dist = np.array([(swe_cusps(jd, lat, lon)[0] - target) % 360 for jd in scan])
+        assert not (dist[1:] < dist[:-1]).any(), row
+    print(f"{table.height} pairs match swe.houses_ex at their first crossing of the horary degree ({elapsed:.2f} s)")
+
+    ## One date for every location, given as a tuple or a list; a tuple of tuples is one date per location
+    single = find_exact_ascendant_times(127, LOCATIONS, DATES[0])
+    assert single["Date"].n_unique() == 1 and single["Date"][0].isoformat() == "2024-02-05"
+    assert single.equals(find_exact_ascendant_times(127, LOCATIONS, list(DATES[0])))
+    per_location = find_exact_ascendant_times(127, LOCATIONS, tuple(DATES))
+    assert per_location.equals(table.filter(table["HoraryNumber"] == 127))
+    assert [d.isoformat() for d in per_location["Date"]] == ["2024-02-05", "2024-06-21", "2023-12-31"]
+    assert per_location.equals(find_exact_ascendant_times(127, LOCATIONS, tuple(DATES), n_jobs=2, chunk_size=1))
+    for horary_numbers, dates in [(127, DATES[:2]), (250, DATES[0])]:
+        try:
+            find_exact_ascendant_times(horary_numbers, LOCATIONS, dates)
+            raise AssertionError(f"{horary_numbers}, {dates} should raise ValueError")
+        except ValueError:
+            pass
+    print("single dates, per location tuples / lists of dates and worker processes give the same rows")
+
+if __name__ == "__main__":
+    run_horary_multi_location_tests()
@@ -0,0 +1,78 @@
+import time
+import numpy as np
+import swisseph as swe
+from vedicastro.ephemeris import SWE_HOUSE_SYSTEM_MAPPING, set_ayanamsa
+from vedicastro.house_cusps import compute_cusps_grid, get_house_numbers, julian_day_grid
+from vedicastro.kp_divisions import get_rl_nl_sl_codes
+
+"""
+Validates `compute_cusps_grid` against one `swe.houses_ex` call per instant: the interpolated sidereal state and
+the closed form / Placidus cusps must match swe within `MAX_ERROR_ARCSEC` in every house system, at a few
+latitudes, over a day sampled every minute plus random instants over a century, and the interpolation alone
+must move the cusps by less than `MAX_INTERPOLATION_ERROR_MAS`. Also checks the lord codes and `get_house_numbers`,
+and times a day at one second resolution against the per instant swe calls.
+"""
+
+LOCATIONS = [(12.97, 77.59), (51.51, -0.13), (-33.87, 151.21), (64.15, -21.94)]
+AYANAMSAS = ["Krishnamurti", "Lahiri"]
+MAX_ERROR_ARCSEC = 0.01
+## Bound on what interpolating the sidereal state adds, against the state taken from swe at every instant
+MAX_INTERPOLATION_ERROR_MAS = 1.0
+INTERPOLATION_CHECK_EVERY = 15
+N_RANDOM = 500
+SEED = 11
+
+def swe_cusps(jds, lat, lon, house_system, ayanamsa):
+    set_ayanamsa(ayanamsa)
+    hsys = SWE_HOUSE_SYSTEM_MAPPING[house_system]
+    houses = [swe.houses_ex(jd, lat, lon, hsys, swe.FLG_SIDEREAL) for jd in jds]
+    return np.array([cusps[:12] for cusps, _ in houses]), np.array([ascmc[0] for _, ascmc in houses])
+
+def arcsec(a, b):
+    return np.abs((a - b + 180.0) % 360.0 - 180.0) * 3600
+
+def run_house_cusps_tests():
+    rng = np.random.default_rng(SEED)
+    day = julian_day_grid(2460310.5, 2460311.5, 60.0)
+    century = np.sort(rng.uniform(2415020.5, 2451545.0, N_RANDOM))
+    for lat, lon in LOCATIONS:
+        for house_system in SWE_HOUSE_SYSTEM_MAPPING:
+            for ayanamsa in AYANAMSAS:
+                for jds in (day, century):
+                    grid = compute_cusps_grid(jds, lat, lon, house_system, ayanamsa)
+                    cusps, asc = swe_cusps(jds, lat, lon, house_system, ayanamsa)
+                    error = max(arcsec(grid["cusps"], cusps).max(), arcsec(grid["Asc"], asc).max())
+                    assert error < MAX_ERROR_ARCSEC, f"{lat}, {lon} {house_system} {ayanamsa}: {error:.4f}\""
+                    assert all((grid[field] == codes).all() for field, codes in get_rl_nl_sl_codes(cusps).items())
+        print(f"{lat:>7}, {lon:>7}: cusps of {list(SWE_HOUSE_SYSTEM_MAPPING)} match swe.houses_ex within {MAX_ERROR_ARCSEC}\"")
+
+        ## A single instant is not interpolated, so this isolates the interpolation error of the day grid
+        grid = compute_cusps_grid(day, lat, lon)
+        direct = np.concatenate([compute_cusps_grid(day[i : i + 1], lat, lon)["cusps"] for i in range(0, day.size, INTERPOLATION_CHECK_EVERY)])
+        error = arcsec(grid["cusps"][::INTERPOLATION_CHECK_EVERY], direct).max() * 1000
+        assert error < MAX_INTERPOLATION_ERROR_MAS, f"{lat}, {lon}: interpolation error {error:.4f} mas"
+        print(f"{lat:>7}, {lon:>7}: interpolating the sidereal state moves the Placidus cusps by at most {error:.4f} mas")
+
+    ## Houses are counted cusp to cusp: a planet on a cusp is in that house, one just before it in the previous one
+    cusps = compute_cusps_grid(day[:1], *LOCATIONS[0])["cusps"]
+    planets = np.concatenate([cusps, cusps - 1e-6], axis=1)
+    houses = get_house_numbers(planets, cusps)[0]
+    assert houses[:12].tolist() == list(range(1, 13)) and houses[12:].tolist() == [12] + list(range(1, 12))
+
+    try:
+        compute_cusps_grid(day, 80.0, 0.0, "Placidus")
+        raise AssertionError("Placidus inside the polar circle should raise")
+    except ValueError:
+        pass
+
+    seconds = julian_day_grid(2460310.5, 2460311.5, 1.0)
+    start = time.perf_counter()
+    compute_cusps_grid(seconds, *LOCATIONS[0])
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    swe_cusps(seconds[:5000], *LOCATIONS[0], "Placidus", "Krishnamurti")
+    per_call = (time.perf_counter() - start) * seconds.size / 5000
+    print(f"one day every second ({seconds.size} instants): {vectorized:.2f} s vs ~{per_call:.2f} s with swe.houses_ex")
+
+if __name__ == "__main__":
+    run_house_cusps_tests()
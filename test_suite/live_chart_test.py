@@ -0,0 +1,42 @@
+import time
+import numpy as np
+from vedicastro.live_chart import LiveChart
+
+"""
+Advances a `LiveChart` once per second over a few hours and checks it against a chart computed from scratch
+(every object evaluated) at regular ticks and after jumps back and forth in time: all the lord / house / retrograde
+codes must be equal and the extrapolated longitudes within `MAX_LON_ERROR_ARCSEC`. Prints the number of ephemeris
+evaluations needed against a full rebuild per tick.
+"""
+
+LAT, LON = 12.97, 77.59
+JD_START = 2460400.3
+HOURS = 3
+CHECK_EVERY_TICKS = 97
+MAX_LON_ERROR_ARCSEC = 0.05
+
+def assert_same_chart(live):
+    reference = LiveChart(LAT, LON, live.jd)
+    for field, codes in reference.codes.items():
+        assert np.array_equal(live.codes[field], codes), f"{field} differs at jd {live.jd}"
+    lon_error = np.abs((live.lons - reference.lons + 180.0) % 360.0 - 180.0) * 3600
+    assert lon_error.max() <= MAX_LON_ERROR_ARCSEC, f"longitude off by {lon_error.max():.4f}\" at jd {live.jd}"
+
+def run_live_chart_tests():
+    live = LiveChart(LAT, LON, JD_START)
+    n_ticks, n_changes = HOURS * 3600, 0
+    start = time.perf_counter()
+    for tick in range(1, n_ticks + 1):
+        n_changes += len(live.update(JD_START + tick / 86400.0))
+        if tick % CHECK_EVERY_TICKS == 0:
+            assert_same_chart(live)
+    seconds = time.perf_counter() - start
+    print(f"{n_ticks} ticks: {n_changes} field changes, {live.evaluations} object evaluations "
+          f"(vs {n_ticks * len(live.objects)} for full rebuilds), {seconds / n_ticks * 1e3:.3f} ms per tick incl. checks")
+
+    for jump_days in [30, -2, 400, -100.5]:
+        live.update(live.jd + jump_days)
+        assert_same_chart(live)
+
+if __name__ == "__main__":
+    run_live_chart_tests()
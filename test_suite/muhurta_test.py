@@ -0,0 +1,89 @@
+import time
+import numpy as np
+from vedicastro.ephemeris import calc_sidereal_positions
+from vedicastro.house_cusps import compute_cusps_grid, get_house_numbers, julian_day_grid
+from vedicastro.kp_divisions import LORD_CODES, get_rl_nl_sl_codes
+from vedicastro.muhurta import NATURAL_MALEFICS, find_muhurta_windows, merge_intervals
+from vedicastro.VedicAstro import NAKSHATRAS
+
+"""
+Validates `find_muhurta_windows` against a brute force scan: planet, cusp and house occupancy conditions are
+evaluated every `SCAN_SECONDS` over a few days with swe positions and the vectorized cusps, and each scanned
+instant must be inside a returned window exactly when all the conditions hold (skipping instants within
+`EDGE_MARGIN_SECONDS` of a window edge). Also times the pruned search against the scan.
+"""
+
+JD_START, JD_END = 2460400.5, 2460404.5
+LAT, LON = 12.97, 77.59
+AYANAMSA, HOUSE_SYSTEM = "Krishnamurti", "Placidus"
+SCAN_SECONDS = 10.0
+## House occupancy is sampled every minute before bisection, so flips closer together than that can be missed
+EDGE_MARGIN_SECONDS = 60.0
+## The Moon runs through Jyeshtha .. Shravana in the test range; allow two of them
+MOON_NAKSHATRAS = [NAKSHATRAS[18], NAKSHATRAS[20]]
+ASC_SUB_LORDS = ["Jupiter", "Venus", "Mercury"]
+
+def scan_conditions(jds, planet_conditions, asc_sub_lords, avoid_in_houses):
+    objects = set(planet_conditions) | {obj for objs in avoid_in_houses.values() for obj in objs}
+    lons = {obj: calc_sidereal_positions(jds, obj, AYANAMSA) for obj in objects}
+    ok = np.ones(jds.shape, dtype=bool)
+    for obj, conditions in planet_conditions.items():
+        codes = get_rl_nl_sl_codes(lons[obj][0])
+        for field, values in conditions.items():
+            if field == "Retrograde":
+                ok &= (lons[obj][2] < 0) == values
+            else:
+                ok &= np.isin(codes[field], [NAKSHATRAS.index(v) if field == "Nakshatra" else LORD_CODES[v] for v in values])
+    grid = compute_cusps_grid(jds, LAT, LON, HOUSE_SYSTEM, AYANAMSA)
+    if asc_sub_lords:
+        ok &= np.isin(grid["SubLord"][:, 0], [LORD_CODES[lord] for lord in asc_sub_lords])
+    for house_nr, objects in avoid_in_houses.items():
+        houses = get_house_numbers(np.stack([lons[obj][0] for obj in objects], axis=1), grid["cusps"])
+        ok &= ~np.any(houses == house_nr, axis=1)
+    return ok
+
+def check_against_scan(jds, windows, expected):
+    starts = np.array([w.StartJulianDay for w in windows])
+    ends = np.array([w.EndJulianDay for w in windows])
+    idx = np.searchsorted(starts, jds, side="right") - 1
+    inside = (idx >= 0) & (jds <= ends[np.maximum(idx, 0)])
+    edges = np.sort(np.concatenate([starts, ends]))
+    nearest = np.abs(edges[np.clip(np.searchsorted(edges, jds), 1, edges.size - 1)[:, None] - [1, 0]] - jds[:, None]).min(axis=1)
+    away = nearest * 86400 > EDGE_MARGIN_SECONDS
+    assert (inside[away] == expected[away]).all(), np.count_nonzero(inside[away] != expected[away])
+    return np.count_nonzero(away)
+
+def run_muhurta_tests():
+    assert merge_intervals([(3, 4), (1, 2), (1.5, 2.5), (4.05, 5)], gap_days=0.1) == [(1, 2.5), (3, 5)]
+    jds = julian_day_grid(JD_START, JD_END, SCAN_SECONDS)
+    cases = [
+        ({"Moon": {"Nakshatra": MOON_NAKSHATRAS}}, None, {}),
+        ({"Moon": {"Nakshatra": MOON_NAKSHATRAS}, "Mercury": {"Retrograde": True}}, ASC_SUB_LORDS, {}),
+        ({"Moon": {"SubLord": ["Venus", "Moon", "Jupiter"]}}, ASC_SUB_LORDS, {7: NATURAL_MALEFICS, 8: ["Saturn"]}),
+    ]
+    for planet_conditions, asc_sub_lords, avoid_in_houses in cases:
+        start = time.perf_counter()
+        windows = find_muhurta_windows(
+            JD_START, JD_END, LAT, LON, planet_conditions, {1: {"SubLord": asc_sub_lords}} if asc_sub_lords else None,
+            avoid_in_houses, HOUSE_SYSTEM, AYANAMSA,
+        )
+        elapsed = time.perf_counter() - start
+        assert windows and all(a.EndJulianDay < b.StartJulianDay for a, b in zip(windows, windows[1:]))
+        start = time.perf_counter()
+        expected = scan_conditions(jds, planet_conditions, asc_sub_lords, avoid_in_houses)
+        scan_time = time.perf_counter() - start
+        n_checked = check_against_scan(jds, windows, expected)
+        print(f"{len(windows)} windows match {n_checked} scanned instants; search {elapsed:.2f} s vs scan {scan_time:.2f} s")
+
+    for kwargs, error in [({"planet_conditions": {"Chiron": {"Rasi": "Aries"}}}, ValueError),
+                          ({"planet_conditions": {"Moon": {"Colour": "Red"}}}, ValueError),
+                          ({"cusp_conditions": {13: {"SubLord": "Venus"}}}, ValueError),
+                          ({"cusp_conditions": {1: {"Retrograde": True}}}, ValueError)]:
+        try:
+            find_muhurta_windows(JD_START, JD_END, LAT, LON, **kwargs)
+            raise AssertionError(f"{kwargs} should raise {error.__name__}")
+        except error:
+            pass
+
+if __name__ == "__main__":
+    run_muhurta_tests()
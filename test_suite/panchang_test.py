@@ -0,0 +1,69 @@
+import time
+import numpy as np
+import polars as pl
+from datetime import datetime
+from vedicastro.ephemeris import calc_sidereal_positions
+from vedicastro.panchang import KARANAS, PANCHANG_ELEMENTS, TITHIS, compute_panchang, find_panchang_transitions
+from vedicastro.sunrise import get_sun_times
+from vedicastro.timezones import local_to_julian_days
+
+"""
+Validates `compute_panchang` against the Sun and Moon from swe: the elements reported at each day start are the
+divisions of the angles at that instant, and each reported end time is where the division changes (checked a
+few seconds before and after). Also times a year of panchangs for 100 locations.
+"""
+
+LOCATIONS = [(12.97, 77.59, "Asia/Kolkata"), (27.72, 85.32, "Asia/Kathmandu"), (40.71, -74.01, "America/New_York"),
+             (51.51, -0.13, "Europe/London"), (-33.87, 151.21, "Australia/Sydney")]
+AYANAMSA = "Lahiri"
+CHECK_SECONDS = 5.0
+
+def element_indices(jd):
+    sun = calc_sidereal_positions(jd, "Sun", AYANAMSA)[0]
+    moon = calc_sidereal_positions(jd, "Moon", AYANAMSA)[0]
+    angles = {"elongation": (moon - sun) % 360, "moon": moon, "moon_sun": (moon + sun) % 360}
+    return {element: (angles[angle] // (360 / len(names))).astype(int) for element, (angle, names) in PANCHANG_ELEMENTS.items()}
+
+def run_panchang_tests():
+    assert len(TITHIS) == 30 and len(KARANAS) == 60
+    panchang = compute_panchang((2023, 12, 25), (2024, 4, 5), LOCATIONS, AYANAMSA)
+    assert panchang.height == 103 * len(LOCATIONS)
+
+    start_jd = panchang["DayStartJulianDay"].to_numpy()
+    expected_start = local_to_julian_days(
+        [datetime(d.year, d.month, d.day) for d in panchang["Date"].to_list()], [LOCATIONS[i][2] for i in panchang["LocationIdx"]]
+    )
+    assert np.allclose(start_jd, expected_start)
+    at_start = element_indices(start_jd)
+    for element, (_, names) in PANCHANG_ELEMENTS.items():
+        assert (np.array(names)[at_start[element]] == panchang[element].to_numpy()).all(), element
+
+    zones = [LOCATIONS[i][2] for i in panchang["LocationIdx"]]
+    for element, (_, names) in PANCHANG_ELEMENTS.items():
+        end_jd = local_to_julian_days(panchang[f"{element}End"].to_numpy(), zones)
+        before, after = element_indices(end_jd - CHECK_SECONDS / 86400), element_indices(end_jd + CHECK_SECONDS / 86400)
+        assert (before[element] == at_start[element]).all(), element
+        assert ((after[element] - at_start[element]) % len(names) == 1).all(), element
+    print(f"{panchang.height} location days match swe at the day start and around the end times")
+
+    ## Sunrise days read the elements at the local sunrise
+    at_sunrise = compute_panchang((2024, 3, 1), (2024, 3, 10), LOCATIONS, AYANAMSA, day_start="sunrise")
+    sunrise = get_sun_times(at_sunrise["Date"].unique(maintain_order=True).to_numpy(), LOCATIONS)[0]
+    assert np.allclose(at_sunrise["DayStartJulianDay"].to_numpy(), sunrise.ravel())
+    at_start = element_indices(sunrise.ravel())
+    assert (np.array(TITHIS)[at_start["Tithi"]] == at_sunrise["Tithi"].to_numpy()).all()
+    print("sunrise day starts match sunrise.get_sun_times")
+
+    transitions = find_panchang_transitions(2460310.5, 2460340.5, AYANAMSA)
+    assert transitions["JulianDay"].is_sorted()
+    counts = dict(transitions.group_by("Element").len().iter_rows())
+    assert 28 <= counts["Tithi"] <= 32 and 56 <= counts["Karana"] <= 63 and 26 <= counts["Nakshatra"] <= 31
+    print(f"transitions over 30 days: {counts}")
+
+    cities = [LOCATIONS[i % len(LOCATIONS)] for i in range(100)]
+    start = time.perf_counter()
+    year = compute_panchang((2024, 1, 1), (2024, 12, 31), cities, AYANAMSA)
+    print(f"one year x {len(cities)} locations: {year.height} rows in {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    run_panchang_tests()
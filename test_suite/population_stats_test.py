@@ -0,0 +1,110 @@
+import os
+import pickle
+import tempfile
+import time
+import numpy as np
+import polars as pl
+from vedicastro.ephemeris import GRAHAS
+from vedicastro.kp_divisions import decode_codes, get_rl_nl_sl_codes
+from vedicastro.population_stats import PopulationStats, aggregate_batch_output
+
+"""
+Validates `PopulationStats` on synthetic chart tables in the `batch_cli` output layout: counts streamed part by
+part (and merged across worker processes) must equal a polars group_by over all the rows materialized at once.
+Also times the streaming over 200k charts.
+"""
+
+N_CHARTS = 20_000
+N_PARTS = 4
+SEED = 3
+SPEC = {
+    "moon_star_7th_sub": ["Moon.Nakshatra", "House7.SubLord"],
+    "houses_by_decade": [("year", range(1900, 2031, 10)), "*.HouseNr"],
+    "asc_degree": ["House1.LonDecDeg"],
+}
+
+def synthetic_tables(chart_ids, rng):
+    """Planets / houses tables with random longitudes, and the birth year of every chart"""
+    n = len(chart_ids)
+    planet_lons = rng.uniform(0, 360, (n, len(GRAHAS)))
+    cusps = (rng.uniform(0, 360, (n, 1)) + 30 * np.arange(12)) % 360
+    planets = decode_codes(get_rl_nl_sl_codes(planet_lons))
+    houses = decode_codes(get_rl_nl_sl_codes(cusps))
+    planets_df = pl.DataFrame({
+        "ChartId": np.repeat(chart_ids, len(GRAHAS)),
+        "Object": np.tile(GRAHAS, n),
+        "LonDecDeg": planet_lons.ravel(),
+        "Nakshatra": planets["Nakshatra"].ravel(),
+        "SubLord": planets["SubLord"].ravel(),
+        "HouseNr": rng.integers(1, 13, n * len(GRAHAS)),
+    })
+    houses_df = pl.DataFrame({
+        "ChartId": np.repeat(chart_ids, 12),
+        "HouseNr": np.tile(np.arange(1, 13), n),
+        "LonDecDeg": cusps.ravel(),
+        "Nakshatra": houses["Nakshatra"].ravel(),
+        "SubLord": houses["SubLord"].ravel(),
+    })
+    years = pl.DataFrame({"ChartId": chart_ids, "year": rng.integers(1900, 2030, n)})
+    return planets_df, houses_df, years
+
+def expected_frames(planets_df, houses_df, years):
+    moon = planets_df.filter(pl.col("Object") == "Moon").select("ChartId", pl.col("Nakshatra").alias("Moon.Nakshatra"))
+    seventh = houses_df.filter(pl.col("HouseNr") == 7).select("ChartId", pl.col("SubLord").alias("House7.SubLord"))
+    moon_star = moon.join(seventh, on="ChartId").group_by("Moon.Nakshatra", "House7.SubLord").agg(pl.len().alias("Count"))
+    by_decade = (
+        planets_df.join(years, on="ChartId")
+        .with_columns((pl.col("year") // 10 * 10).alias("year"))
+        .group_by("year", "Object", "HouseNr").agg(pl.len().alias("Count"))
+    )
+    asc = houses_df.filter(pl.col("HouseNr") == 1).group_by(pl.col("LonDecDeg").floor().cast(pl.Int64).alias("House1.LonDecDeg")).agg(pl.len().alias("Count"))
+    return {"moon_star_7th_sub": moon_star, "houses_by_decade": by_decade, "asc_degree": asc}
+
+def same_counts(stats, name, expected):
+    got = stats.to_frame(name)
+    keys = stats.dimension_names(name)
+    joined = got.join(expected.cast({key: got.schema[key] for key in keys}), on=keys, how="full", coalesce=True)
+    return got.height == expected.height and (joined["Count"] == joined["Count_right"]).all()
+
+def run_population_stats_tests():
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as output_dir:
+        frames = []
+        for part, chart_ids in enumerate(np.array_split(np.arange(N_CHARTS), N_PARTS)):
+            planets_df, houses_df, years = synthetic_tables(chart_ids, rng)
+            for table, df in [("planets", planets_df), ("houses", houses_df)]:
+                os.makedirs(os.path.join(output_dir, table), exist_ok=True)
+                df.write_parquet(os.path.join(output_dir, table, f"part-{part:05d}.parquet"))
+            frames.append((planets_df, houses_df, years))
+        all_years = pl.concat([years for _, _, years in frames])
+        expected = expected_frames(*(pl.concat([frame[i] for frame in frames]) for i in range(3)))
+
+        streamed = PopulationStats(SPEC).consume_batch_output(output_dir, all_years)
+        parallel = aggregate_batch_output(output_dir, SPEC, all_years, workers=2)
+        for stats in (streamed, parallel):
+            assert stats.n_charts == N_CHARTS and stats.n_skipped == dict.fromkeys(SPEC, 0)
+            for name in SPEC:
+                assert same_counts(stats, name, expected[name]), name
+        assert stats.counts("houses_by_decade").shape == (13, len(GRAHAS), 12)
+        print(f"{N_CHARTS} charts in {N_PARTS} parts: streamed and 2 worker counts match a full group_by")
+
+    ## Partial results merge to the same counts, and pickle as small fixed-size arrays
+    planets_df, houses_df, years = frames[0]
+    first_half = pl.col("ChartId") < planets_df["ChartId"].median()
+    first = PopulationStats(SPEC).consume_frames(planets_df.filter(first_half), houses_df.filter(first_half), years)
+    second = PopulationStats(SPEC).consume_frames(planets_df.filter(~first_half), houses_df.filter(~first_half), years)
+    whole = PopulationStats(SPEC).consume_frames(planets_df, houses_df, years)
+    merged = pickle.loads(pickle.dumps(first)).merge(second)
+    assert all((merged.counts(name) == whole.counts(name)).all() for name in SPEC)
+    print(f"merged halves match; pickled stats take {len(pickle.dumps(merged)) / 1024:.0f} KB")
+
+    columns = {"Moon.Nakshatra": rng.integers(0, 27, 200_000).astype(np.uint8),
+               "House7.SubLord": rng.integers(0, 9, 200_000).astype(np.uint8)}
+    stats = PopulationStats({"moon_star_7th_sub": SPEC["moon_star_7th_sub"]})
+    start = time.perf_counter()
+    for offset in range(0, 200_000, 10_000):
+        stats.update_columns({key: values[offset : offset + 10_000] for key, values in columns.items()})
+    print(f"200k charts in batches of 10k: {time.perf_counter() - start:.3f} s")
+
+if __name__ == "__main__":
+    run_population_stats_tests()
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from vedicastro.request_aggregator import RequestAggregator
+
+"""
+Checks the single-flight and micro-batching behaviour of `RequestAggregator` with a slow batch function:
+identical concurrent requests are computed once, distinct ones are batched up to `max_batch_size`, an
+isolated request is dispatched without waiting for `max_delay_ms`, a failing item only fails its own
+callers, and a burst is served with far fewer batch calls than requests.
+"""
+
+## Cost of one batch call, plus a smaller cost per item
+CALL_SECONDS = 0.010
+ITEM_SECONDS = 0.001
+ISOLATED_WINDOW_MS = 60_000.0
+ISOLATED_TIMEOUT_SECONDS = 5.0
+
+def slow_batch(items: list):
+    time.sleep(CALL_SECONDS + ITEM_SECONDS * len(items))
+    return [ValueError(f"bad item {item}") if item < 0 else item * item for item in items]
+
+async def check_behaviour():
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    ## An isolated request does not wait for the batch window: with a window far longer than the timeout it is
+    ## still answered, alone in its batch
+    aggregator = RequestAggregator(slow_batch, max_batch_size=8, max_delay_ms=ISOLATED_WINDOW_MS, executor=executor)
+    assert await asyncio.wait_for(aggregator.submit(3, 3), timeout=ISOLATED_TIMEOUT_SECONDS) == 9
+    assert (aggregator.n_batches, aggregator.largest_batch) == (1, 1)
+
+    aggregator = RequestAggregator(slow_batch, max_batch_size=8, max_delay_ms=50.0, executor=executor)
+
+    ## Identical requests share one computation, distinct ones are batched
+    batches_before = aggregator.n_batches
+    results = await asyncio.gather(*(aggregator.submit(i % 5, i % 5) for i in range(40)))
+    assert results == [(i % 5) ** 2 for i in range(40)]
+    assert aggregator.n_shared == 35
+    assert aggregator.n_batches - batches_before == 1
+
+    ## Batches are split at max_batch_size and one bad item fails only its callers
+    results = await asyncio.gather(*(aggregator.submit(i, i) for i in range(-1, 20)), return_exceptions=True)
+    assert isinstance(results[0], ValueError)
+    assert results[1:] == [i * i for i in range(20)]
+    assert aggregator.largest_batch == 8
+    assert not aggregator.stats()["in_flight"]
+    executor.shutdown()
+
+async def measure_burst(max_batch_size: int, n_requests: int = 200):
+    executor = ThreadPoolExecutor(max_workers=1)
+    aggregator = RequestAggregator(slow_batch, max_batch_size=max_batch_size, max_delay_ms=2.0, executor=executor)
+    start = time.perf_counter()
+    await asyncio.gather(*(aggregator.submit(i, i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    return elapsed, aggregator.stats()
+
+def run_request_aggregator_tests():
+    asyncio.run(check_behaviour())
+    print("single-flight, batching and error isolation OK")
+    for max_batch_size in [1, 8, 32]:
+        elapsed, stats = asyncio.run(measure_burst(max_batch_size))
+        print(f"max_batch_size={max_batch_size:<3} {stats['requests']} requests in {stats['batches']} batches, {elapsed * 1e3:.0f} ms")
+
+if __name__ == "__main__":
+    run_request_aggregator_tests()
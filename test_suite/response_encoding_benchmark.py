@@ -0,0 +1,55 @@
+import json
+import timeit
+from fastapi.encoders import jsonable_encoder
+from vedicastro.VedicAstro import VedicHoroscopeData
+from vedicastro import response_encoding
+
+"""
+Benchmarks the payload size and encode time of the `/get_all_horoscope_data` payload in each response format,
+against the previous path (`_asdict()` on the data tables + FastAPI's `jsonable_encoder` + `json.dumps`).
+The Arrow numbers are for the planets data table alone, the section a client would request in that format.
+"""
+
+N_REPEATS = 200
+
+def build_payload():
+    horoscope = VedicHoroscopeData(1990, 5, 12, 10, 30, 0, 12.97, 77.59, "+5:30", "Krishnamurti", "Placidus")
+    chart = horoscope.generate_chart()
+    planets_data = horoscope.get_planets_data_from_chart(chart)
+    houses_data = horoscope.get_houses_data_from_chart(chart)
+    return {
+        "planets_data": planets_data,
+        "houses_data": houses_data,
+        "planet_significators": horoscope.get_planet_wise_significators(planets_data, houses_data),
+        "planetary_aspects": horoscope.get_planetary_aspects(chart),
+        "house_significators": horoscope.get_house_wise_significators(planets_data, houses_data),
+        "vimshottari_dasa_table": horoscope.compute_vimshottari_dasa(chart),
+        "consolidated_chart_data": horoscope.get_consolidated_chart_data(planets_data=planets_data, houses_data=houses_data),
+    }
+
+def fastapi_json(payload):
+    payload = {key: [row._asdict() for row in value] if key in ("planets_data", "houses_data") else value
+               for key, value in payload.items()}
+    return json.dumps(jsonable_encoder(payload)).encode("utf-8")
+
+def run_response_encoding_benchmark():
+    payload = build_payload()
+    ## The default format must carry the same data as before
+    assert json.loads(response_encoding.encode_payload(payload, response_encoding.JSON_MEDIA_TYPE)) == json.loads(fastapi_json(payload))
+
+    encoders = {
+        "fastapi json (before)": lambda: fastapi_json(payload),
+        "json": lambda: response_encoding.encode_payload(payload, response_encoding.JSON_MEDIA_TYPE),
+        "arrow (planets_data)": lambda: response_encoding.encode_payload(payload, response_encoding.ARROW_MEDIA_TYPE, "planets_data"),
+    }
+    if response_encoding.msgpack is not None:
+        encoders["msgpack"] = lambda: response_encoding.encode_payload(payload, response_encoding.MSGPACK_MEDIA_TYPE)
+
+    print(f"{'Format':<24}{'Bytes':>10}{'Encode (us)':>14}")
+    for name, encode in encoders.items():
+        size = len(encode())
+        seconds = timeit.timeit(encode, number=N_REPEATS) / N_REPEATS
+        print(f"{name:<24}{size:>10}{seconds * 1e6:>14.1f}")
+
+if __name__ == "__main__":
+    run_response_encoding_benchmark()
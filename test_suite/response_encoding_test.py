@@ -0,0 +1,54 @@
+import collections
+import io
+import json
+import polars as pl
+from vedicastro.response_encoding import (ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, encode_payload,
+                                          negotiate_media_type)
+
+"""
+Validates the `Accept` negotiation of `response_encoding`: clients that do not negotiate (no header, */*, or
+only types the service never produces) get JSON as before, supported types are picked by q value, and only an
+explicit MessagePack / Arrow request that cannot be served yields None (a 406 in the API). Also round trips a
+payload through the JSON and Arrow encoders.
+"""
+
+ALL = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE]
+NO_MSGPACK = [JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE]
+CASES = [
+    (None, ALL, JSON_MEDIA_TYPE),
+    ("", ALL, JSON_MEDIA_TYPE),
+    ("*/*", ALL, JSON_MEDIA_TYPE),
+    ("text/plain", ALL, JSON_MEDIA_TYPE),
+    ("application/xml, text/html;q=0.9", ALL, JSON_MEDIA_TYPE),
+    ("text/html, application/msgpack;q=0.5", ALL, MSGPACK_MEDIA_TYPE),
+    ("application/json;q=0.5, application/msgpack", ALL, MSGPACK_MEDIA_TYPE),
+    ("application/x-msgpack", ALL, MSGPACK_MEDIA_TYPE),
+    (f"{ARROW_MEDIA_TYPE}, application/msgpack", ALL, MSGPACK_MEDIA_TYPE),
+    (f"{ARROW_MEDIA_TYPE};q=1, application/msgpack;q=0.2", ALL, ARROW_MEDIA_TYPE),
+    ("application/msgpack", NO_MSGPACK, None),
+    ("application/msgpack, text/plain", NO_MSGPACK, None),
+    ("application/msgpack, application/json;q=0.1", NO_MSGPACK, JSON_MEDIA_TYPE),
+    ("application/msgpack;q=0", NO_MSGPACK, JSON_MEDIA_TYPE),
+]
+
+def run_response_encoding_tests():
+    for accept, available, expected in CASES:
+        got = negotiate_media_type(accept, available)
+        assert got == expected, (accept, available, got)
+    print(f"{len(CASES)} Accept headers negotiate as expected")
+
+    Row = collections.namedtuple("Row", ["Object", "LonDecDeg"])
+    payload = {"planets_data": [Row("Sun", 10.5), Row("Moon", 200.25)], "note": "ok"}
+    decoded = json.loads(encode_payload(payload, JSON_MEDIA_TYPE))
+    assert decoded["note"] == "ok" and len(decoded["planets_data"]) == 2
+    frame = pl.read_ipc_stream(io.BytesIO(encode_payload(payload, ARROW_MEDIA_TYPE, "planets_data")))
+    assert frame["Object"].to_list() == ["Sun", "Moon"] and frame["LonDecDeg"].to_list() == [10.5, 200.25]
+    try:
+        encode_payload(payload, ARROW_MEDIA_TYPE, "note")
+        raise AssertionError("Arrow needs a tabular section")
+    except ValueError:
+        pass
+    print("JSON and Arrow payloads round trip")
+
+if __name__ == "__main__":
+    run_response_encoding_tests()
@@ -0,0 +1,56 @@
+import time
+import numpy as np
+import swisseph as swe
+from datetime import datetime, timedelta, timezone
+from vedicastro.kp_divisions import decode_codes, get_rl_nl_sl_codes
+from vedicastro.ruling_planets import DAY_LORDS, get_ruling_planets, ruling_planets_cache_info
+
+"""
+Validates `get_ruling_planets` against swe: the Moon from `swe.calc_ut` and the Ascendant from `swe.houses_ex`,
+both sidereal, for random minutes and places, and checks that consultations within one minute and at one rounded
+location hit the cache, and that the day lord changes at sunrise unless `day_start="midnight"`.
+"""
+
+N_SAMPLES = 300
+SEED = 11
+
+def expected_lords(jd, latitude, longitude):
+    swe.set_sid_mode(swe.SIDM_KRISHNAMURTI)
+    moon = swe.calc_ut(jd, swe.MOON, swe.FLG_SWIEPH | swe.FLG_SIDEREAL)[0][0]
+    asc = swe.houses_ex(jd, latitude, longitude, b"P", swe.FLG_SIDEREAL)[1][0]
+    lords = decode_codes(get_rl_nl_sl_codes(np.array([asc, moon])))
+    return tuple(str(lords[col][i]) for i in range(2) for col in ["RasiLord", "NakshatraLord", "SubLord"])
+
+def run_ruling_planets_tests():
+    rng = np.random.default_rng(SEED)
+    for _ in range(N_SAMPLES):
+        latitude, longitude = round(rng.uniform(-60, 60), 2), round(rng.uniform(-180, 180), 2)
+        utc_time = datetime(1950, 1, 1) + timedelta(minutes=int(rng.integers(0, 80 * 365 * 1440)))
+        result = get_ruling_planets(utc_time.replace(tzinfo=timezone.utc), latitude, longitude, day_start="midnight")
+        assert result.DayLord == DAY_LORDS[utc_time.weekday()]
+        assert result[3:9] == expected_lords(result.JulianDay, latitude, longitude), f"{utc_time} {latitude} {longitude}: {result}"
+    print(f"{N_SAMPLES} random moments match swe")
+
+    ## Every second of one local minute gives the result of the start of the minute
+    hits_before = ruling_planets_cache_info().hits
+    start = time.perf_counter()
+    results = {get_ruling_planets(datetime(2024, 3, 1, 10, 30, second), 12.97, 77.59, "Asia/Kolkata") for second in range(60)}
+    elapsed = time.perf_counter() - start
+    assert len(results) == 1 and results.pop().LocalTime == "2024-03-01T10:30"
+    assert ruling_planets_cache_info().hits - hits_before == 59
+    print(f"60 lookups within one minute: 1 computation, {elapsed / 60 * 1e6:.0f} us per lookup")
+
+    ## A nearby place rounds to the same location: the cached result is the one computed for that location
+    nearby = get_ruling_planets(datetime(2024, 3, 1, 10, 30), 12.9712, 77.5946, "Asia/Kolkata")
+    assert nearby == get_ruling_planets(datetime(2024, 3, 1, 10, 30), 12.97, 77.59, "Asia/Kolkata")
+    assert nearby[3:6] == expected_lords(nearby.JulianDay, 12.97, 77.59)[:3]
+
+    ## Friday 05:00 in Bangalore is before sunrise: the day lord is still Thursday's unless the day starts at midnight
+    before_sunrise = datetime(2024, 3, 1, 5, 0)
+    assert get_ruling_planets(before_sunrise, 12.97, 77.59, "Asia/Kolkata", day_start="midnight").DayLord == "Venus"
+    result = get_ruling_planets(before_sunrise, 12.97, 77.59, "Asia/Kolkata")
+    assert result.DayLord == "Jupiter" and result.HoraLord == "Mars"
+    print("sunrise day lord and hora lord match")
+
+if __name__ == "__main__":
+    run_ruling_planets_tests()
@@ -0,0 +1,76 @@
+import time
+import numpy as np
+import swisseph as swe
+from vedicastro.sunrise import (DAY_LORDS, HORA_LORDS, compute_horas, compute_sun_times, get_day_and_hora_lords,
+                                sun_times_cache_info)
+from vedicastro.timezones import local_to_julian_days
+
+"""
+Validates `compute_sun_times` against `swe.rise_trans` for a year at a few places, including one with polar
+day / night, checks the hora tables and the Vedic day / hora lookup, and times a year of sunrises for 100
+locations against one `swe.rise_trans` call per event.
+"""
+
+LOCATIONS = [(12.97, 77.59, "Asia/Kolkata"), (40.71, -74.01, "America/New_York"), (-33.87, 151.21, "Australia/Sydney"),
+             (69.65, 18.96, "Europe/Oslo")]
+MAX_ERROR_SECONDS = 0.5
+## Near the polar day / night the Sun grazes the horizon and the rise time is much more sensitive
+POLAR_LATITUDE = 60.0
+POLAR_MAX_ERROR_SECONDS = 5.0
+
+def swe_event(jd_start, latitude, longitude, rsmi):
+    res, tret = swe.rise_trans(jd_start, swe.SUN, rsmi, (longitude, latitude, 0))
+    return tret[0] if res == 0 else np.nan
+
+def run_sunrise_tests():
+    table = compute_sun_times((2024, 1, 1), (2024, 12, 31), LOCATIONS)
+    assert table.height == 366 * len(LOCATIONS)
+    errors, polar_errors, n_polar = [], [], 0
+    for row in table.iter_rows(named=True):
+        latitude, longitude, _ = LOCATIONS[row["LocationIdx"]]
+        if row["SunriseJulianDay"] is None:
+            n_polar += 1
+            continue
+        location_errors = polar_errors if abs(latitude) > POLAR_LATITUDE else errors
+        location_errors.append(row["SunriseJulianDay"] - swe_event(row["SunriseJulianDay"] - 0.1, latitude, longitude, swe.CALC_RISE))
+        location_errors.append(row["SunsetJulianDay"] - swe_event(row["SunsetJulianDay"] - 0.1, latitude, longitude, swe.CALC_SET))
+    errors, polar_errors = np.abs(errors) * 86400, np.abs(polar_errors) * 86400
+    assert errors.max() < MAX_ERROR_SECONDS, errors.max()
+    assert n_polar > 0 and polar_errors.max() < POLAR_MAX_ERROR_SECONDS, polar_errors.max()
+    print(f"{errors.size} rises / sets match swe.rise_trans within {errors.max():.2f} s "
+          f"({polar_errors.max():.2f} s above {POLAR_LATITUDE}°, {n_polar} polar days)")
+
+    horas = compute_horas((2024, 3, 1), (2024, 3, 7), LOCATIONS[:1])
+    assert horas.height == 7 * 24
+    first = horas.filter(horas["Hora"] == 1)
+    assert first["Lord"].to_list() == [DAY_LORDS[(4 + i) % 7] for i in range(7)]
+    assert (horas["EndJulianDay"].head(-1) == horas["StartJulianDay"].tail(-1)).all()
+    ## Hora lords follow the Chaldean order, and the day after a day's 24 horas starts with the next weekday lord
+    lords = [HORA_LORDS.index(lord) for lord in horas["Lord"]]
+    assert all((b - a) % 7 == 1 for a, b in zip(lords, lords[1:]))
+
+    ## Friday 2024-03-01 in Bangalore: before sunrise it is still Thursday's night
+    jds = local_to_julian_days(np.array(["2024-03-01T05:00", "2024-03-01T07:00", "2024-03-01T19:00"], dtype="datetime64[us]"), "Asia/Kolkata")
+    day_lords, hora_numbers, hora_lords = get_day_and_hora_lords(jds, *LOCATIONS[0])
+    assert day_lords.tolist() == ["Jupiter", "Venus", "Venus"]
+    assert hora_numbers.tolist() == [23, 1, 13] and hora_lords.tolist() == ["Mars", "Venus", "Mars"]
+    print("hora tables and lords match the Chaldean order")
+
+    cities = [(float(lat), float(lon), "UTC") for lat, lon in np.random.default_rng(5).uniform([-55, -180], [55, 180], (100, 2))]
+    start = time.perf_counter()
+    compute_sun_times((2025, 1, 1), (2025, 12, 31), cities)
+    bulk = time.perf_counter() - start
+    start = time.perf_counter()
+    compute_sun_times((2025, 1, 1), (2025, 12, 31), cities)
+    cached = time.perf_counter() - start
+    start = time.perf_counter()
+    for lat, lon, _ in cities[:5]:
+        for day in range(365):
+            swe_event(2460676.5 + day, lat, lon, swe.CALC_RISE)
+            swe_event(2460676.5 + day, lat, lon, swe.CALC_SET)
+    per_call = (time.perf_counter() - start) / 5
+    print(f"one year x {len(cities)} locations: {bulk:.2f} s, {cached * 1000:.0f} ms cached; "
+          f"swe.rise_trans would take ~{per_call * len(cities):.1f} s ({sun_times_cache_info()})")
+
+if __name__ == "__main__":
+    run_sunrise_tests()
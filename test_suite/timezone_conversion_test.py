@@ -0,0 +1,70 @@
+import time
+import numpy as np
+import pytz
+from datetime import datetime, timedelta
+from vedicastro.timezones import get_transition_table, get_utc_offsets, local_to_julian_days, UNIX_EPOCH_JD
+from vedicastro.utils import get_utc_offset
+
+"""
+Validates the vectorized local -> UTC conversion in `timezones.py` against pytz.
+
+For each zone, random local times plus local times within a few hours of every transition (so every DST
+gap and overlap is hit) are converted in one call and compared with `tz.localize(dt, is_dst=...)` one by one:
+the default policies against `is_dst=False`, `ambiguous="dst"` / `nonexistent="after"` against `is_dst=True`,
+and the "nan" policies against the times pytz rejects with `is_dst=None`.
+"""
+
+ZONES = ["Asia/Kolkata", "America/New_York", "Europe/London", "Australia/Lord_Howe", "America/Sao_Paulo",
+         "Asia/Kathmandu", "Pacific/Apia", "Africa/Casablanca", "Europe/Moscow", "UTC", "+05:30"]
+N_RANDOM = 2000
+SEED = 7
+
+def sample_local_times(zone, rng):
+    start, end = datetime(1900, 1, 1), datetime(2037, 1, 1)
+    seconds = rng.uniform(0, (end - start).total_seconds(), N_RANDOM)
+    local = [start + timedelta(seconds=float(s)) for s in seconds]
+    transitions, offsets, _ = get_transition_table(zone)
+    for utc_us, offset_us in zip(transitions[1:], offsets[1:]):
+        at = datetime(1970, 1, 1) + timedelta(microseconds=int(utc_us + offset_us))
+        if start < at < end:
+            local += [at + timedelta(minutes=m) for m in range(-150, 151, 15)]
+    return local
+
+def pytz_offset_hours(tz, dt, is_dst):
+    try:
+        return tz.localize(dt, is_dst=is_dst).utcoffset().total_seconds() / 3600.0
+    except (pytz.AmbiguousTimeError, pytz.NonExistentTimeError):
+        return np.nan
+
+def run_timezone_conversion_tests():
+    rng = np.random.default_rng(SEED)
+    for zone in ZONES:
+        tz = pytz.timezone(zone) if zone != "+05:30" else pytz.FixedOffset(330)
+        local = sample_local_times(zone, rng)
+        for is_dst, policies in [(False, ("standard", "before")), (True, ("dst", "after")), (None, ("nan", "nan"))]:
+            got = get_utc_offsets(local, zone, *policies)
+            expected = np.array([pytz_offset_hours(tz, dt, is_dst) for dt in local])
+            mismatches = ~((got == expected) | (np.isnan(got) & np.isnan(expected)))
+            assert not mismatches.any(), f"{zone} is_dst={is_dst}: {np.count_nonzero(mismatches)} mismatches, eg: {local[np.argmax(mismatches)]}"
+        print(f"{zone:<22} {len(local)} local times match pytz")
+
+    ## Julian days, with a mixed zone array and second fractions
+    local = [datetime(1990, 5, 12, 10, 30, 15, 250000), datetime(2021, 11, 7, 1, 30)]
+    jd = local_to_julian_days(local, ["Asia/Kolkata", "America/New_York"])
+    expected = [(pytz.timezone(z).localize(dt).astimezone(pytz.utc).replace(tzinfo=None) - datetime(1970, 1, 1)).total_seconds() / 86400 + UNIX_EPOCH_JD
+                for dt, z in zip(local, ["Asia/Kolkata", "America/New_York"])]
+    assert np.allclose(jd, expected, rtol=0, atol=1e-9)
+
+    ## Throughput against the per-datetime `get_utc_offset` path
+    local = sample_local_times("America/New_York", rng)[:N_RANDOM]
+    start = time.perf_counter()
+    for dt in local:
+        get_utc_offset("America/New_York", dt)
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    local_to_julian_days(local, "America/New_York")
+    vector_seconds = time.perf_counter() - start
+    print(f"{len(local)} datetimes: get_utc_offset loop {loop_seconds * 1e3:.1f} ms, local_to_julian_days {vector_seconds * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    run_timezone_conversion_tests()
@@ -0,0 +1,99 @@
+import time
+import numpy as np
+from vedicastro.ephemeris import GRAHAS, calc_sidereal_positions
+from vedicastro.kp_divisions import decode_codes, get_rl_nl_sl_codes
+from vedicastro.transit_events import find_transit_events, solve_crossings, wrap_degrees
+
+"""
+Validates the root-finder behind `transit_events` (and muhurta, panchang and rectification): `solve_crossings`
+on synthetic angles with known crossings, then `find_transit_events` over a year against an hourly swe scan.
+Every division change seen between two hourly samples must be found once, at a time where the longitude is on
+the boundary and the divisions before / after are the reported ones, and every station must sit on a sign change
+of the speed. Also times the search against the hourly scan.
+"""
+
+JD_START, JD_END = 2460310.5, 2460676.5  # 2024
+AYANAMSA = "Krishnamurti"
+EVENTS = ["Rasi", "Nakshatra", "Pada", "SubLord", "Station"]
+PRECISION_SECONDS = 1.0
+SCAN_STEP_DAYS = 1 / 24
+## The swe speed of the outer planets near a station is ~1e-8 deg/day, with noise of a few 1e-9, so stations are
+## checked a minute either side rather than at `PRECISION_SECONDS`
+STATION_CHECK_SECONDS = 60.0
+SEED = 13
+
+def check_solve_crossings(rng):
+    ## 100 deg/day with a wobble, increasing and decreasing; each 1 day bracket (as sampled by the callers) covers under 180°
+    for direction in (1.0, -1.0):
+        angle = lambda t: (direction * (100 * t + 20 * np.sin(t)) % 360.0, direction * (100 + 20 * np.cos(t)))
+        t_lo = rng.uniform(0, 1000, 500)
+        true_roots = t_lo + rng.uniform(0, 1, 500)
+        targets, _ = angle(true_roots)
+        roots = solve_crossings(angle, t_lo, t_lo + 1.0, targets, 1e-10)
+        assert ((roots >= t_lo) & (roots <= t_lo + 1.0)).all()
+        assert np.abs(roots - true_roots).max() < 1e-9
+    ## Targets at the bracket ends, and empty input
+    roots = solve_crossings(lambda t: (t % 360.0, np.ones_like(t)), [10.0, 20.0], [30.0, 40.0], [10.0, 40.0], 1e-10)
+    assert np.allclose(roots, [10.0, 40.0])
+    assert solve_crossings(angle, [], [], [], 1e-10).size == 0
+    print("solve_crossings finds synthetic crossings within 1e-9 days")
+
+def scan_changes(lon, event):
+    """Indices of the hourly samples followed by a change of the event's division name, and the name at each sample"""
+    decoded = decode_codes(get_rl_nl_sl_codes(lon))
+    if event == "Pada":
+        name = np.char.add(np.char.add(decoded["Nakshatra"].astype(str), " "), decoded["Pada"].astype(str))
+    else:
+        name = decoded[event]
+    return np.flatnonzero(name[1:] != name[:-1]), name
+
+def run_transit_events_tests():
+    check_solve_crossings(np.random.default_rng(SEED))
+
+    start = time.perf_counter()
+    events = find_transit_events(JD_START, JD_END, events=EVENTS, ayanamsa=AYANAMSA, precision_seconds=PRECISION_SECONDS)
+    elapsed = time.perf_counter() - start
+    assert all(a.JulianDay <= b.JulianDay for a, b in zip(events, events[1:]))
+
+    start = time.perf_counter()
+    scan_jds = np.linspace(JD_START, JD_END, int(round((JD_END - JD_START) / SCAN_STEP_DAYS)) + 1)
+    scans = {obj: calc_sidereal_positions(scan_jds, obj, AYANAMSA) for obj in GRAHAS}
+    scan_time = time.perf_counter() - start
+
+    tol_days = PRECISION_SECONDS / 86400
+    for obj in GRAHAS:
+        lon, _, speed = scans[obj]
+        for event in EVENTS:
+            found = [e for e in events if e.Object == obj and e.Event == event]
+            jds = np.array([e.JulianDay for e in found])
+            if event == "Station":
+                flips = np.flatnonzero(np.sign(speed[1:]) != np.sign(speed[:-1]))
+                assert len(found) == len(flips), (obj, len(found), len(flips))
+                if len(found):
+                    _, _, before = calc_sidereal_positions(jds - STATION_CHECK_SECONDS / 86400, obj, AYANAMSA)
+                    _, _, after = calc_sidereal_positions(jds + STATION_CHECK_SECONDS / 86400, obj, AYANAMSA)
+                    assert (np.sign(before) != np.sign(after)).all(), obj
+                    assert all(e.To == ("Retrograde" if b > 0 else "Direct") for e, b in zip(found, before))
+                continue
+            idx, names = scan_changes(lon, event)
+            assert len(found) == len(idx), (obj, event, len(found), len(idx))
+            if not len(found):
+                continue
+            assert ((jds >= scan_jds[idx]) & (jds <= scan_jds[idx + 1])).all(), (obj, event)
+            assert [(e.From, e.To) for e in found] == list(zip(names[idx], names[idx + 1])), (obj, event)
+            at, _, rate = calc_sidereal_positions(jds, obj, AYANAMSA)
+            off_edge = np.abs(wrap_degrees(at - np.array([e.LonDecDeg for e in found])))
+            assert (off_edge <= np.abs(rate) * tol_days + 1e-4).all(), (obj, event, off_edge.max())
+    counts = {event: sum(e.Event == event for e in events) for event in EVENTS}
+    print(f"{len(events)} events in 2024 match an hourly swe scan: {counts}")
+    print(f"find_transit_events: {elapsed:.2f} s; hourly scan of the positions alone: {scan_time:.2f} s")
+
+    for typo in (["Sublord"], ["Rasi", "Sign"]):
+        try:
+            find_transit_events(JD_START, JD_END, events=typo)
+            raise AssertionError(f"{typo} should raise ValueError")
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    run_transit_events_tests()
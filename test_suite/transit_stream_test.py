@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+import time
+from vedicastro.transit_stream import SUBSCRIBER_QUEUE_SIZE, TransitStreamHub
+
+"""
+Runs a `TransitStreamHub` with a short tick: many subscribers of nearby locations (same rounded key) share one
+stream, every "full" subscriber gets the very same encoded bytes per tick, a subscriber that never reads keeps
+only the newest `SUBSCRIBER_QUEUE_SIZE` events, and unsubscribing the last queue cancels the stream's task and
+removes its key. The chart update of each tick runs off the event loop's thread. Prints the time to fan out one
+tick.
+"""
+
+TICK_SECONDS = 0.02
+LAT, LON = 12.97, 77.59
+N_SUBSCRIBERS = 200
+
+def event_jd(event: bytes):
+    return json.loads(event.split(b"\ndata: ", 1)[1])["jd"]
+
+async def check_transit_stream():
+    hub = TransitStreamHub(tick_seconds=TICK_SECONDS)
+    subscriptions = [hub.subscribe(LAT + i % 40 * 1e-6, LON, mode="full" if i % 2 else "diff") for i in range(N_SUBSCRIBERS)]
+    key = subscriptions[0][0]
+    assert len(hub.streams) == 1 and all(k == key for k, _ in subscriptions)
+    stream = hub.streams[key]
+    assert stream.n_subscribers() == N_SUBSCRIBERS
+    first_events = [queue.get_nowait() for _, queue in subscriptions]
+    assert all(event is first_events[0] for event in first_events)
+    other_key, other_queue = hub.subscribe(LAT + 1.0, LON)
+    assert len(hub.streams) == 2
+
+    ## Records the thread each tick of the task is computed in
+    advance_threads = set()
+    advance = stream.advance
+    stream.advance = lambda: (advance_threads.add(threading.get_ident()), advance())[1]
+
+    ## The slow subscriber never reads; the others read every tick
+    slow_key, slow = subscriptions[1]
+    readers = [queue for _, queue in subscriptions[3::2]]
+    start_ticks = stream.ticks
+    for _ in range(SUBSCRIBER_QUEUE_SIZE + 10):
+        events = await asyncio.gather(*(queue.get() for queue in readers))
+        assert all(event is events[0] for event in events)
+        for queue in readers:
+            while not queue.empty():
+                queue.get_nowait()
+    assert stream.ticks - start_ticks >= SUBSCRIBER_QUEUE_SIZE + 10
+    assert slow.qsize() == SUBSCRIBER_QUEUE_SIZE
+    slow_jds = [event_jd(slow.get_nowait()) for _ in range(SUBSCRIBER_QUEUE_SIZE)]
+    assert slow_jds == sorted(slow_jds) and slow_jds[0] > event_jd(first_events[0])
+    assert slow_jds[-1] >= stream.live_chart.jd - 2 * TICK_SECONDS / 86400
+    assert advance_threads and threading.get_ident() not in advance_threads
+    print(f"{N_SUBSCRIBERS} subscribers share 1 stream; a slow subscriber keeps the newest {SUBSCRIBER_QUEUE_SIZE} of {stream.ticks} ticks")
+
+    start = time.perf_counter()
+    for _ in range(10):
+        stream.tick()
+    fan_out = (time.perf_counter() - start) / 10
+    print(f"one tick for {N_SUBSCRIBERS} subscribers: {fan_out * 1000:.2f} ms")
+
+    ## The task keeps running until the last subscriber of the key leaves
+    task = stream.task
+    for sub_key, queue in subscriptions[:-1]:
+        hub.unsubscribe(sub_key, queue)
+    await asyncio.sleep(3 * TICK_SECONDS)
+    assert key in hub.streams and not task.done() and stream.n_subscribers() == 1
+    hub.unsubscribe(*subscriptions[-1])
+    await asyncio.sleep(0)
+    assert key not in hub.streams and task.cancelled()
+    assert list(hub.stats()) == [str(other_key)]
+    hub.unsubscribe(key, slow)  # unknown keys are ignored
+    hub.unsubscribe(other_key, other_queue)
+    await asyncio.sleep(0)
+    assert not hub.streams
+    print("unsubscribing the last queue cancels the task and removes the key")
+
+    try:
+        hub.subscribe(LAT, LON, mode="sometimes")
+        raise AssertionError("an unknown mode should raise ValueError")
+    except ValueError:
+        pass
+
+def run_transit_stream_tests():
+    asyncio.run(check_transit_stream())
+
+if __name__ == "__main__":
+    run_transit_stream_tests()
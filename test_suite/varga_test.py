@@ -0,0 +1,133 @@
+import collections
+import time
+import numpy as np
+from vedicastro.kp_divisions import VIMSHOTTARI_LORDS
+from vedicastro.varga import VARGA_NAMES, VARGA_TABLE_COLS, compute_vargas, get_varga_codes, get_varga_data
+from vedicastro.VedicAstro import NAKSHATRAS, RASHIS, SIGN_LORDS
+
+"""
+Validates `varga` against a scalar implementation of the Parashara rules, written per varga from the texts:
+every sign, part and lord of `get_varga_codes` must match for random longitudes, whole degrees and longitudes
+just off the part edges, with the divisional longitude at the same fraction of its 30° sign as the longitude
+is of its part. Also checks known Navamsa placements, the table layout of `compute_vargas` / `get_varga_data`,
+the errors, and times a batch of charts.
+"""
+
+N_RANDOM = 20000
+N_CHARTS, N_OBJECTS = 2000, 22
+MAX_LON_ERROR_DEG = 1e-9
+TRIMSAMSA = {
+    "odd": [(5, "Aries"), (10, "Aquarius"), (18, "Sagittarius"), (25, "Gemini"), (30, "Libra")],
+    "even": [(5, "Taurus"), (12, "Virgo"), (20, "Pisces"), (25, "Capricorn"), (30, "Scorpio")],
+}
+## Known Navamsas: 15.5° Aries (5th part of a movable sign) is Leo, 2° Taurus (fixed, starts at Capricorn) is
+## Capricorn, 29° Gemini (dual, starts at Libra) is Gemini, 0° Cancer is Cancer
+KNOWN_NAVAMSAS = [(15.5, "Leo"), (32.0, "Capricorn"), (89.0, "Gemini"), (90.0, "Cancer")]
+
+def reference_sign_and_fraction(lon, varga):
+    """Divisional sign (0 = Aries) and the position within the part (0 - 1) of one longitude, per the texts"""
+    lon = lon % 360.0
+    sign, deg = int(lon // 30), lon % 30
+    odd, modality = sign % 2 == 0, ["movable", "fixed", "dual"][sign % 3]
+    if varga == "D30":
+        lo = 0
+        for hi, name in TRIMSAMSA["odd" if odd else "even"]:
+            if deg < hi:
+                return RASHIS.index(name), (deg - lo) / (hi - lo)
+            lo = hi
+    n_parts = int(varga[1:])
+    part = int(deg * n_parts // 30)
+    fraction = (deg * n_parts - 30 * part) / 30
+    if varga == "D2":
+        first, second = (4, 3) if odd else (3, 4)  # Sun's hora is Leo, Moon's is Cancer
+        return (first, second)[part], fraction
+    if varga in ("D1", "D12", "D60"):
+        start = sign
+    elif varga == "D3":
+        return (sign + 4 * part) % 12, fraction  # the sign, its 5th and its 9th
+    elif varga == "D4":
+        return (sign + 3 * part) % 12, fraction  # the sign, its 4th, 7th and 10th
+    elif varga == "D7":
+        start = sign if odd else sign + 6
+    elif varga == "D9":
+        start = {"movable": sign, "fixed": sign + 8, "dual": sign + 4}[modality]
+    elif varga == "D10":
+        start = sign if odd else sign + 8
+    elif varga in ("D16", "D45"):
+        start = {"movable": 0, "fixed": 4, "dual": 8}[modality]
+    elif varga == "D20":
+        start = {"movable": 0, "fixed": 8, "dual": 4}[modality]
+    elif varga == "D24":
+        start = 4 if odd else 3
+    elif varga == "D27":
+        start = [0, 3, 6, 9][sign % 4]  # fiery signs from Aries, earthy from Cancer, airy from Libra, watery from Capricorn
+    elif varga == "D40":
+        start = 0 if odd else 6
+    return (start + part) % 12, fraction
+
+def check_against_reference(lons):
+    for varga in VARGA_NAMES:
+        codes = get_varga_codes(lons, varga)
+        expected = [reference_sign_and_fraction(lon, varga) for lon in lons]
+        signs = np.array([sign for sign, _ in expected])
+        assert (codes["Rasi"] == signs).all(), (varga, lons[codes["Rasi"] != signs][:5])
+        varga_lon = signs * 30.0 + np.array([fraction for _, fraction in expected]) * 30.0
+        assert np.abs(codes["LonDecDeg"] - varga_lon).max() < MAX_LON_ERROR_DEG, varga
+        assert [SIGN_LORDS[s] for s in signs] == [VIMSHOTTARI_LORDS[code] for code in codes["RasiLord"]], varga
+        assert (codes["Nakshatra"] == (varga_lon // (360 / 27)).astype(int)).all(), varga
+        assert (codes["NakshatraLord"] == codes["Nakshatra"] % 9).all(), varga
+
+def run_varga_tests():
+    rng = np.random.default_rng(7)
+    check_against_reference(rng.uniform(0, 360, N_RANDOM))
+    ## A hair to either side of every part edge of every varga (an edge that is not a whole degree can round either way),
+    ## and the whole degrees themselves
+    edges = np.unique(np.concatenate([np.arange(0, 360, 30 / n) for n in range(1, 61)] +
+                                     [s * 30 + np.array([5, 10, 12, 18, 20, 25]) for s in range(12)]))
+    edge_lons = np.concatenate([np.arange(360.0), edges + 1e-7, (edges - 1e-7) % 360])
+    check_against_reference(edge_lons)
+    print(f"{len(VARGA_NAMES)} vargas match the Parashara rules for {N_RANDOM} random and {edge_lons.size} edge longitudes")
+
+    navamsa = get_varga_codes([lon for lon, _ in KNOWN_NAVAMSAS], "D9")
+    assert [RASHIS[s] for s in navamsa["Rasi"]] == [sign for _, sign in KNOWN_NAVAMSAS]
+    assert get_varga_codes(360.0, "D9")["Rasi"] == 0 and get_varga_codes(359.9, "D1")["Nakshatra"] == 26
+
+    ## One chart: rows in varga then object order, names decoded
+    Row = collections.namedtuple("Row", ["Object", "LonDecDeg"])
+    planets = [Row("Asc", 15.5), Row("Sun", 32.0), Row("Moon", 89.0)]
+    houses = [Row("I", 15.5), Row("II", 47.25)]
+    table = get_varga_data(planets, houses, ["D9", "D1"])
+    assert table.columns == VARGA_TABLE_COLS and table.height == 10
+    assert table["Varga"].to_list() == ["D9"] * 5 + ["D1"] * 5
+    assert table["Object"].to_list() == ["Asc", "Sun", "Moon", "I", "II"] * 2
+    assert table["Rasi"].to_list()[:3] == ["Leo", "Capricorn", "Gemini"]
+    assert table.filter(table["Varga"] == "D1")["LonDecDeg"].to_list() == [15.5, 32.0, 89.0, 15.5, 47.25]
+    assert set(table["Nakshatra"]) <= set(NAKSHATRAS)
+    assert get_varga_data(planets)["Varga"].unique(maintain_order=True).to_list() == list(VARGA_NAMES)
+
+    ## A batch equals the charts taken one at a time
+    lons = rng.uniform(0, 360, (N_CHARTS, N_OBJECTS))
+    objects = [f"obj{i}" for i in range(N_OBJECTS)]
+    start = time.perf_counter()
+    batch = compute_vargas(lons, objects)
+    elapsed = time.perf_counter() - start
+    assert batch.columns == ["ChartIndex"] + VARGA_TABLE_COLS
+    assert batch.height == N_CHARTS * len(VARGA_NAMES) * N_OBJECTS
+    for idx in (0, N_CHARTS - 1):
+        assert batch.filter(batch["ChartIndex"] == idx).drop("ChartIndex").equals(compute_vargas(lons[idx], objects))
+    print(f"{N_CHARTS} charts x {N_OBJECTS} objects x {len(VARGA_NAMES)} vargas: {batch.height} rows in {elapsed:.2f} s")
+
+    for args in [([10.0], "D5"), ([10.0], "Navamsa")]:
+        try:
+            get_varga_codes(*args)
+            raise AssertionError(f"{args} should raise ValueError")
+        except ValueError:
+            pass
+    try:
+        compute_vargas([10.0, 20.0], ["Sun"])
+        raise AssertionError("mismatched object names should raise ValueError")
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    run_varga_tests()
@@ -2,7 +2,8 @@ from flatlib import const, aspects
 from flatlib.chart import Chart
 from flatlib.geopos import GeoPos
 from flatlib.datetime import Datetime
-from flatlib.object import GenericObject
+from flatlib.object import GenericObject, Object
+from flatlib.lists import ObjectList
 from timezonefinder import TimezoneFinder
 import polars as pl
 from datetime import datetime
@@ -12,9 +13,12 @@ from .utils import (
     clean_select_objects_split_str,
     dms_to_decdeg,
     get_utc_offset,
+    get_local_time,
     compute_new_date,
     calculate_pada_from_zodiac,
 )
+from .ephemeris import GRAHAS, SWE_BACKEND_FLAGS, calc_sidereal_positions, resolve_ephemeris_backend
+from .timezones import UNIX_EPOCH_JD
 
 logger = logging.getLogger(__name__)
 
@@ -130,6 +134,12 @@ ASPECT_MAPPING = {
     const.QUINCUNX: "Quincunx",
 }
 
+## Names used in the planets data tables that differ from the flatlib object IDs
+FLATLIB_OBJECT_IDS = {
+    "Rahu": const.NORTH_NODE,
+    "Ketu": const.SOUTH_NODE,
+}
+
 # Columns names for NamedTuple Collections / Final Output DataFrames
 HOUSES_TABLE_COLS = [
     "Object",
@@ -177,6 +187,8 @@ class VedicHoroscopeData:
         tz: str = None,
         ayanamsa: str = "Krishnamurti",
         house_system: str = "Placidus",
+        ephemeris_cache=None,
+        ephemeris_backend: str = None,
     ):
         """
         Generates Planetary and House Positions Data for a time and place input.
@@ -194,7 +206,25 @@ class VedicHoroscopeData:
         time_zone: timezone input to generate chart, str  (Eg: America/New_York)
         ayanamsa: ayanamsa input to generate chart, str
         house: House System to generate chart,
+        ephemeris_cache: optional `EphemerisCache` (or path to its `.npy` file) used for the graha positions
+        ephemeris_backend: source of the graha positions, one of `EPHEMERIS_BACKENDS` ("swiss", "moshier", "cache") or a
+            `PRECISION_TIERS` name; defaults to "cache" when an ephemeris_cache is given, else "swiss". A date outside
+            the cache's range is computed with "swiss" and logs a warning; `chart_backend` records the backend that
+            built the last chart
         """
+        time_zone = tz if tz else TimezoneFinder().timezone_at(lat=latitude, lng=longitude)
+        chart_time = datetime(year, month, day, hour, minute)
+        utc, _ = get_utc_offset(time_zone, chart_time)
+        self._initialize(
+            year, month, day, hour, minute, second, latitude, longitude, time_zone, utc, chart_time, None,
+            ayanamsa, house_system, ephemeris_cache, ephemeris_backend,
+        )
+
+    def _initialize(
+        self, year, month, day, hour, minute, second, latitude, longitude, time_zone, utc, chart_time, jd,
+        ayanamsa, house_system, ephemeris_cache, ephemeris_backend,
+    ):
+        """Sets the attributes shared by the default constructor and `from_jd`"""
         self.year = year
         self.month = month
         self.day = day
@@ -205,15 +235,80 @@ class VedicHoroscopeData:
         self.longitude = longitude
         self.ayanamsa = ayanamsa
         self.house_system = house_system
-        self.time_zone = (
-            tz
-            if tz
-            else TimezoneFinder().timezone_at(lat=self.latitude, lng=self.longitude)
-        )
-        self.chart_time = datetime(
-            self.year, self.month, self.day, self.hour, self.minute
+        self.time_zone = time_zone
+        self.chart_time = chart_time
+        self.utc = utc
+        ## Set by `from_jd` / `from_timestamp`, which build the chart from the Julian day directly
+        self.jd = jd
+        self._set_ephemeris_cache(ephemeris_cache)
+        self._set_ephemeris_backend(ephemeris_backend)
+        ## Backend that built the last chart; differs from `ephemeris_backend` when the cache does not cover the date
+        self.chart_backend = None
+
+    @classmethod
+    def from_jd(
+        cls,
+        jd_ut: float,
+        latitude: float,
+        longitude: float,
+        tz: str = None,
+        ayanamsa: str = "Krishnamurti",
+        house_system: str = "Placidus",
+        ephemeris_cache=None,
+        ephemeris_backend: str = None,
+    ):
+        """
+        Generates Planetary and House Positions Data for a Julian day (UT) and place input, without the timezone
+        lookup and the calendar / offset string round trip of the default constructor.
+
+        Parameters
+        ==========
+        jd_ut: Julian day in UT, float (fractions of a second are kept)
+        latitude: latitude, float
+        longitude: longitude, float
+        tz: timezone (Eg: America/New_York) or UTC offset (Eg: +05:30) used only for the local calendar fields
+            (dasa dates, transit timestamps); defaults to UTC
+        ayanamsa, house_system, ephemeris_cache, ephemeris_backend: as for `VedicHoroscopeData`
+        """
+        time_zone = tz or "UTC"
+        local_time, utc = get_local_time(jd_ut, time_zone)
+        horoscope = cls.__new__(cls)
+        horoscope._initialize(
+            local_time.year, local_time.month, local_time.day, local_time.hour, local_time.minute,
+            local_time.second + local_time.microsecond / 1_000_000, latitude, longitude, time_zone, utc,
+            local_time.replace(second=0, microsecond=0), jd_ut, ayanamsa, house_system, ephemeris_cache,
+            ephemeris_backend,
         )
-        self.utc, _ = get_utc_offset(self.time_zone, self.chart_time)
+        return horoscope
+
+    @classmethod
+    def from_timestamp(cls, timestamp, latitude: float, longitude: float, tz: str = None, **kwargs):
+        """
+        Same as `from_jd`, for a Unix timestamp (seconds since 1970-01-01 UTC, float) or a timezone aware `datetime`.
+        """
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is None:
+                raise ValueError("from_timestamp needs a timezone aware datetime; use the default constructor for local times")
+            timestamp = timestamp.timestamp()
+        return cls.from_jd(UNIX_EPOCH_JD + timestamp / 86400.0, latitude, longitude, tz, **kwargs)
+
+    def _set_ephemeris_cache(self, ephemeris_cache):
+        if isinstance(ephemeris_cache, str):
+            from .ephemeris_cache import EphemerisCache
+
+            ephemeris_cache = EphemerisCache(ephemeris_cache)
+        if ephemeris_cache is not None and ephemeris_cache.ayanamsa != self.ayanamsa:
+            raise ValueError(
+                f"Ephemeris cache was built for '{ephemeris_cache.ayanamsa}' ayanamsa, not '{self.ayanamsa}'"
+            )
+        self.ephemeris_cache = ephemeris_cache
+
+    def _set_ephemeris_backend(self, ephemeris_backend: str):
+        if ephemeris_backend is None:
+            ephemeris_backend = "cache" if self.ephemeris_cache is not None else "swiss"
+        self.ephemeris_backend = resolve_ephemeris_backend(ephemeris_backend)
+        if self.ephemeris_backend == "cache" and self.ephemeris_cache is None:
+            raise ValueError("The 'cache' ephemeris backend needs an ephemeris_cache")
 
     def get_ayanamsa(self):
         """Returns an Ayanamsa System from flatlib.sidereal library, based on user input"""
@@ -223,14 +318,32 @@ class VedicHoroscopeData:
         """Returns an House System from flatlib.sidereal library, based on user input"""
         return HOUSE_SYSTEM_MAPPING.get(self.house_system, None)
 
-    def generate_chart(self):
-        """Generates a `flatlib.Chart` object for the given time and location data"""
-        date = Datetime(
+    def get_datetime(self):
+        """Returns the `flatlib.Datetime` of the chart"""
+        if self.jd is not None:
+            return Datetime.fromJD(self.jd, self.utc)
+        return Datetime(
             [self.year, self.month, self.day],
             ["+", self.hour, self.minute, self.second],
             self.utc,
         )
+
+    def generate_chart(self):
+        """Generates a `flatlib.Chart` object for the given time and location data"""
+        date = self.get_datetime()
         geopos = GeoPos(self.latitude, self.longitude)
+        self.chart_backend = self.ephemeris_backend
+        if self.ephemeris_backend == "cache":
+            if self.ephemeris_cache.covers(date.jd):
+                return self.generate_chart_from_cache(date, geopos)
+            logger.warning(
+                "JD %.5f is outside the ephemeris cache (JD %.1f - %.1f); computing the chart with swe instead",
+                date.jd, self.ephemeris_cache.jd_start, self.ephemeris_cache.jd_end,
+            )
+            self.chart_backend = "swiss"
+        if self.ephemeris_backend == "moshier":
+            moshier_positions = lambda obj, jd: calc_sidereal_positions(jd, obj, self.ayanamsa, SWE_BACKEND_FLAGS["moshier"])
+            return self.generate_chart_from_positions(date, geopos, GRAHAS, moshier_positions)
         chart = Chart(
             date,
             geopos,
@@ -240,6 +353,83 @@ class VedicHoroscopeData:
         )
         return chart
 
+    def generate_chart_from_cache(self, date: Datetime, geopos: GeoPos):
+        """
+        Generates a `flatlib.Chart` object whose graha positions come from the ephemeris cache.
+        Houses, angles and the objects not held in the cache (Chiron, Syzygy, Pars Fortuna) are still computed by flatlib.
+        """
+        return self.generate_chart_from_positions(date, geopos, self.ephemeris_cache.objects, self.ephemeris_cache.positions)
+
+    def generate_chart_from_positions(self, date: Datetime, geopos: GeoPos, objects: list, positions_func):
+        """
+        Generates a `flatlib.Chart` object whose positions of `objects` (graha names) come from
+        `positions_func(obj, jd) -> (lon, lat, speed)` in sidereal degrees. Houses, angles and the other objects
+        are still computed by flatlib.
+        """
+        given_ids = {
+            FLATLIB_OBJECT_IDS.get(obj, obj): obj for obj in objects
+        }
+        chart = Chart(
+            date,
+            geopos,
+            IDs=[obj_id for obj_id in const.LIST_OBJECTS if obj_id not in given_ids],
+            hsys=self.get_house_system(),
+            mode=self.get_ayanamsa(),
+        )
+        objects = []
+        for obj_id in const.LIST_OBJECTS:
+            if obj_id not in given_ids:
+                objects.append(chart.objects.get(obj_id))
+                continue
+            lon, lat, speed = positions_func(given_ids[obj_id], date.jd)
+            lon = float(lon)
+            objects.append(
+                Object.fromDict(
+                    {
+                        "id": obj_id,
+                        "lon": lon,
+                        "lat": float(lat),
+                        "lonspeed": float(speed),
+                        "latspeed": 0.0,
+                        "sign": const.LIST_SIGNS[int(lon // 30) % 12],
+                        "signlon": lon % 30,
+                    }
+                )
+            )
+        chart.objects = ObjectList(objects)
+        return chart
+
+    def get_chart_variants(self, ayanamsas: list = None, house_systems: list = None):
+        """
+        Returns the graha and cusp positions of this moment under several ayanamsas and house systems as one
+        stacked polars DataFrame, from a single ephemeris evaluation (see `chart_variants.compute_chart_variants`).
+        ayanamsas / house_systems default to all the entries of `AYANAMSA_MAPPING` / `HOUSE_SYSTEM_MAPPING`.
+        """
+        from .chart_variants import compute_chart_variants
+
+        return compute_chart_variants(self.get_datetime().jd, self.latitude, self.longitude, ayanamsas, house_systems)
+
+    def get_rectification_segments(self, window_minutes: float = 120.0, level: str = "SubSubLord"):
+        """
+        Returns the segments of constant cusp lords within `window_minutes` of the birth time, each with the rasi,
+        star, sub (and sub-sub) lords of all 12 cusps, as a polars DataFrame (see `rectification.find_rectification_segments`).
+        """
+        from .rectification import find_rectification_segments
+
+        return find_rectification_segments(
+            self.get_datetime().jd, self.latitude, self.longitude, self.time_zone, window_minutes, level,
+            self.house_system, self.ayanamsa,
+        )
+
+    def get_snapshot(self, chart: Chart = None):
+        """
+        Returns a compact `chart_snapshot.ChartSnapshot` of the chart (generated when not passed in), holding the
+        positions, cusps and lords in fixed-size arrays, with the planets / houses data tables as lazy views.
+        """
+        from .chart_snapshot import ChartSnapshot
+
+        return ChartSnapshot.from_chart(self, chart or self.generate_chart())
+
     def get_planetary_aspects(self, chart: Chart):
         """Computes planetary aspects using flatlib modules getAspect"""
         planets = [
@@ -516,14 +706,35 @@ class VedicHoroscopeData:
                     break
             i += 1
 
-    def get_transit_details(self):
+    def get_transit_details(self, jd_ut: float = None, timestamp=None):
         """
-        Captures the rl_nl_sl transit data for all planets at the current chart time.
+        Captures the rl_nl_sl transit data for all planets at the current chart time, or at another moment for
+        the same place and settings.
+
+        Parameters
+        ==========
+        jd_ut: Julian day (UT) of the transit moment, float; the chart is built with `from_jd`
+        timestamp: Unix timestamp or timezone aware `datetime` of the transit moment, built with `from_timestamp`
 
         Returns
         =======
         A named tuple collection containing the transit details for all planets.
         """
+        if jd_ut is not None and timestamp is not None:
+            raise ValueError("Pass either jd_ut or timestamp, not both")
+        if jd_ut is not None or timestamp is not None:
+            settings = {
+                "latitude": self.latitude,
+                "longitude": self.longitude,
+                "tz": self.time_zone,
+                "ayanamsa": self.ayanamsa,
+                "house_system": self.house_system,
+                "ephemeris_cache": self.ephemeris_cache,
+                "ephemeris_backend": self.ephemeris_backend,
+            }
+            transit = self.from_jd(jd_ut, **settings) if jd_ut is not None else self.from_timestamp(timestamp, **settings)
+            return transit.get_transit_details()
+
         # Define the named tuple for transit details
         TransitDetails = collections.namedtuple(
             "TransitDetails",
@@ -541,7 +752,7 @@ class VedicHoroscopeData:
         )
         chart = self.generate_chart()
         transit_data = []
-        timestamp = f"{self.year}-{self.month:02d}-{self.day:02d} {self.hour:02d}:{self.minute:02d}:00"
+        timestamp = f"{self.year}-{self.month:02d}-{self.day:02d} {self.hour:02d}:{self.minute:02d}:{int(self.second):02d}"
         for planet in chart.objects:
             if planet.id not in ["Chiron", "Syzygy", "Pars Fortuna"]:
                 planet_name = clean_select_objects_split_str(str(planet))[0]
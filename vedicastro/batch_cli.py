@@ -0,0 +1,261 @@
+"""
+Multi-core batch pipeline: birth records from CSV / Parquet in, chart tables out as Parquet.
+
+    python -m vedicastro.batch_cli births.csv out_dir --workers 8
+
+The input is read in chunks of `--chunk-size` records. Each chunk is sorted by date, so that nearby
+instants are computed together, and split into one contiguous shard per worker process. Workers keep
+their warm state (timezone finder, ephemeris cache) between shards. Every chunk is written as one
+Parquet part per table (planets, houses, planet/house significators, dasas, errors), and the
+`manifest.json` in the output directory records the finished chunks, so an interrupted run resumes
+where it stopped when started again with the same arguments.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import polars as pl
+from tqdm import tqdm
+from .VedicAstro import VedicHoroscopeData
+
+logger = logging.getLogger(__name__)
+
+## Input columns; `tz` and `id` are optional (the timezone is then looked up from lat/lon, the id is the row number)
+INPUT_COLS = ["year", "month", "day", "hour", "minute", "second", "latitude", "longitude"]
+OUTPUT_TABLES = ["planets", "houses", "planet_significators", "house_significators", "dasas", "errors"]
+MANIFEST_FILE = "manifest.json"
+
+## Per worker process state, set up once by `_init_worker`
+_WORKER_STATE = {}
+
+
+def _init_worker(ayanamsa: str, house_system: str, ephemeris_cache_path: str = None):
+    from timezonefinder import TimezoneFinder
+
+    state = {"ayanamsa": ayanamsa, "house_system": house_system, "tz_finder": TimezoneFinder(), "ephemeris_cache": None}
+    if ephemeris_cache_path:
+        from .ephemeris_cache import EphemerisCache
+
+        state["ephemeris_cache"] = EphemerisCache(ephemeris_cache_path)
+    _WORKER_STATE.update(state)
+
+
+def _dasa_rows(chart_id, dasa_table: dict):
+    return [
+        (chart_id, dasa, dasa_data["start"], dasa_data["end"], bhukti, bhukti_data["start"], bhukti_data["end"])
+        for dasa, dasa_data in dasa_table.items()
+        for bhukti, bhukti_data in dasa_data["bhuktis"].items()
+    ]
+
+
+def process_records(records: list):
+    """
+    Computes the chart tables for a list of birth record dicts (runs inside a worker process).
+
+    Returns:
+    - dict of table name -> list of row dicts, each row starting with its ChartId
+    """
+    if not _WORKER_STATE:
+        _init_worker("Krishnamurti", "Placidus")
+    state = _WORKER_STATE
+    tables = {name: [] for name in OUTPUT_TABLES}
+    for record in records:
+        chart_id = record["ChartId"]
+        try:
+            tz = record.get("tz") or state["tz_finder"].timezone_at(lat=record["latitude"], lng=record["longitude"])
+            horoscope = VedicHoroscopeData(
+                *(record[col] for col in INPUT_COLS),
+                tz=tz,
+                ayanamsa=state["ayanamsa"],
+                house_system=state["house_system"],
+                ephemeris_cache=state["ephemeris_cache"],
+            )
+            chart = horoscope.generate_chart()
+            planets_data = horoscope.get_planets_data_from_chart(chart)
+            houses_data = horoscope.get_houses_data_from_chart(chart)
+            planet_significators = horoscope.get_planet_wise_significators(planets_data, houses_data)
+            house_significators = horoscope.get_house_wise_significators(planets_data, houses_data)
+            dasa_table = horoscope.compute_vimshottari_dasa(chart)
+        except Exception as e:
+            tables["errors"].append({"ChartId": chart_id, "Error": f"{type(e).__name__}: {e}"})
+            continue
+        for name, rows in [
+            ("planets", planets_data),
+            ("houses", houses_data),
+            ("planet_significators", planet_significators),
+            ("house_significators", house_significators),
+        ]:
+            tables[name].extend({"ChartId": chart_id, **row._asdict()} for row in rows)
+        tables["dasas"].extend(
+            dict(zip(["ChartId", "Dasa", "DasaStart", "DasaEnd", "Bhukti", "BhuktiStart", "BhuktiEnd"], row))
+            for row in _dasa_rows(chart_id, dasa_table)
+        )
+    return tables
+
+
+def iter_record_chunks(input_path: str, chunk_size: int, id_column: str = None):
+    """Yields the input records as polars DataFrames of at most `chunk_size` rows, with a `ChartId` column"""
+    scan = pl.scan_parquet(input_path) if input_path.endswith(".parquet") else pl.scan_csv(input_path)
+    if hasattr(scan, "collect_batches"):
+        batches = scan.collect_batches(chunk_size=chunk_size)
+    else:
+        n_rows = scan.select(pl.len()).collect().item()
+        batches = (scan.slice(offset, chunk_size).collect() for offset in range(0, n_rows, chunk_size))
+
+    offset = 0
+    pending = None
+    for batch in batches:
+        ## Batches are only approximately `chunk_size` long; re-slice so chunk numbers stay stable across runs
+        pending = batch if pending is None else pl.concat([pending, batch], how="diagonal_relaxed")
+        while pending.height >= chunk_size:
+            chunk, pending = pending.head(chunk_size), pending.slice(chunk_size)
+            yield _with_chart_id(chunk, offset, id_column)
+            offset += chunk_size
+    if pending is not None and pending.height:
+        yield _with_chart_id(pending, offset, id_column)
+
+
+def _with_chart_id(chunk: pl.DataFrame, offset: int, id_column: str = None):
+    missing = [col for col in INPUT_COLS if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Input is missing the columns {missing}")
+    if id_column:
+        return chunk.with_columns(pl.col(id_column).alias("ChartId"))
+    return chunk.with_columns(pl.int_range(offset, offset + chunk.height).alias("ChartId"))
+
+
+def _load_manifest(output_dir: str, run_config: dict):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"config": run_config, "completed_chunks": [], "charts": 0, "errors": 0, "elapsed_seconds": 0.0}
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest["config"] != run_config:
+        raise ValueError(f"{path} was written with different settings {manifest['config']}; use a new output directory")
+    return manifest
+
+
+def _save_manifest(output_dir: str, manifest: dict):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _write_part(output_dir: str, table: str, chunk_nr: int, rows: list):
+    if not rows:
+        return
+    table_dir = os.path.join(output_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+    path = os.path.join(table_dir, f"part-{chunk_nr:05d}.parquet")
+    pl.DataFrame(rows, infer_schema_length=None).write_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def run_batch(
+    input_path: str,
+    output_dir: str,
+    workers: int = None,
+    chunk_size: int = 5000,
+    ayanamsa: str = "Krishnamurti",
+    house_system: str = "Placidus",
+    id_column: str = None,
+    ephemeris_cache_path: str = None,
+):
+    """
+    Computes the chart tables of every record of `input_path` into Parquet parts under `output_dir`.
+
+    Returns:
+    - the manifest dict, including the number of charts, errors and the throughput
+    """
+    workers = workers or os.cpu_count()
+    os.makedirs(output_dir, exist_ok=True)
+    run_config = {
+        "input_path": os.path.abspath(input_path),
+        "chunk_size": chunk_size,
+        "ayanamsa": ayanamsa,
+        "house_system": house_system,
+        "id_column": id_column,
+        ## Charts from the cache differ from direct swe ones within its error bounds, so a resume must use the same cache
+        "ephemeris_cache_path": os.path.abspath(ephemeris_cache_path) if ephemeris_cache_path else None,
+    }
+    manifest = _load_manifest(output_dir, run_config)
+    completed = set(manifest["completed_chunks"])
+
+    start = time.perf_counter()
+    charts_this_run = 0
+    ## Spawned, not forked: polars' thread pool does not survive a fork once it has been used in the parent
+    ## (reading the input, writing the parts); the workers build their state in `_init_worker` either way
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(ayanamsa, house_system, ephemeris_cache_path),
+    ) as executor, tqdm(desc="Charts", unit="chart") as progress:
+        for chunk_nr, chunk in enumerate(iter_record_chunks(input_path, chunk_size, id_column)):
+            if chunk_nr in completed:
+                progress.update(chunk.height)
+                continue
+            ## Sort by date for ephemeris locality, then give each worker one contiguous shard
+            records = chunk.sort(["year", "month", "day", "hour", "minute"]).to_dicts()
+            shard_size = -(-len(records) // workers)
+            shards = [records[i : i + shard_size] for i in range(0, len(records), shard_size)]
+
+            tables = {name: [] for name in OUTPUT_TABLES}
+            for shard_tables in executor.map(process_records, shards):
+                for name, rows in shard_tables.items():
+                    tables[name].extend(rows)
+            for name, rows in tables.items():
+                _write_part(output_dir, name, chunk_nr, rows)
+
+            charts_this_run += len(records)
+            manifest["completed_chunks"].append(chunk_nr)
+            manifest["charts"] += len(records) - len(tables["errors"])
+            manifest["errors"] += len(tables["errors"])
+            _save_manifest(output_dir, manifest)
+            progress.update(len(records))
+
+    elapsed = time.perf_counter() - start
+    manifest["elapsed_seconds"] += elapsed
+    manifest["workers"] = workers
+    manifest["last_run"] = {
+        "charts": charts_this_run,
+        "seconds": round(elapsed, 3),
+        "charts_per_sec": round(charts_this_run / elapsed, 2) if elapsed else None,
+        "charts_per_sec_per_core": round(charts_this_run / elapsed / workers, 2) if elapsed else None,
+    }
+    _save_manifest(output_dir, manifest)
+    logger.info("Batch run: %s", manifest["last_run"])
+    return manifest
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Compute chart tables for a CSV / Parquet file of birth records")
+    parser.add_argument("input_path", help=f"CSV or Parquet file with the columns {INPUT_COLS} and optionally `tz`")
+    parser.add_argument("output_dir", help="Directory for the Parquet parts and the manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--ayanamsa", default="Krishnamurti")
+    parser.add_argument("--house-system", default="Placidus")
+    parser.add_argument("--id-column", default=None, help="Input column to use as ChartId (default: the row number)")
+    parser.add_argument("--ephemeris-cache", default=None, help="Path of an `EphemerisCache` .npy file")
+    args = parser.parse_args(argv)
+
+    manifest = run_batch(
+        args.input_path, args.output_dir, args.workers, args.chunk_size,
+        args.ayanamsa, args.house_system, args.id_column, args.ephemeris_cache,
+    )
+    run = manifest["last_run"]
+    print(
+        f"{run['charts']} charts in {run['seconds']} s: {run['charts_per_sec']} charts/sec, "
+        f"{run['charts_per_sec_per_core']} charts/sec/core ({manifest['workers']} workers), "
+        f"{manifest['errors']} errors in total"
+    )
+
+
+if __name__ == "__main__":
+    main()
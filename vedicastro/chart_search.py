@@ -0,0 +1,188 @@
+"""
+Indexed search over stored chart collections.
+
+`ChartTable` keeps one column per (object, field) pair of the planets / houses data tables, eg:
+"Moon.Nakshatra" or "House7.SubLord", one row per chart. Rasi, nakshatra and lord columns are
+dictionary encoded as uint8 codes and get a bitmap index (one packed bit array per code) the
+first time they are queried; numeric columns get a sorted index for range predicates.
+A query is then a handful of bitwise ANDs over packed bit arrays, ie: a few milliseconds
+even for millions of charts.
+"""
+
+import numpy as np
+import polars as pl
+from .kp_divisions import VIMSHOTTARI_LORDS
+from .VedicAstro import RASHIS, NAKSHATRAS
+
+## Dictionaries of the encoded columns, by field name of the planets / houses data tables
+CATEGORY_DICTIONARIES = {
+    "Rasi": RASHIS,
+    "Nakshatra": NAKSHATRAS,
+    "RasiLord": VIMSHOTTARI_LORDS,
+    "NakshatraLord": VIMSHOTTARI_LORDS,
+    "SubLord": VIMSHOTTARI_LORDS,
+    "SubSubLord": VIMSHOTTARI_LORDS,
+}
+## Numeric columns are stored as float32, NaN when missing
+NUMERIC_FIELDS = ["LonDecDeg", "HouseNr"]
+MISSING_CODE = 255
+
+
+def _column_key(obj: str, field: str):
+    return f"{obj}.{field}"
+
+
+def _house_object(house_nr):
+    return f"House{house_nr}"
+
+
+def _encode(field: str, values):
+    lookup = {name: code for code, name in enumerate(CATEGORY_DICTIONARIES[field])}
+    return np.array([lookup.get(value, MISSING_CODE) for value in values], dtype=np.uint8)
+
+
+class ChartTable:
+    def __init__(self, columns: dict, chart_ids=None):
+        """
+        Columnar, indexed table of many charts.
+
+        Parameters
+        ==========
+        columns: dict of "Object.Field" -> NumPy array, one entry per chart. Categorical columns hold
+                 the uint8 codes into `CATEGORY_DICTIONARIES[Field]` (255 when missing)
+        chart_ids: optional array of chart identifiers, defaults to the row numbers
+        """
+        self.columns = columns
+        self.n_rows = len(next(iter(columns.values()))) if columns else 0
+        self.chart_ids = np.arange(self.n_rows) if chart_ids is None else np.asarray(chart_ids)
+        self._bitmaps = {}
+        self._sorted = {}
+
+    @classmethod
+    def from_charts(cls, charts, chart_ids=None):
+        """
+        Builds the table from an iterable of (planets_data, houses_data) pairs, as returned by
+        `get_planets_data_from_chart` and `get_houses_data_from_chart` (houses_data may be None).
+        """
+        raw = {}
+        n_charts = 0
+        for planets_data, houses_data in charts:
+            rows = [(planet.Object, planet) for planet in planets_data]
+            rows += [(_house_object(house.HouseNr), house) for house in houses_data or []]
+            for obj, row in rows:
+                for field in row._fields:
+                    if field in CATEGORY_DICTIONARIES or field in NUMERIC_FIELDS:
+                        raw.setdefault(_column_key(obj, field), [None] * n_charts).append(getattr(row, field))
+            n_charts += 1
+            for values in raw.values():
+                values.extend([None] * (n_charts - len(values)))
+        return cls(cls._encode_columns(raw), chart_ids)
+
+    @classmethod
+    def from_frames(cls, planets_df: pl.DataFrame, houses_df: pl.DataFrame = None, chart_id_col: str = "ChartId"):
+        """
+        Builds the table from long polars DataFrames of stacked planets / houses data tables,
+        with one extra `chart_id_col` column telling which chart each row belongs to.
+        """
+        frames = [planets_df.with_columns(pl.col("Object").cast(pl.Utf8))]
+        if houses_df is not None:
+            frames.append(houses_df.with_columns(pl.format("House{}", pl.col("HouseNr")).alias("Object")))
+        chart_ids = pl.concat([frame.select(chart_id_col) for frame in frames]).unique(maintain_order=True)[chart_id_col]
+        raw = {}
+        for frame in frames:
+            fields = [col for col in frame.columns if col in CATEGORY_DICTIONARIES or col in NUMERIC_FIELDS]
+            for (obj,), group in frame.group_by(["Object"]):
+                aligned = pl.DataFrame({chart_id_col: chart_ids}).join(group, on=chart_id_col, how="left")
+                for field in fields:
+                    raw[_column_key(obj, field)] = aligned[field].to_list()
+        return cls(cls._encode_columns(raw), chart_ids.to_numpy())
+
+    @staticmethod
+    def _encode_columns(raw: dict):
+        columns = {}
+        for key, values in raw.items():
+            field = key.split(".", 1)[1]
+            if field in CATEGORY_DICTIONARIES:
+                columns[key] = _encode(field, values)
+            else:
+                columns[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float32)
+        return columns
+
+    def save(self, path: str):
+        """Saves the columns and chart ids to a `.npz` file"""
+        np.savez(path, __chart_ids__=self.chart_ids, **self.columns)
+
+    @classmethod
+    def load(cls, path: str):
+        """Loads a table saved with `save`"""
+        with np.load(path, allow_pickle=False) as data:
+            columns = {key: data[key] for key in data.files if key != "__chart_ids__"}
+            return cls(columns, data["__chart_ids__"])
+
+    def _bitmap(self, key: str, code: int):
+        """Packed bit array of the rows where categorical column `key` equals `code`, built on first use"""
+        if key not in self._bitmaps:
+            column = self.columns[key]
+            self._bitmaps[key] = {int(c): np.packbits(column == c) for c in np.unique(column)}
+        empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        return self._bitmaps[key].get(code, empty)
+
+    def _range_bitmap(self, key: str, low, high):
+        """Packed bit array of the rows where numeric column `key` lies within [low, high]"""
+        if key not in self._sorted:
+            order = np.argsort(self.columns[key], kind="stable")
+            self._sorted[key] = (order, self.columns[key][order])
+        order, sorted_values = self._sorted[key]
+        start = np.searchsorted(sorted_values, low, side="left")
+        stop = np.searchsorted(sorted_values, high, side="right")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def _predicate_bitmap(self, key: str, value):
+        if key not in self.columns:
+            raise KeyError(f"Unknown column '{key}'. Columns look like 'Moon.Nakshatra' or 'House7.SubLord'")
+        field = key.split(".", 1)[1]
+        if field in CATEGORY_DICTIONARIES:
+            names = [value] if isinstance(value, str) else list(value)
+            dictionary = CATEGORY_DICTIONARIES[field]
+            unknown = [name for name in names if name not in dictionary]
+            if unknown:
+                raise ValueError(f"Unknown {field} value(s) {unknown}")
+            bitmap = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for name in names:
+                bitmap |= self._bitmap(key, dictionary.index(name))
+            return bitmap
+        low, high = value if isinstance(value, tuple) else (value, value)
+        return self._range_bitmap(key, low, high)
+
+    def query(self, predicates: dict):
+        """
+        Returns the ids of the charts matching all predicates.
+
+        Parameters:
+        - predicates: dict of column -> value, where value is a name (equality), a list / set of names
+          (any of) for categorical columns, or a number / (low, high) tuple for numeric columns.
+          Eg: {"Moon.Nakshatra": "Rohini", "Moon.SubLord": "Saturn", "House7.SubLord": "Venus"}
+        """
+        return self.chart_ids[self.match_rows(predicates)]
+
+    def count(self, predicates: dict):
+        """Returns the number of charts matching all predicates"""
+        return int(self.match_rows(predicates).size)
+
+    def match_rows(self, predicates: dict):
+        """Returns the row numbers of the charts matching all predicates"""
+        bitmap = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for key, value in predicates.items():
+            bitmap &= self._predicate_bitmap(key, value)
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+    def decode(self, key: str, rows=None):
+        """Returns the values of column `key` (names for categorical columns) for the given rows"""
+        values = self.columns[key] if rows is None else self.columns[key][rows]
+        field = key.split(".", 1)[1]
+        if field not in CATEGORY_DICTIONARIES:
+            return values
+        dictionary = np.array(CATEGORY_DICTIONARIES[field] + [None], dtype=object)
+        return dictionary[np.minimum(values, len(dictionary) - 1)]
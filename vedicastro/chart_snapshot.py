@@ -0,0 +1,260 @@
+"""
+Compact, picklable snapshot of a computed chart.
+
+A `flatlib.Chart` plus its planets / houses data tables is a few hundred Python objects per chart. A
+`ChartSnapshot` keeps the same information in one fixed-size NumPy record of arrays: longitudes,
+latitudes and speeds of the objects, the 12 cusps, the DMS strings as signed arc-seconds and the
+sign / nakshatra / lord names as int8 codes. The planets and houses data tables are rebuilt from the
+arrays on first access, equal to the ones returned by `get_planets_data_from_chart` /
+`get_houses_data_from_chart`. Pickling writes the record as one bytes blob, so a snapshot is cheap to
+send between processes. Run `test_suite/chart_snapshot_footprint.py` to compare the footprints.
+"""
+
+import collections
+import numpy as np
+from functools import lru_cache
+from flatlib import const
+from flatlib.chart import Chart
+from .VedicAstro import (
+    RASHIS,
+    NAKSHATRAS,
+    PLANETS_TABLE_COLS,
+    HOUSES_TABLE_COLS,
+    ROMAN_HOUSE_NUMBERS,
+)
+from .kp_divisions import VIMSHOTTARI_LORDS
+from .utils import clean_select_objects_split_str, dms_to_decdeg
+
+PlanetsData = collections.namedtuple("PlanetsData", PLANETS_TABLE_COLS)
+HousesData = collections.namedtuple("HousesData", HOUSES_TABLE_COLS)
+
+## Columns of the int8 code arrays; names are codes into RASHIS, NAKSHATRAS or VIMSHOTTARI_LORDS, -1 is None
+PLANET_CODE_COLS = ["Rasi", "isRetroGrade", "Nakshatra", "RasiLord", "NakshatraLord", "SubLord", "SubSubLord", "HouseNr"]
+HOUSE_CODE_COLS = ["Rasi", "Nakshatra", "RasiLord", "NakshatraLord", "SubLord", "SubSubLord"]
+CODE_NAMES = {
+    "Rasi": RASHIS,
+    "Nakshatra": NAKSHATRAS,
+    "RasiLord": VIMSHOTTARI_LORDS,
+    "NakshatraLord": VIMSHOTTARI_LORDS,
+    "SubLord": VIMSHOTTARI_LORDS,
+    "SubSubLord": VIMSHOTTARI_LORDS,
+}
+NO_CODE = -1
+NO_DMS = np.iinfo(np.int32).min
+
+## Objects of a chart generated with `const.LIST_OBJECTS`; not stored in the pickle when a snapshot uses them
+DEFAULT_OBJECTS = ("Asc",) + tuple(clean_select_objects_split_str(obj_id)[0] for obj_id in const.LIST_OBJECTS)
+
+
+def _dms_to_arcsec(dms_str: str):
+    if dms_str is None:
+        return NO_DMS
+    degrees, minutes, seconds = (abs(int(x)) for x in dms_str.split(":"))
+    arcsec = degrees * 3600 + minutes * 60 + seconds
+    return -arcsec if dms_str.startswith("-") else arcsec
+
+
+def _arcsec_to_dms(arcsec: int):
+    if arcsec == NO_DMS:
+        return None
+    degrees, remainder = divmod(abs(int(arcsec)), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{'-' if arcsec < 0 else '+'}{degrees:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def _encode(col: str, value):
+    if value is None:
+        return NO_CODE
+    if col in CODE_NAMES:
+        return CODE_NAMES[col].index(value)
+    return int(value)
+
+
+def _decode(col: str, code: int):
+    if code == NO_CODE:
+        return None
+    if col in CODE_NAMES:
+        return CODE_NAMES[col][code]
+    if col == "isRetroGrade":
+        return bool(code)
+    return int(code)
+
+
+## Fields of the snapshot record: (name, dtype, rows, columns); rows are one per object or per house
+RECORD_FIELDS = [
+    ("lons", "<f8", "objects", None),
+    ("lats", "<f4", "objects", None),
+    ("speeds", "<f4", "objects", None),
+    ("planet_codes", "i1", "objects", len(PLANET_CODE_COLS)),
+    ("planet_dms", "<i4", "objects", 2),
+    ("cusps", "<f8", "houses", None),
+    ("house_codes", "i1", "houses", len(HOUSE_CODE_COLS)),
+    ("house_dms", "<i4", "houses", None),
+    ("house_sizes", "<i4", "houses", None),
+]
+
+
+@lru_cache(maxsize=None)
+def _record_dtype(n_objects: int):
+    """Structured dtype holding all the arrays of a snapshot with `n_objects` objects in one fixed-size record"""
+    n_rows = {"objects": n_objects, "houses": 12}
+    return np.dtype(
+        [(name, dtype, (n_rows[rows],) if n_cols is None else (n_rows[rows], n_cols)) for name, dtype, rows, n_cols in RECORD_FIELDS]
+    )
+
+
+class ChartSnapshot:
+    """
+    Fixed-size array storage of one chart and its data tables.
+
+    Attributes:
+    - jd, latitude, longitude, ayanamsa, house_system: the chart moment and settings
+    - objects: object names, "Asc" first, in the row order of the planets data table
+    - lons, lats, speeds: arrays of the objects (sidereal longitude, latitude and longitude speed)
+    - cusps: float64 array of the 12 sidereal cusps
+    - planet_codes, house_codes: int8 arrays with the `PLANET_CODE_COLS` / `HOUSE_CODE_COLS` columns
+    - planet_dms, house_dms: the DMS strings of the tables as signed arc-seconds; house_sizes in thousandths of a degree
+
+    The arrays are read-only views into one structured record (see `RECORD_FIELDS`).
+    """
+
+    __slots__ = ("jd", "latitude", "longitude", "ayanamsa", "house_system", "objects", "_record", "_planets_data", "_houses_data")
+
+    def __init__(self, jd: float, latitude: float, longitude: float, ayanamsa: str, house_system: str, objects: tuple, record: np.ndarray):
+        self.jd = jd
+        self.latitude = latitude
+        self.longitude = longitude
+        self.ayanamsa = ayanamsa
+        self.house_system = house_system
+        ## Share the default object names between snapshots
+        self.objects = DEFAULT_OBJECTS if objects == DEFAULT_OBJECTS else objects
+        self._record = record
+        self._planets_data = None
+        self._houses_data = None
+
+    @classmethod
+    def from_chart(cls, horoscope, chart: Chart, planets_data: list = None, houses_data: list = None):
+        """
+        Builds the snapshot of a chart generated by `horoscope` (a `VedicHoroscopeData`). The data tables are computed
+        when not passed in.
+        """
+        planets_data = planets_data or horoscope.get_planets_data_from_chart(chart)
+        houses_data = houses_data or horoscope.get_houses_data_from_chart(chart)
+        chart_objects = [chart.get(const.ASC)] + list(chart.objects)
+        objects = tuple(row.Object for row in planets_data)
+
+        record = np.zeros(1, dtype=_record_dtype(len(objects)))
+        record["lons"] = [obj.lon for obj in chart_objects]
+        record["lats"] = [getattr(obj, "lat", 0.0) for obj in chart_objects]
+        record["speeds"] = [getattr(obj, "lonspeed", 0.0) for obj in chart_objects]
+        record["planet_codes"] = [[_encode(col, getattr(row, col)) for col in PLANET_CODE_COLS] for row in planets_data]
+        record["planet_dms"] = [[_dms_to_arcsec(row.SignLonDMS), _dms_to_arcsec(row.LatDMS)] for row in planets_data]
+        record["cusps"] = [house.lon for house in chart.houses]
+        record["house_codes"] = [[_encode(col, getattr(row, col)) for col in HOUSE_CODE_COLS] for row in houses_data]
+        record["house_dms"] = [_dms_to_arcsec(row.SignLonDMS) for row in houses_data]
+        record["house_sizes"] = [round(row.DegSize * 1000) for row in houses_data]
+        record.flags.writeable = False
+        return cls(chart.date.jd, horoscope.latitude, horoscope.longitude, horoscope.ayanamsa, horoscope.house_system,
+                   objects, record)
+
+    @property
+    def lons(self):
+        return self._record["lons"][0]
+
+    @property
+    def lats(self):
+        return self._record["lats"][0]
+
+    @property
+    def speeds(self):
+        return self._record["speeds"][0]
+
+    @property
+    def cusps(self):
+        return self._record["cusps"][0]
+
+    @property
+    def planet_codes(self):
+        return self._record["planet_codes"][0]
+
+    @property
+    def house_codes(self):
+        return self._record["house_codes"][0]
+
+    @property
+    def planet_dms(self):
+        return self._record["planet_dms"][0]
+
+    @property
+    def house_dms(self):
+        return self._record["house_dms"][0]
+
+    @property
+    def house_sizes(self):
+        return self._record["house_sizes"][0]
+
+    @property
+    def planets_data(self):
+        """The planets data table, as returned by `get_planets_data_from_chart` (built on first access)"""
+        if self._planets_data is None:
+            rows = []
+            for i, obj in enumerate(self.objects):
+                codes = {col: _decode(col, code) for col, code in zip(PLANET_CODE_COLS, self.planet_codes[i].tolist())}
+                sign_lon_dms, lat_dms = (_arcsec_to_dms(arcsec) for arcsec in self.planet_dms[i].tolist())
+                lon = float(self.lons[i])
+                is_asc = obj == "Asc"
+                rows.append(
+                    PlanetsData(
+                        Object=obj,
+                        LonDecDeg=round(lon, 3),
+                        SignLonDMS=sign_lon_dms,
+                        SignLonDecDeg=dms_to_decdeg(sign_lon_dms) if is_asc else round(lon % 30, 3),
+                        LatDMS=lat_dms,
+                        **codes,
+                    )
+                )
+            self._planets_data = rows
+        return self._planets_data
+
+    @property
+    def houses_data(self):
+        """The houses data table, as returned by `get_houses_data_from_chart` (built on first access)"""
+        if self._houses_data is None:
+            rows = []
+            for i, house_name in enumerate(ROMAN_HOUSE_NUMBERS.values()):
+                codes = {col: _decode(col, code) for col, code in zip(HOUSE_CODE_COLS, self.house_codes[i].tolist())}
+                cusp = float(self.cusps[i])
+                rows.append(
+                    HousesData(
+                        Object=house_name,
+                        HouseNr=i + 1,
+                        LonDecDeg=round(cusp, 3),
+                        SignLonDMS=_arcsec_to_dms(int(self.house_dms[i])),
+                        SignLonDecDeg=round(cusp % 30, 3),
+                        DegSize=int(self.house_sizes[i]) / 1000,
+                        **codes,
+                    )
+                )
+            self._houses_data = rows
+        return self._houses_data
+
+    def __reduce__(self):
+        objects = None if self.objects == DEFAULT_OBJECTS else self.objects
+        state = (self.jd, self.latitude, self.longitude, self.ayanamsa, self.house_system, objects, self._record.tobytes())
+        return (_restore_snapshot, state)
+
+    def __eq__(self, other):
+        if not isinstance(other, ChartSnapshot):
+            return NotImplemented
+        return (self.jd, self.latitude, self.longitude, self.ayanamsa, self.house_system, self.objects) == (
+            other.jd, other.latitude, other.longitude, other.ayanamsa, other.house_system, other.objects
+        ) and self._record.tobytes() == other._record.tobytes()
+
+    def __repr__(self):
+        return f"<ChartSnapshot jd={self.jd:.6f} lat={self.latitude} lon={self.longitude} {self.ayanamsa}/{self.house_system}>"
+
+
+def _restore_snapshot(jd, latitude, longitude, ayanamsa, house_system, objects, blob):
+    objects = DEFAULT_OBJECTS if objects is None else objects
+    record = np.frombuffer(blob, dtype=_record_dtype(len(objects)))
+    return ChartSnapshot(jd, latitude, longitude, ayanamsa, house_system, objects, record)
@@ -0,0 +1,133 @@
+"""
+Multi-ayanamsa and multi-house-system fan-out from a single ephemeris evaluation.
+
+Sidereal longitudes only differ between ayanamsas by a constant offset at a given instant, and the
+house cusps of every system follow from the same ARMC and obliquity. So the tropical positions,
+the sidereal time and the obliquity are computed once, the tropical cusps once per house system,
+and each (ayanamsa, house system) variant is then just a subtraction and a lord lookup.
+"""
+
+import numpy as np
+import polars as pl
+import swisseph as swe
+from .ephemeris import GRAHAS, SWE_PLANETS, SWE_AYANAMSA_MAPPING, SWE_HOUSE_SYSTEM_MAPPING, set_ayanamsa
+from .house_cusps import compute_tropical_cusps, get_house_numbers
+from .kp_divisions import decode_codes, get_rl_nl_sl_codes
+from .VedicAstro import ROMAN_HOUSE_NUMBERS
+
+VARIANT_COLS = [
+    "Ayanamsa",
+    "HouseSystem",
+    "Object",
+    "HouseNr",
+    "Rasi",
+    "isRetroGrade",
+    "LonDecDeg",
+    "SignLonDecDeg",
+    "Nakshatra",
+    "Pada",
+    "RasiLord",
+    "NakshatraLord",
+    "SubLord",
+    "SubSubLord",
+]
+
+
+def get_tropical_state(jd: float, lat: float, lon: float, objects: list = None, flags: int = swe.FLG_SWIEPH):
+    """
+    The single ephemeris evaluation shared by all variants.
+
+    Returns:
+    - dict with "lon" and "speed" (tropical, true equinox of date) arrays of the objects, "armc" and "obliquity"
+    """
+    objects = objects or GRAHAS
+    tropical_lon, speed = [], []
+    for obj in objects:
+        pos, _ = swe.calc_ut(jd, SWE_PLANETS["Rahu" if obj == "Ketu" else obj], flags | swe.FLG_SPEED)
+        tropical_lon.append((pos[0] + 180.0) % 360.0 if obj == "Ketu" else pos[0])
+        speed.append(pos[3])
+    return {
+        "objects": list(objects),
+        "lon": np.array(tropical_lon),
+        "speed": np.array(speed),
+        "armc": (swe.sidtime(jd) * 15.0 + lon) % 360.0,
+        "obliquity": swe.calc_ut(jd, swe.ECL_NUT)[0][0],
+        "lat": lat,
+    }
+
+
+def compute_chart_variants(
+    jd: float,
+    lat: float,
+    lon: float,
+    ayanamsas: list = None,
+    house_systems: list = None,
+    objects: list = None,
+    flags: int = swe.FLG_SWIEPH,
+):
+    """
+    Computes the graha positions and house cusps of one moment under several ayanamsas and house systems.
+
+    Parameters:
+    - jd: Julian day (UT) of the chart
+    - lat, lon: location of the chart (east longitude positive)
+    - ayanamsas: names from `AYANAMSA_MAPPING`, defaults to all of them
+    - house_systems: names from `HOUSE_SYSTEM_MAPPING`, defaults to all of them
+    - objects: graha names, defaults to all of `GRAHAS`
+    - flags: swe ephemeris flags
+
+    Returns:
+    - polars DataFrame with `VARIANT_COLS`, stacking for each (ayanamsa, house system) the ascendant and
+      grahas (HouseNr is the occupied house) followed by the 12 cusps, named I - XII like the houses data table
+    """
+    ayanamsas = ayanamsas or list(SWE_AYANAMSA_MAPPING)
+    house_systems = house_systems or list(SWE_HOUSE_SYSTEM_MAPPING)
+    state = get_tropical_state(jd, lat, lon, objects, flags)
+
+    ## Tropical cusps once per house system
+    tropical_cusps = {
+        house_system: compute_tropical_cusps(state["armc"], state["obliquity"], lat, house_system)
+        for house_system in house_systems
+    }
+    offsets = {}
+    for ayanamsa in ayanamsas:
+        set_ayanamsa(ayanamsa)
+        offsets[ayanamsa] = swe.get_ayanamsa_ex_ut(jd, 0)[1]
+
+    names = ["Asc"] + state["objects"] + list(ROMAN_HOUSE_NUMBERS.values())
+    n_planets = len(state["objects"])
+    columns = {col: [] for col in ["Ayanamsa", "HouseSystem", "Object", "HouseNr", "isRetroGrade"]}
+    lons = []
+    for ayanamsa in ayanamsas:
+        planet_lons = (state["lon"] - offsets[ayanamsa]) % 360.0
+        for house_system in house_systems:
+            cusps, asc, _ = tropical_cusps[house_system]
+            asc = (asc[0] - offsets[ayanamsa]) % 360.0
+            cusps = (cusps[0] - offsets[ayanamsa]) % 360.0
+            if house_system == "Whole Sign":
+                cusps = (np.floor(asc / 30.0) * 30.0 + 30.0 * np.arange(12)) % 360.0
+            houses = get_house_numbers(planet_lons[None, :], cusps[None, :])[0]
+
+            lons.extend([asc, *planet_lons, *cusps])
+            columns["Ayanamsa"].extend([ayanamsa] * len(names))
+            columns["HouseSystem"].extend([house_system] * len(names))
+            columns["Object"].extend(names)
+            columns["HouseNr"].extend([1, *houses.tolist(), *range(1, 13)])
+            columns["isRetroGrade"].extend([False, *(state["speed"] < 0).tolist(), *[None] * 12])
+
+    lons = np.array(lons)
+    lords = decode_codes(get_rl_nl_sl_codes(lons))
+    columns.update(
+        {
+            "Rasi": lords["Rasi"],
+            "LonDecDeg": np.round(lons, 6),
+            "SignLonDecDeg": np.round(lons % 30.0, 6),
+            "Nakshatra": lords["Nakshatra"],
+            "Pada": lords["Pada"],
+            "RasiLord": lords["RasiLord"],
+            "NakshatraLord": lords["NakshatraLord"],
+            "SubLord": lords["SubLord"],
+            "SubSubLord": lords["SubSubLord"],
+        }
+    )
+    return pl.DataFrame({col: columns[col] for col in VARIANT_COLS})
@@ -0,0 +1,224 @@
+"""
+Vectorized Ashtakoota (Guna Milan) compatibility matching.
+
+Every koota depends only on the Moon's nakshatra and rasi of the two charts, which are both fixed by the
+Moon's nakshatra pada (108 padas, 9 per sign; the pada also settles which sign a nakshatra that spans two
+signs is in). Each koota is therefore precomputed once at import as a 108 x 108 score table indexed by
+(boy pada, girl pada), and scoring a profile against a population is one fancy-indexing lookup per table.
+Top-k matches are selected with `np.partition` on the total score (ties keep the population order), and the
+per koota breakdown is looked up for the selected pairs only.
+"""
+
+import numpy as np
+import polars as pl
+from .kp_divisions import get_division_index
+from .VedicAstro import NAKSHATRAS, SIGN_LORDS
+
+KOOTAS = ["Varna", "Vashya", "Tara", "Yoni", "GrahaMaitri", "Gana", "Bhakoot", "Nadi"]
+KOOTA_MAX_POINTS = {"Varna": 1, "Vashya": 2, "Tara": 3, "Yoni": 4, "GrahaMaitri": 5, "Gana": 6, "Bhakoot": 7, "Nadi": 8}
+MAX_TOTAL_POINTS = sum(KOOTA_MAX_POINTS.values())
+N_PADAS = 108
+MATCH_TABLE_COLS = ["ProfileIdx", "Rank", "MatchIdx", "Total", *KOOTAS]
+
+## Varna of each rasi (Aries ... Pisces): 3 Brahmin (water signs), 2 Kshatriya (fire), 1 Vaishya (earth), 0 Shudra (air)
+RASI_VARNA = [2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3]
+
+## Vashya groups; Sagittarius and Capricorn change group at 15°, which falls inside a pada (Purva Ashadha 1, Shravana 2),
+## so the half of a pada is decided by its middle and those two padas count as second half
+VASHYA_GROUPS = ["Chatushpada", "Manava", "Jalachara", "Vanachara", "Keeta"]
+RASI_VASHYA = {
+    "first_half": [0, 0, 1, 2, 3, 1, 1, 4, 1, 0, 1, 2],
+    "second_half": [0, 0, 1, 2, 3, 1, 1, 4, 0, 2, 1, 2],
+}
+## Points of (boy group, girl group), in `VASHYA_GROUPS` order
+VASHYA_POINTS = [
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0.5, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2],
+]
+
+## Tara: counting from one star to the other (both included), remainders 3, 5 and 7 modulo 9 are inauspicious
+INAUSPICIOUS_TARAS = {3, 5, 7}
+
+## Yoni animal of each nakshatra, and the points of (boy animal, girl animal)
+YONI_ANIMALS = ["Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat", "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion"]
+NAKSHATRA_YONI = [0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1]
+YONI_POINTS = [
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+]
+
+## Graha Maitri: points of (boy rasi lord, girl rasi lord)
+MAITRI_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+MAITRI_POINTS = [
+    [5, 5, 5, 4, 5, 0, 0],
+    [5, 5, 4, 1, 4, 0.5, 0.5],
+    [5, 4, 5, 0.5, 5, 3, 0.5],
+    [4, 1, 0.5, 5, 0.5, 5, 4],
+    [5, 4, 5, 0.5, 5, 0.5, 3],
+    [0, 0.5, 3, 5, 0.5, 5, 5],
+    [0, 0.5, 0.5, 4, 3, 5, 5],
+]
+
+## Gana of each nakshatra (0 Deva, 1 Manushya, 2 Rakshasa), and the points of (boy gana, girl gana)
+NAKSHATRA_GANA = [0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0]
+GANA_POINTS = [
+    [6, 6, 1],
+    [5, 6, 0],
+    [1, 0, 6],
+]
+
+## Bhakoot: rasi distances (counted from the girl's rasi, both included) of the 2/12, 5/9 and 6/8 pairs score 0
+INAUSPICIOUS_BHAKOOT = {2, 12, 5, 9, 6, 8}
+
+## Nadi of each nakshatra (0 Adi, 1 Madhya, 2 Antya); the same nadi scores 0
+NAKSHATRA_NADI = [0, 1, 2, 2, 1, 0, 0, 1, 2, 2, 1, 0, 0, 1, 2, 2, 1, 0, 0, 1, 2, 2, 1, 0, 0, 1, 2]
+
+
+def _build_koota_tables():
+    """The (108, 108) float32 score table of each koota, indexed by (boy pada, girl pada)"""
+    pada = np.arange(N_PADAS)
+    nakshatra, rasi = pada // 4, pada // 9
+    ## Middle of each pada within its sign, for the Vashya half signs
+    second_half = ((pada % 9) + 0.5) * 30 / 9 >= 15.0
+    vashya = np.where(second_half, np.array(RASI_VASHYA["second_half"])[rasi], np.array(RASI_VASHYA["first_half"])[rasi])
+    varna = np.array(RASI_VARNA)[rasi]
+    yoni = np.array(NAKSHATRA_YONI)[nakshatra]
+    lord = np.array([MAITRI_LORDS.index(SIGN_LORDS[r]) for r in rasi])
+    gana = np.array(NAKSHATRA_GANA)[nakshatra]
+    nadi = np.array(NAKSHATRA_NADI)[nakshatra]
+
+    boy, girl = np.meshgrid(pada, pada, indexing="ij")
+    tara_ok = lambda start, end: ~np.isin(((nakshatra[end] - nakshatra[start]) % 27 + 1) % 9, list(INAUSPICIOUS_TARAS))
+    tables = {
+        "Varna": (varna[boy] >= varna[girl]) * 1.0,
+        "Vashya": np.array(VASHYA_POINTS)[vashya[boy], vashya[girl]],
+        "Tara": 1.5 * tara_ok(girl, boy) + 1.5 * tara_ok(boy, girl),
+        "Yoni": np.array(YONI_POINTS)[yoni[boy], yoni[girl]],
+        "GrahaMaitri": np.array(MAITRI_POINTS)[lord[boy], lord[girl]],
+        "Gana": np.array(GANA_POINTS)[gana[boy], gana[girl]],
+        "Bhakoot": np.where(np.isin((rasi[boy] - rasi[girl]) % 12 + 1, list(INAUSPICIOUS_BHAKOOT)), 0.0, 7.0),
+        "Nadi": np.where(nadi[boy] == nadi[girl], 0.0, 8.0),
+    }
+    tables = {koota: table.astype(np.float32) for koota, table in tables.items()}
+    for table in tables.values():
+        table.flags.writeable = False
+    return tables
+
+
+KOOTA_TABLES = _build_koota_tables()
+TOTAL_TABLE = sum(KOOTA_TABLES.values())
+TOTAL_TABLE.flags.writeable = False
+
+
+def get_pada_index(lons):
+    """Nakshatra pada index (0 - 107, Ashwini pada 1 is 0) of sidereal Moon longitudes"""
+    return get_division_index(lons, "pada")
+
+
+def pada_index_from_nakshatra(nakshatras, padas):
+    """Pada index from nakshatra names (or 0 - 26 indices) and pada numbers (1 - 4)"""
+    nakshatras = np.asarray(nakshatras)
+    if nakshatras.dtype.kind in "US":
+        lookup = {name: i for i, name in enumerate(NAKSHATRAS)}
+        nakshatras = np.array([lookup[name] for name in nakshatras.ravel()]).reshape(nakshatras.shape)
+    padas = np.asarray(padas)
+    if np.any((padas < 1) | (padas > 4)):
+        raise ValueError("Pada numbers must be between 1 and 4")
+    return nakshatras * 4 + padas - 1
+
+
+def get_moon_pada_index(planets_data: list):
+    """Pada index of the Moon in a planets data table, as returned by `get_planets_data_from_chart`"""
+    for row in planets_data:
+        if row.Object == "Moon":
+            return int(get_pada_index(row.LonDecDeg))
+    raise ValueError("No Moon in the planets data")
+
+
+def _boy_girl(profile_padas, population_padas, profile_is_boy: bool):
+    return (profile_padas, population_padas) if profile_is_boy else (population_padas, profile_padas)
+
+
+def score_pairs(boy_padas, girl_padas):
+    """
+    Ashtakoota points of (boy, girl) pairs given by broadcastable arrays of Moon pada indices.
+
+    Returns:
+    - dict of float32 arrays, one per koota in `KOOTAS` plus "Total"
+    """
+    boy_padas, girl_padas = np.asarray(boy_padas), np.asarray(girl_padas)
+    scores = {koota: KOOTA_TABLES[koota][boy_padas, girl_padas] for koota in KOOTAS}
+    scores["Total"] = TOTAL_TABLE[boy_padas, girl_padas]
+    return scores
+
+
+def _top_k(totals: np.ndarray, top_k: int):
+    """Indices of the `top_k` best totals, best first; equal totals keep the population order"""
+    threshold = np.partition(totals, totals.size - top_k)[totals.size - top_k]
+    above = np.flatnonzero(totals > threshold)
+    at_threshold = np.flatnonzero(totals == threshold)[: top_k - above.size]
+    candidates = np.concatenate([above, at_threshold])
+    candidates.sort()
+    return candidates[np.argsort(-totals[candidates], kind="stable")]
+
+
+def match_profiles(profile_padas, population_padas, profile_is_boy: bool = True, top_k: int = 10, min_total: float = None):
+    """
+    Best Ashtakoota matches of each profile in a population.
+
+    Parameters:
+    - profile_padas: Moon pada index of one profile, or an array of them
+    - population_padas: array of the Moon pada indices of the population (eg: from `get_pada_index`)
+    - profile_is_boy: True when the profiles are the boys and the population the girls, False for the reverse
+    - top_k: number of matches returned per profile
+    - min_total: drop matches below this total
+
+    Returns:
+    - polars DataFrame with `MATCH_TABLE_COLS`: for each profile its matches by rank (1 is best), the index of the
+      match in the population, the total and the points of every koota
+    """
+    profiles = np.atleast_1d(np.asarray(profile_padas, dtype=np.int64))
+    population = np.asarray(population_padas, dtype=np.int64)
+    if population.ndim != 1 or population.size == 0:
+        raise ValueError("population_padas must be a non-empty 1d array")
+    if np.any((population < 0) | (population >= N_PADAS)) or np.any((profiles < 0) | (profiles >= N_PADAS)):
+        raise ValueError(f"Pada indices must be between 0 and {N_PADAS - 1}")
+    top_k = min(top_k, population.size)
+
+    ## Profiles with the same pada share one row of scores, so only the distinct padas are ranked
+    unique_padas, profile_rows = np.unique(profiles, return_inverse=True)
+    best = np.empty((unique_padas.size, top_k), dtype=np.int64)
+    for row, pada in enumerate(unique_padas):
+        boy, girl = _boy_girl(pada, population, profile_is_boy)
+        best[row] = _top_k(TOTAL_TABLE[boy, girl], top_k)
+
+    match_idx = best[profile_rows]
+    boy, girl = _boy_girl(profiles[:, None], population[match_idx], profile_is_boy)
+    scores = score_pairs(boy, girl)
+    matches = pl.DataFrame(
+        {
+            "ProfileIdx": np.repeat(np.arange(profiles.size), top_k),
+            "Rank": np.tile(np.arange(1, top_k + 1), profiles.size),
+            "MatchIdx": match_idx.ravel(),
+            "Total": scores["Total"].ravel(),
+            **{koota: scores[koota].ravel() for koota in KOOTAS},
+        }
+    )
+    if min_total is not None:
+        matches = matches.filter(pl.col("Total") >= min_total)
+    return matches.select(MATCH_TABLE_COLS)
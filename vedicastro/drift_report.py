@@ -0,0 +1,193 @@
+"""
+Drift report of the precision tiers against the "high" tier (Swiss Ephemeris files).
+
+    python -m vedicastro.drift_report --start-year 1900 --end-year 2100 --samples 5000 --cache eph_cache.npy
+
+Every tier computes the sidereal graha positions at the same random instants of the date range. For each
+(tier, object) the report gives the longitude difference to the reference in arc-seconds (max / p99 / mean),
+the share of instants where a KP lord (sign, star, sub, sub-sub) differs from the reference, and the
+evaluation time per position. `recommend_tier` picks the fastest tier with no lord flip at all, which is
+what the `test_suite/deg_var_check_*.ipynb` notebooks checked by hand for individual charts.
+"""
+
+import argparse
+import json
+import logging
+import time
+import numpy as np
+import polars as pl
+import swisseph as swe
+from .ephemeris import GRAHAS, PRECISION_TIERS, SWE_BACKEND_FLAGS, calc_sidereal_positions
+from .kp_divisions import get_rl_nl_sl_codes
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_TIER = "high"
+## Lord levels compared between tiers, as named in `get_rl_nl_sl_codes`
+LORD_LEVELS = ["RasiLord", "NakshatraLord", "SubLord", "SubSubLord"]
+DRIFT_REPORT_COLS = [
+    "Tier",
+    "Backend",
+    "Object",
+    "MaxLonDiffArcsec",
+    "P99LonDiffArcsec",
+    "MeanLonDiffArcsec",
+    *[f"{level}Flips" for level in LORD_LEVELS],
+    "SubLordFlipRate",
+    "UsPerPosition",
+]
+
+
+def sample_julian_days(start_year: int, end_year: int, n_samples: int, seed: int = 0):
+    """Sorted random Julian days (UT) from Jan 1st of `start_year` to the end of `end_year`"""
+    rng = np.random.default_rng(seed)
+    jd_start, jd_end = swe.julday(start_year, 1, 1, 0.0), swe.julday(end_year + 1, 1, 1, 0.0)
+    return np.sort(rng.uniform(jd_start, jd_end, n_samples))
+
+
+def tier_positions(tier: str, jd: np.ndarray, objects: list, ayanamsa: str, ephemeris_cache=None):
+    """
+    Sidereal longitudes of `objects` at `jd` with the backend of a precision tier.
+
+    Returns:
+    - ({object: longitude array}, seconds spent)
+    """
+    backend = PRECISION_TIERS[tier]
+    lons = {}
+    start = time.perf_counter()
+    for obj in objects:
+        if backend == "cache":
+            lons[obj] = ephemeris_cache.positions(obj, jd)[0]
+        else:
+            lons[obj] = calc_sidereal_positions(jd, obj, ayanamsa, SWE_BACKEND_FLAGS[backend])[0]
+    return lons, time.perf_counter() - start
+
+
+def compute_drift_report(
+    start_year: int = 1900,
+    end_year: int = 2100,
+    n_samples: int = 2000,
+    ayanamsa: str = "Krishnamurti",
+    tiers: list = None,
+    objects: list = None,
+    ephemeris_cache=None,
+    seed: int = 0,
+):
+    """
+    Measures every tier against the "high" tier over random instants of a date range.
+
+    Parameters:
+    - start_year, end_year: sampled date range (both years included)
+    - n_samples: number of random instants
+    - ayanamsa: name from `AYANAMSA_MAPPING`
+    - tiers: `PRECISION_TIERS` names to measure, defaults to all; tiers using the "cache" backend are skipped
+      without an `ephemeris_cache`
+    - objects: graha names, defaults to all of `GRAHAS`
+    - ephemeris_cache: `EphemerisCache` (or path to its `.npy` file) for the "cache" backend; must cover the range
+    - seed: seed of the sampled instants
+
+    Returns:
+    - polars DataFrame with `DRIFT_REPORT_COLS`, one row per (tier, object) including the reference tier
+    """
+    if isinstance(ephemeris_cache, str):
+        from .ephemeris_cache import EphemerisCache
+
+        ephemeris_cache = EphemerisCache(ephemeris_cache)
+    tiers = list(tiers or PRECISION_TIERS)
+    unknown = [tier for tier in tiers if tier not in PRECISION_TIERS]
+    if unknown:
+        raise ValueError(f"Unknown precision tiers {unknown}. Choose from {list(PRECISION_TIERS)}")
+    if REFERENCE_TIER not in tiers:
+        tiers.insert(0, REFERENCE_TIER)
+    objects = list(objects or GRAHAS)
+    jd = sample_julian_days(start_year, end_year, n_samples, seed)
+
+    if ephemeris_cache is not None:
+        if ephemeris_cache.ayanamsa != ayanamsa:
+            raise ValueError(f"Ephemeris cache was built for '{ephemeris_cache.ayanamsa}' ayanamsa, not '{ayanamsa}'")
+        if not ephemeris_cache.covers(jd):
+            raise ValueError(f"Ephemeris cache does not cover {start_year} - {end_year}")
+
+    ## swe silently falls back to Moshier when it cannot find the `.se1` files, which would make the reference meaningless
+    _, ret_flags = swe.calc_ut(float(jd[0]), swe.SUN, SWE_BACKEND_FLAGS["swiss"])
+    if not ret_flags & swe.FLG_SWIEPH:
+        raise ValueError("Swiss Ephemeris files not found on the swe ephemeris path; the reference tier would be Moshier")
+
+    reference, reference_seconds = tier_positions(REFERENCE_TIER, jd, objects, ayanamsa)
+    reference_codes = {obj: get_rl_nl_sl_codes(lon) for obj, lon in reference.items()}
+
+    rows = []
+    for tier in tiers:
+        if PRECISION_TIERS[tier] == "cache" and ephemeris_cache is None:
+            logger.warning("Skipping tier '%s': no ephemeris cache given", tier)
+            continue
+        if tier == REFERENCE_TIER:
+            lons, seconds = reference, reference_seconds
+        else:
+            lons, seconds = tier_positions(tier, jd, objects, ayanamsa, ephemeris_cache)
+        for obj in objects:
+            diff = np.abs((lons[obj] - reference[obj] + 180.0) % 360.0 - 180.0) * 3600.0
+            codes = get_rl_nl_sl_codes(lons[obj])
+            flips = {f"{level}Flips": int(np.count_nonzero(codes[level] != reference_codes[obj][level])) for level in LORD_LEVELS}
+            rows.append(
+                {
+                    "Tier": tier,
+                    "Backend": PRECISION_TIERS[tier],
+                    "Object": obj,
+                    "MaxLonDiffArcsec": float(diff.max()),
+                    "P99LonDiffArcsec": float(np.percentile(diff, 99)),
+                    "MeanLonDiffArcsec": float(diff.mean()),
+                    **flips,
+                    "SubLordFlipRate": flips["SubLordFlips"] / n_samples,
+                    "UsPerPosition": seconds / (n_samples * len(objects)) * 1e6,
+                }
+            )
+    return pl.DataFrame(rows).select(DRIFT_REPORT_COLS)
+
+
+def summarize_tiers(report: pl.DataFrame):
+    """One row per tier: worst longitude difference, total lord flips and time per position"""
+    return (
+        report.group_by(["Tier", "Backend"], maintain_order=True)
+        .agg(
+            pl.col("MaxLonDiffArcsec").max(),
+            pl.sum_horizontal([pl.col(f"{level}Flips") for level in LORD_LEVELS]).sum().alias("LordFlips"),
+            pl.col("UsPerPosition").mean(),
+        )
+    )
+
+
+def recommend_tier(report: pl.DataFrame):
+    """Name of the fastest tier without any lord flip against the reference"""
+    safe = summarize_tiers(report).filter(pl.col("LordFlips") == 0)
+    return safe.sort("UsPerPosition")["Tier"][0]
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Longitude drift and KP lord flips of the precision tiers against Swiss files")
+    parser.add_argument("--start-year", type=int, default=1900)
+    parser.add_argument("--end-year", type=int, default=2100)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--ayanamsa", default="Krishnamurti")
+    parser.add_argument("--tiers", nargs="+", default=None, help=f"tiers to measure, from {list(PRECISION_TIERS)}")
+    parser.add_argument("--cache", default=None, help="ephemeris cache (.npy) for the tiers using the cache backend")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the report rows and summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = compute_drift_report(args.start_year, args.end_year, args.samples, args.ayanamsa, args.tiers,
+                                  ephemeris_cache=args.cache, seed=args.seed)
+    summary = summarize_tiers(report)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200):
+        print(report)
+        print(summary)
+    recommended = recommend_tier(report)
+    print(f"Fastest tier without lord flips: {recommended}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "recommended_tier": recommended, "summary": summary.to_dicts(), "rows": report.to_dicts()},
+                      f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
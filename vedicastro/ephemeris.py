@@ -0,0 +1,113 @@
+import numpy as np
+import swisseph as swe
+from datetime import datetime
+
+## Swiss Ephemeris identifiers for the grahas, keyed by the names used in the planets data tables.
+## Ketu is not a swe body; it is always derived from Rahu (the mean lunar node, as in flatlib).
+SWE_PLANETS = {
+    "Sun": swe.SUN,
+    "Moon": swe.MOON,
+    "Mercury": swe.MERCURY,
+    "Venus": swe.VENUS,
+    "Mars": swe.MARS,
+    "Jupiter": swe.JUPITER,
+    "Saturn": swe.SATURN,
+    "Uranus": swe.URANUS,
+    "Neptune": swe.NEPTUNE,
+    "Pluto": swe.PLUTO,
+    "Rahu": swe.MEAN_NODE,
+}
+
+GRAHAS = list(SWE_PLANETS) + ["Ketu"]
+
+## Same keys as `AYANAMSA_MAPPING` in VedicAstro.py, mapped to the swe sidereal modes
+SWE_AYANAMSA_MAPPING = {
+    "Lahiri": swe.SIDM_LAHIRI,
+    "Lahiri_1940": swe.SIDM_LAHIRI_1940,
+    "Lahiri_VP285": swe.SIDM_LAHIRI_VP285,
+    "Lahiri_ICRC": swe.SIDM_LAHIRI_ICRC,
+    "Raman": swe.SIDM_RAMAN,
+    "Krishnamurti": swe.SIDM_KRISHNAMURTI,
+    "Krishnamurti_Senthilathiban": swe.SIDM_KRISHNAMURTI_VP291,
+}
+
+## Same keys as `HOUSE_SYSTEM_MAPPING` in VedicAstro.py, mapped to the swe house method codes used by flatlib
+SWE_HOUSE_SYSTEM_MAPPING = {
+    "Placidus": b"P",
+    "Equal": b"A",
+    "Equal 2": b"E",
+    "Whole Sign": b"W",
+}
+
+## Sources of the graha positions: the Swiss Ephemeris `.se1` files (through flatlib), the Moshier analytic
+## ephemeris built into swe (no files needed), and a Chebyshev `EphemerisCache` fitted to one of them
+EPHEMERIS_BACKENDS = ["swiss", "moshier", "cache"]
+SWE_BACKEND_FLAGS = {"swiss": swe.FLG_SWIEPH, "moshier": swe.FLG_MOSEPH}
+## Precision tiers, most precise first, and the backend each one uses.
+## Run `python -m vedicastro.drift_report` to measure what each tier changes against "high".
+PRECISION_TIERS = {
+    "high": "swiss",
+    "standard": "moshier",
+    "fast": "cache",
+}
+
+
+def resolve_ephemeris_backend(name: str):
+    """Returns the backend for a backend name (eg: "moshier") or a precision tier name (eg: "standard")"""
+    if name in EPHEMERIS_BACKENDS:
+        return name
+    if name in PRECISION_TIERS:
+        return PRECISION_TIERS[name]
+    raise ValueError(
+        f"Unknown ephemeris backend '{name}'. Choose one of {EPHEMERIS_BACKENDS} or a precision tier {list(PRECISION_TIERS)}"
+    )
+
+
+def set_ayanamsa(ayanamsa: str):
+    """Sets the swe sidereal mode for the given ayanamsa name. swe keeps this as global state."""
+    if ayanamsa not in SWE_AYANAMSA_MAPPING:
+        raise ValueError(
+            f"Unknown ayanamsa '{ayanamsa}'. Choose one of {list(SWE_AYANAMSA_MAPPING)}"
+        )
+    swe.set_sid_mode(SWE_AYANAMSA_MAPPING[ayanamsa])
+
+
+def calc_sidereal_positions(jd, obj: str, ayanamsa: str, flags: int = swe.FLG_SWIEPH):
+    """
+    Computes sidereal positions of one graha for an array of Julian days (UT).
+
+    Parameters:
+    - jd: scalar or array of Julian days in UT
+    - obj: graha name, one of `GRAHAS`
+    - ayanamsa: ayanamsa name, one of `SWE_AYANAMSA_MAPPING`
+    - flags: swe ephemeris flags, i.e `swe.FLG_SWIEPH` or `swe.FLG_MOSEPH`
+
+    Returns:
+    - (lon, lat, speed): float64 arrays in degrees and degrees/day, shaped like `jd`
+    """
+    if obj not in GRAHAS:
+        raise ValueError(f"Unknown object '{obj}'. Choose one of {GRAHAS}")
+    set_ayanamsa(ayanamsa)
+    jd = np.asarray(jd, dtype=np.float64)
+    swe_obj = SWE_PLANETS["Rahu" if obj == "Ketu" else obj]
+    calc_flags = flags | swe.FLG_SIDEREAL | swe.FLG_SPEED
+
+    out = np.empty(jd.shape + (3,), dtype=np.float64)
+    flat_out = out.reshape(-1, 3)
+    for i, t in enumerate(jd.ravel()):
+        pos, _ = swe.calc_ut(float(t), swe_obj, calc_flags)
+        flat_out[i] = (pos[0], pos[1], pos[3])
+
+    lon, lat, speed = out[..., 0], out[..., 1], out[..., 2]
+    if obj == "Ketu":
+        lon, lat = (lon + 180.0) % 360.0, -lat
+    return lon, lat, speed
+
+
+def jd_to_datetime(jdt: float, tz_offset: float):
+    utc = swe.jdut1_to_utc(jdt) 
+    # Convert UTC to local time - note negative sign before tzoffset to convert from UTC to IST
+    year, month, day, hour, minute, seconds  = swe.utc_time_zone(*utc, offset = -tz_offset)
+    # Convert the fractional seconds to microseconds
+    microseconds = int(seconds % 1 * 1_000_000)
+    return datetime(year, month, day, hour, minute, int(seconds), microseconds)
@@ -0,0 +1,226 @@
+"""
+Piecewise Chebyshev approximation of the sidereal graha positions.
+
+`build_ephemeris_cache` fits, for each object, one Chebyshev polynomial per fixed-length
+segment of time to the sidereal longitude, latitude and longitude speed computed by swe.
+The coefficients are written to a single `.npy` file (memory mapped on load) with a small
+`.json` metadata sidecar. `EphemerisCache` then serves vectorized lookups from it.
+
+Error bounds: with the default segment lengths and degree, the measured worst case
+longitude difference against swe is below 0.001 arc-second for the Sun, Moon and Rahu/Ketu,
+and within ~3 arc-seconds for the other planets (the swe Moshier fallback has small kinks
+that a smooth fit cannot follow; they are much smaller with the Swiss `.se1` files).
+The smallest KP sub-sub division is ~120 arc-seconds wide, so a lord can only differ from
+swe within that error margin of a division boundary.
+`build_ephemeris_cache` measures the actual bounds against swe at random instants and stores
+them in the metadata, see `EphemerisCache.max_error`.
+"""
+
+import json
+import logging
+import numpy as np
+import swisseph as swe
+from .ephemeris import GRAHAS, SWE_AYANAMSA_MAPPING, calc_sidereal_positions
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+## Segment length in days for each object, shorter for the fast and more irregular movers
+DEFAULT_SEGMENT_DAYS = {
+    "Sun": 16,
+    "Moon": 4,
+    "Mercury": 4,
+    "Venus": 8,
+    "Mars": 8,
+    "Jupiter": 16,
+    "Saturn": 16,
+    "Uranus": 16,
+    "Neptune": 32,
+    "Pluto": 32,
+    "Rahu": 32,
+}
+DEFAULT_DEGREE = 13
+
+
+def _metadata_path(path: str):
+    return path[:-4] + ".json" if path.endswith(".npy") else path + ".json"
+
+
+def _chebyshev_nodes(degree: int):
+    n = degree + 1
+    return np.cos(np.pi * (np.arange(n) + 0.5) / n)
+
+
+def _clenshaw(coeffs: np.ndarray, x: np.ndarray):
+    """Evaluates Chebyshev series row-wise: `coeffs` is (n, degree+1) and `x` is (n,)"""
+    b1 = np.zeros_like(x)
+    b2 = np.zeros_like(x)
+    for k in range(coeffs.shape[-1] - 1, 0, -1):
+        b1, b2 = 2.0 * x * b1 - b2 + coeffs[:, k], b1
+    return x * b1 - b2 + coeffs[:, 0]
+
+
+def build_ephemeris_cache(
+    path: str,
+    start_year: int = 1900,
+    end_year: int = 2100,
+    ayanamsa: str = "Krishnamurti",
+    objects: list = None,
+    degree: int = DEFAULT_DEGREE,
+    segment_days: dict = None,
+    flags: int = swe.FLG_SWIEPH,
+    n_validation: int = 2000,
+):
+    """
+    Fits and saves the Chebyshev ephemeris cache for a date range and ayanamsa.
+
+    Parameters:
+    - path: output `.npy` file; the metadata is written next to it as `.json`
+    - start_year: first year covered (from Jan 1st, 00:00 UT)
+    - end_year: last year covered (up to Dec 31st, 24:00 UT)
+    - ayanamsa: ayanamsa name, one of `SWE_AYANAMSA_MAPPING`
+    - objects: grahas to include, defaults to all of `GRAHAS` except Ketu (always derived from Rahu)
+    - degree: Chebyshev polynomial degree of every segment
+    - segment_days: per-object segment length overrides, see `DEFAULT_SEGMENT_DAYS`
+    - flags: swe ephemeris flags used for the fit, i.e `swe.FLG_SWIEPH` or `swe.FLG_MOSEPH`
+    - n_validation: number of random instants per object used to measure the error bounds
+
+    Returns:
+    - EphemerisCache: the freshly built cache, loaded from `path`
+    """
+    if ayanamsa not in SWE_AYANAMSA_MAPPING:
+        raise ValueError(f"Unknown ayanamsa '{ayanamsa}'. Choose one of {list(SWE_AYANAMSA_MAPPING)}")
+    objects = [obj for obj in (objects or GRAHAS) if obj != "Ketu"]
+    seg_days = {**DEFAULT_SEGMENT_DAYS, **(segment_days or {})}
+
+    jd_start = swe.julday(start_year, 1, 1, 0.0)
+    jd_end = swe.julday(end_year + 1, 1, 1, 0.0)
+
+    nodes = _chebyshev_nodes(degree)
+    ## Pseudo-inverse of the Chebyshev Vandermonde matrix maps node values to coefficients for all segments at once
+    inv_vander = np.linalg.pinv(np.polynomial.chebyshev.chebvander(nodes, degree))
+
+    blocks, objects_meta, offset = [], {}, 0
+    for obj in objects:
+        days = float(seg_days[obj])
+        n_segments = int(np.ceil((jd_end - jd_start) / days))
+        seg_starts = jd_start + days * np.arange(n_segments)
+        node_jds = seg_starts[:, None] + (nodes[None, :] + 1.0) * days / 2.0
+        lon, lat, speed = calc_sidereal_positions(node_jds, obj, ayanamsa, flags)
+        lon = np.unwrap(lon, period=360.0, axis=1)
+        values = np.stack([lon, lat, speed], axis=1)  # (segments, channels, nodes)
+        blocks.append(values @ inv_vander.T)
+        objects_meta[obj] = {"offset": offset, "count": n_segments, "segment_days": days}
+        offset += n_segments
+        logger.info("Fitted %s segments for %s", n_segments, obj)
+
+    coeffs = np.concatenate(blocks, axis=0)
+    np.save(path, coeffs)
+
+    metadata = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "ayanamsa": ayanamsa,
+        "jd_start": jd_start,
+        "jd_end": jd_end,
+        "degree": degree,
+        "flags": flags,
+        "objects": objects_meta,
+    }
+    with open(_metadata_path(path), "w") as fh:
+        json.dump(metadata, fh, indent=2)
+
+    cache = EphemerisCache(path)
+    metadata["max_error"] = cache.validate(n_samples=n_validation, flags=flags)
+    with open(_metadata_path(path), "w") as fh:
+        json.dump(metadata, fh, indent=2)
+    cache.metadata = metadata
+    return cache
+
+
+class EphemerisCache:
+    def __init__(self, path: str):
+        """
+        Loads a cache built by `build_ephemeris_cache`. The coefficients are memory mapped, so
+        several processes can share one cache file without each holding a copy in memory.
+
+        Parameters
+        ==========
+        path: path of the `.npy` coefficients file
+        """
+        self.path = path
+        with open(_metadata_path(path)) as fh:
+            self.metadata = json.load(fh)
+        if self.metadata.get("format_version") != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported ephemeris cache format in {path}")
+        self.coeffs = np.load(path, mmap_mode="r")
+        self.ayanamsa = self.metadata["ayanamsa"]
+        self.jd_start = self.metadata["jd_start"]
+        self.jd_end = self.metadata["jd_end"]
+
+    @property
+    def objects(self):
+        """Returns the objects served by this cache, Ketu included whenever Rahu is cached"""
+        objs = list(self.metadata["objects"])
+        return objs + ["Ketu"] if "Rahu" in objs else objs
+
+    @property
+    def max_error(self):
+        """Returns the measured worst case error against swe, per object: lon/lat in arc-seconds, speed in deg/day"""
+        return self.metadata.get("max_error", {})
+
+    def covers(self, jd):
+        """Returns True if every Julian day in `jd` is inside the cached date range"""
+        jd = np.asarray(jd, dtype=np.float64)
+        return bool(np.all((jd >= self.jd_start) & (jd < self.jd_end)))
+
+    def positions(self, obj: str, jd):
+        """
+        Returns the sidereal (lon, lat, speed) of `obj` for a scalar or array of Julian days (UT).
+        Longitudes are normalized to [0, 360).
+        """
+        if obj not in self.objects:
+            raise ValueError(f"Object '{obj}' is not in this ephemeris cache")
+        jd = np.asarray(jd, dtype=np.float64)
+        if not self.covers(jd):
+            raise ValueError(
+                f"Julian day outside the cached range [{self.jd_start}, {self.jd_end})"
+            )
+        meta = self.metadata["objects"]["Rahu" if obj == "Ketu" else obj]
+        days = meta["segment_days"]
+
+        flat_jd = jd.ravel()
+        seg_idx = np.minimum(((flat_jd - self.jd_start) // days).astype(np.int64), meta["count"] - 1)
+        x = 2.0 * (flat_jd - (self.jd_start + seg_idx * days)) / days - 1.0
+        seg_coeffs = self.coeffs[meta["offset"] + seg_idx]
+
+        lon = _clenshaw(seg_coeffs[:, 0], x) % 360.0
+        lat = _clenshaw(seg_coeffs[:, 1], x)
+        speed = _clenshaw(seg_coeffs[:, 2], x)
+        if obj == "Ketu":
+            lon, lat = (lon + 180.0) % 360.0, -lat
+        ## A longitude a hair below 0 wraps to exactly 360.0 in floating point (-1e-15 % 360.0 == 360.0)
+        lon = np.where(lon >= 360.0, 0.0, lon)
+        return lon.reshape(jd.shape), lat.reshape(jd.shape), speed.reshape(jd.shape)
+
+    def validate(self, n_samples: int = 2000, flags: int = None, seed: int = 0):
+        """
+        Measures the worst case difference of the cache against swe at random instants.
+
+        Returns:
+        - dict: {object: {"lon_arcsec", "lat_arcsec", "speed"}}
+        """
+        flags = self.metadata["flags"] if flags is None else flags
+        rng = np.random.default_rng(seed)
+        jd = rng.uniform(self.jd_start, self.jd_end, n_samples)
+        errors = {}
+        for obj in self.metadata["objects"]:
+            ref_lon, ref_lat, ref_speed = calc_sidereal_positions(jd, obj, self.ayanamsa, flags)
+            lon, lat, speed = self.positions(obj, jd)
+            lon_diff = (lon - ref_lon + 180.0) % 360.0 - 180.0
+            errors[obj] = {
+                "lon_arcsec": float(np.abs(lon_diff).max() * 3600),
+                "lat_arcsec": float(np.abs(lat - ref_lat).max() * 3600),
+                "speed": float(np.abs(speed - ref_speed).max()),
+            }
+        return errors
@@ -1,37 +1,129 @@
-import os
+import collections
+import json
 import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import numpy as np
 import polars as pl
 import swisseph as swe
 from datetime import datetime
-from .utils import dms_to_decdeg, utc_offset_str_to_float
-from .VedicAstro import VedicHoroscopeData
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version, PackageNotFoundError
+from .ephemeris import jd_to_datetime
+from .house_cusps import ascendant_from_armc, compute_tropical_cusps, get_sidereal_state
+from .timezones import local_to_julian_days
+from .utils import utc_offset_str_to_float
+from .VedicAstro import VedicHoroscopeData, ROMAN_HOUSE_NUMBERS
+from .kp_divisions import KP_SL_DMS_DATA, VIMSHOTTARI_LORDS, get_rl_nl_sl_codes
 
 logger = logging.getLogger(__name__)
 
 ## Global Constants
 SWE_AYANAMAS = { "Krishnamurti" : swe.SIDM_KRISHNAMURTI, "Krishnamurti_Senthilathiban": swe.SIDM_KRISHNAMURTI_VP291}
+HORARY_CACHE_SIZE = 4096
+## Multi-location search: ascendant sampling step, Newton iterations, and the match offset past the
+## sub division start (the middle of the 0.0001 - 0.001 degree window of `find_exact_ascendant_time`)
+HORARY_SAMPLE_MINUTES = 60
+HORARY_MAX_ITERATIONS = 30
+HORARY_TOLERANCE_DAYS = 1e-3 / 86400
+HORARY_MATCH_OFFSET_DEG = 0.0005
+## Path of the optional on-disk cache tier, shared by all worker processes on the host
+HORARY_CACHE_DB_ENV = "VEDICASTRO_HORARY_CACHE_DB"
+
+try:
+    LIBRARY_VERSION = version("vedicastro")
+except PackageNotFoundError:
+    LIBRARY_VERSION = "dev"
+
+
+class HoraryResultCache:
+    """
+    Two tier cache of horary results: a bounded in-memory LRU in front of an optional SQLite file.
+    Values must be JSON serializable. Both tiers hold the JSON text and every hit returns a fresh copy, so
+    callers may modify what they get. Entries written by another library version are ignored and purged
+    when the database is opened, so upgrading the package invalidates the cache.
+    """
+
+    def __init__(self, maxsize: int = HORARY_CACHE_SIZE, db_path: str = None):
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts):
+        return json.dumps([LIBRARY_VERSION, *parts])
+
+    def _db(self):
+        """Opens the SQLite connection lazily, once per process (connections must not cross a fork)"""
+        if self.db_path is None:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS horary_results (key TEXT PRIMARY KEY, version TEXT, value TEXT)")
+            self._conn.execute("DELETE FROM horary_results WHERE version != ?", (LIBRARY_VERSION,))
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str):
+        """Returns a copy of the cached value, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return json.loads(self._memory[key])
+            db = self._db()
+            row = db.execute("SELECT value FROM horary_results WHERE key = ?", (key,)).fetchone() if db else None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, row[0])
+            return json.loads(row[0])
 
-# Determine the absolute path to the directory where this script is located
-current_dir = os.path.abspath(os.path.dirname(__file__))
-csv_file_path = os.path.join(current_dir, "data", "KP_SL_Divisions.csv")
-## Read KP SubLord Divisions CSV File
-KP_SL_DMS_DATA = pl.read_csv(csv_file_path)
-KP_SL_DMS_DATA = KP_SL_DMS_DATA\
-                .with_columns(pl.arange(1, KP_SL_DMS_DATA.height + 1).alias("SL_Div_Nr"))\
-                .with_columns([
-                    pl.col('From_DMS').map_elements(dms_to_decdeg, return_dtype=pl.Float64).alias('From_DecDeg'),
-                    pl.col('To_DMS').map_elements(dms_to_decdeg, return_dtype=pl.Float64).alias('To_DecDeg'),
-                    pl.col("From_DMS").str.replace_all(":", "").cast(pl.Int32).alias("From_DMS_int"),
-                    pl.col("To_DMS").str.replace_all(":", "").cast(pl.Int32).alias("To_DMS_int")
-                ])
-
-def jd_to_datetime(jdt: float, tz_offset: float):
-    utc = swe.jdut1_to_utc(jdt) 
-    # Convert UTC to local time - note negative sign before tzoffset to convert from UTC to IST
-    year, month, day, hour, minute, seconds  = swe.utc_time_zone(*utc, offset = -tz_offset)
-    # Convert the fractional seconds to microseconds
-    microseconds = int(seconds % 1 * 1_000_000)
-    return datetime(year, month, day, hour, minute, int(seconds), microseconds)
+    def set(self, key: str, value):
+        text = json.dumps(value)
+        with self._lock:
+            self._remember(key, text)
+            db = self._db()
+            if db:
+                db.execute(
+                    "INSERT OR REPLACE INTO horary_results (key, version, value) VALUES (?, ?, ?)",
+                    (key, LIBRARY_VERSION, text),
+                )
+                db.commit()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            if db:
+                db.execute("DELETE FROM horary_results")
+                db.commit()
+
+
+HORARY_CACHE = HoraryResultCache(db_path=os.environ.get(HORARY_CACHE_DB_ENV))
+
+
+def configure_horary_cache(maxsize: int = HORARY_CACHE_SIZE, db_path: str = None):
+    """Replaces the module level horary result cache, eg: to enable the on-disk tier at runtime"""
+    global HORARY_CACHE
+    HORARY_CACHE = HoraryResultCache(maxsize=maxsize, db_path=db_path)
+    return HORARY_CACHE
 
 def get_horary_ascendant_degree(horary_number: int):
     """
@@ -56,7 +148,14 @@ def get_horary_ascendant_degree(horary_number: int):
     else:
         return "SL Div Nr. out of range. Please provide a number between 1 and 249."
 
-def find_exact_ascendant_time(year: int, month: int, day: int, utc_offset: str, lat: float, lon: float, horary_number: int, ayanamsa : str) -> datetime:
+def _get_horary_houses(matched_jd: float, utc_offset: str, lat: float, lon: float, ayanamsa: str):
+    """Builds the Placidus houses chart and houses data of the horary chart at the matched Julian day (UT)"""
+    vhd_hora = VedicHoroscopeData.from_jd(matched_jd, latitude = lat, longitude = lon, tz = utc_offset,
+                                          ayanamsa = ayanamsa, house_system = "Placidus")
+    houses_chart = vhd_hora.generate_chart()
+    return houses_chart, vhd_hora.get_houses_data_from_chart(houses_chart)
+
+def find_exact_ascendant_time(year: int, month: int, day: int, utc_offset: str, lat: float, lon: float, horary_number: int, ayanamsa : str, use_cache: bool = True) -> datetime:
     """
     Finds the exact time when the Ascendant is at the desired degree.
 
@@ -69,11 +168,22 @@ def find_exact_ascendant_time(year: int, month: int, day: int, utc_offset: str,
     - lon: Longitude pertaining to the horary question's predictor (astrologer).
     - horary_number: The horary number for which to retrieve the ascendant details to match.
     - ayanamsa: The ayanamsa to be used when constructing the chart
+    - use_cache: Look up / store the matched time in `HORARY_CACHE`; on a hit only the final chart is rebuilt
 
     Returns:
     - matched_time: a datetime object, when the Ascendant matches the desired degree.
     If no match is found within the day, returns None.
     """
+    cache_key = HoraryResultCache.make_key("ascendant_time", year, month, day, utc_offset, lat, lon, horary_number, ayanamsa)
+    cached = HORARY_CACHE.get(cache_key) if use_cache else None
+    if cached is not None:
+        if not cached["matched_time"]:
+            logger.info("No matching Ascendant time found for the given input")
+            return None
+        matched_time = datetime.fromisoformat(cached["matched_time"])
+        matched_jd = cached.get("julian_day") or local_to_julian_days([matched_time], utc_offset)[0]
+        return (matched_time, *_get_horary_houses(matched_jd, utc_offset, lat, lon, ayanamsa))
+
     ## Retrieve Horary Asc Details from given horary_number
     horary_asc = get_horary_ascendant_degree(horary_number) 
     horary_asc_deg = horary_asc["ZodiacDegreeLocation"]
@@ -113,14 +223,13 @@ def find_exact_ascendant_time(year: int, month: int, day: int, utc_offset: str,
 
         if 0.0001 < asc_deg_diff <= 0.001:
             matched_time = jd_to_datetime(current_time, utc_float)
-            secs_final = matched_time.second + (matched_time.microsecond) / 1_000_000
-            vhd_hora = VedicHoroscopeData(year, month, day, matched_time.hour, matched_time.minute, secs_final, utc_offset, lat, lon, ayanamsa, "Placidus")
-            houses_chart = vhd_hora.generate_chart()
-            houses_data = vhd_hora.get_houses_data_from_chart(houses_chart)
+            houses_chart, houses_data = _get_horary_houses(current_time, utc_offset, lat, lon, ayanamsa)
             asc = houses_data[0]
             # print(f"**UNMATCHED**===ReqSubLord: {req_sublord} || CurrentAscSL: {asc.SubLord}")
             if asc.SubLord == req_sublord:
                 # print(f"Nr.Iterations: {counter} || Matched Time: {matched_time} || Final Ascendant: {asc_lon_deg} || ReqSL: {req_sublord} || CurrentAscSL: {asc.SubLord}")
+                if use_cache:
+                    HORARY_CACHE.set(cache_key, {"matched_time": matched_time.isoformat(), "julian_day": current_time})
                 return matched_time, houses_chart, houses_data
             
         
@@ -128,41 +237,184 @@ def find_exact_ascendant_time(year: int, month: int, day: int, utc_offset: str,
         counter += 1
 
     logger.info("No matching Ascendant time found for the given input")
+    if use_cache:
+        HORARY_CACHE.set(cache_key, {"matched_time": None})
     return None
 
 
 
+def _sidereal_ascendant(jd, lat, lon, ayanamsa: str):
+    """Sidereal ascendant and its rate (degrees/day) for arrays of instants and locations"""
+    step = 1.0 / 86400
+    both = np.concatenate([jd, jd + step])
+    gast, obliquity, ayanamsa_deg = get_sidereal_state(both, ayanamsa)
+    asc = (ascendant_from_armc((gast + np.tile(lon, 2)) % 360.0, obliquity, np.tile(lat, 2)) - ayanamsa_deg) % 360.0
+    return asc[: jd.size], ((asc[jd.size :] - asc[: jd.size] + 180.0) % 360.0 - 180.0) / step
+
+
+def _solve_horary_chunk(jd_start, lat, lon, target, ayanamsa):
+    """
+    First crossing of the target degree by the ascendant within one day of each `jd_start`, all rows at once,
+    and the sidereal Placidus cusps at that time. The ascendant only moves forward, so the crossing is where
+    (asc - target) % 360 wraps around.
+    """
+    n_samples = 24 * 60 // HORARY_SAMPLE_MINUTES + 1
+    offsets = np.linspace(0.0, 1.0, n_samples)
+    t = (jd_start[:, None] + offsets[None, :]).ravel()
+    repeat = lambda values: np.repeat(values, n_samples)
+    asc, _ = _sidereal_ascendant(t, repeat(lat), repeat(lon), ayanamsa)
+    dist = ((asc - repeat(target)) % 360.0).reshape(-1, n_samples)
+    wraps = dist[:, 1:] < dist[:, :-1]
+    found = wraps.any(axis=1)
+    first = np.argmax(wraps, axis=1)
+    t_lo = jd_start + offsets[first]
+    t_hi = jd_start + offsets[first + 1]
+
+    ## Safeguarded Newton on all rows, falling back to bisection when a step leaves the bracket
+    t_mid = (t_lo + t_hi) / 2
+    for _ in range(HORARY_MAX_ITERATIONS):
+        asc, rate = _sidereal_ascendant(t_mid, lat, lon, ayanamsa)
+        diff = (asc - target + 180.0) % 360.0 - 180.0
+        past = diff > 0
+        t_lo, t_hi = np.where(past, t_lo, t_mid), np.where(past, t_mid, t_hi)
+        newton = t_mid - diff / rate
+        new_t = np.where((newton >= t_lo) & (newton <= t_hi), newton, (t_lo + t_hi) / 2)
+        step = np.max(np.abs(new_t - t_mid))
+        t_mid = new_t
+        if step < HORARY_TOLERANCE_DAYS:
+            break
+    matched_jd = np.where(found, t_mid, np.nan)
+
+    ## Placidus cusps at the matched times
+    cusps = np.full((matched_jd.size, 12), np.nan)
+    if found.any():
+        gast, obliquity, ayanamsa_deg = get_sidereal_state(matched_jd[found], ayanamsa)
+        tropical, _, _ = compute_tropical_cusps((gast + lon[found]) % 360.0, obliquity, lat[found], "Placidus")
+        cusps[found] = (tropical - ayanamsa_deg[:, None]) % 360.0
+    return matched_jd, cusps
+
+
+def find_exact_ascendant_times(horary_numbers, locations: list, dates, ayanamsa: str = "Krishnamurti",
+                               n_jobs: int = 1, chunk_size: int = 10_000) -> pl.DataFrame:
+    """
+    Multi-location counterpart of `find_exact_ascendant_time`, solving every (horary number, location) pair together.
+
+    Parameters:
+    - horary_numbers: one horary number or a list of them (1 - 249)
+    - locations: list of (lat, lon, utc_offset) tuples, eg: [(12.97, 77.59, "+5:30"), (19.07, 72.87, "+5:30")]
+    - dates: one (year, month, day) for all locations, or a list / tuple of them aligned with `locations`
+    - ayanamsa: The ayanamsa to be used when constructing the chart
+    - n_jobs: number of worker processes; rows are split into chunks of `chunk_size` pairs
+    - chunk_size: number of (horary number, location) pairs solved per vectorized call
+
+    Returns:
+    - polars DataFrame with one row per pair: the inputs, the local `MatchedTime` (null when no match within
+      the day), `JulianDay`, the Placidus cusps in columns "I" - "XII" and the ascendant `SubLord`
+    """
+    horary_numbers = [horary_numbers] if isinstance(horary_numbers, int) else list(horary_numbers)
+    ## A single (year, month, day) applies to every location; a tuple of such tuples is one date per location
+    if len(dates) == 3 and all(isinstance(part, int) for part in dates):
+        dates = [tuple(dates)] * len(locations)
+    if len(dates) != len(locations):
+        raise ValueError("`dates` must be one (year, month, day) tuple or one per location")
+    targets = {}
+    for horary_number in horary_numbers:
+        horary_asc = get_horary_ascendant_degree(horary_number)
+        if isinstance(horary_asc, str):
+            raise ValueError(horary_asc)
+        targets[horary_number] = horary_asc["ZodiacDegreeLocation"] + HORARY_MATCH_OFFSET_DEG
+
+    ## Local midnight of each location's date, as in `find_exact_ascendant_time`
+    day_starts = {}
+    for (year, month, day), (_, _, utc_offset) in zip(dates, locations):
+        if (year, month, day, utc_offset) not in day_starts:
+            utc = swe.utc_time_zone(year, month, day, hour = 0, minutes = 0, seconds = 0, offset = utc_offset_str_to_float(utc_offset))
+            day_starts[(year, month, day, utc_offset)] = swe.utc_to_jd(*utc)[1]
+
+    rows = [
+        (horary_number, lat, lon, utc_offset, year, month, day)
+        for horary_number in horary_numbers
+        for (lat, lon, utc_offset), (year, month, day) in zip(locations, dates)
+    ]
+    jd_start = np.array([day_starts[(year, month, day, utc_offset)] for _, _, _, utc_offset, year, month, day in rows])
+    lat = np.array([row[1] for row in rows], dtype=np.float64)
+    lon = np.array([row[2] for row in rows], dtype=np.float64)
+    target = np.array([targets[row[0]] for row in rows])
+
+    chunks = [slice(i, i + chunk_size) for i in range(0, len(rows), chunk_size)]
+    args = [(jd_start[c], lat[c], lon[c], target[c], ayanamsa) for c in chunks]
+    if n_jobs > 1 and len(chunks) > 1:
+        ## Spawned, not forked: polars' thread pool and the `HORARY_CACHE` SQLite connection must not cross a fork
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_solve_horary_chunk, *zip(*args)))
+    else:
+        results = [_solve_horary_chunk(*arg) for arg in args]
+    matched_jd = np.concatenate([jd for jd, _ in results]) if results else np.array([])
+    cusps = np.concatenate([cusp for _, cusp in results]) if results else np.empty((0, 12))
+
+    ok = ~np.isnan(matched_jd)
+    sub_lords = [None] * len(rows)
+    for i, code in zip(np.flatnonzero(ok), get_rl_nl_sl_codes(cusps[ok, 0])["SubLord"]):
+        sub_lords[i] = VIMSHOTTARI_LORDS[code]
+
+    matched_times = [
+        jd_to_datetime(float(jd), utc_offset_str_to_float(row[3])) if not np.isnan(jd) else None
+        for jd, row in zip(matched_jd, rows)
+    ]
+    data = {
+        "HoraryNumber": [row[0] for row in rows],
+        "Latitude": lat,
+        "Longitude": lon,
+        "UTCOffset": [row[3] for row in rows],
+        "Date": [datetime(row[4], row[5], row[6]).date() for row in rows],
+        "MatchedTime": matched_times,
+        "JulianDay": matched_jd,
+    }
+    data.update({roman: np.round(cusps[:, i], 6) for i, roman in enumerate(ROMAN_HOUSE_NUMBERS.values())})
+    data["SubLord"] = sub_lords
+    return pl.DataFrame(data).with_columns(pl.col("JulianDay").fill_nan(None))
+
+
 def generate_basic_kp_chart(horary_number: int, year: int, month: int, day: int,
                              utc_offset: str, lat: float, lon: float,
                              ayanamsa: str = "Krishnamurti",
-                             house_system: str = "Placidus") -> dict:
+                             house_system: str = "Placidus",
+                             use_cache: bool = True) -> dict:
     """Generate basic KP chart data for a given horary number.
 
     This uses the KP horary method to find the exact ascendant time matching
     the requested sublord and then constructs planetary and house data using
-    :class:`VedicHoroscopeData`.
+    :class:`VedicHoroscopeData`. Results are kept in `HORARY_CACHE` unless
+    `use_cache` is False.
     """
+    cache_key = HoraryResultCache.make_key("basic_kp_chart", year, month, day, utc_offset, lat, lon,
+                                           horary_number, ayanamsa, house_system)
+    cached = HORARY_CACHE.get(cache_key) if use_cache else None
+    if cached is not None:
+        return cached
+
     result = find_exact_ascendant_time(year, month, day, utc_offset, lat, lon,
-                                       horary_number, ayanamsa)
+                                       horary_number, ayanamsa, use_cache)
     if not result:
         raise ValueError("No matching ascendant found for the given input")
 
     matched_time, houses_chart, houses_data = result
-    secs = matched_time.second + matched_time.microsecond / 1_000_000
-    vhd = VedicHoroscopeData(matched_time.year, matched_time.month,
-                             matched_time.day, matched_time.hour,
-                             matched_time.minute, secs, utc_offset, lat, lon,
-                             ayanamsa, house_system)
+    vhd = VedicHoroscopeData.from_jd(houses_chart.date.jd, latitude=lat,
+                                     longitude=lon, tz=utc_offset,
+                                     ayanamsa=ayanamsa, house_system=house_system)
 
     planets_chart = vhd.generate_chart()
     planets_data = vhd.get_planets_data_from_chart(planets_chart, houses_chart)
 
-    return {
+    chart = {
         "matched_time": matched_time.isoformat(),
         "ascendant_degree": houses_data[0].LonDecDeg,
         "houses_data": [house._asdict() for house in houses_data],
         "planets_data": [planet._asdict() for planet in planets_data],
     }
+    if use_cache:
+        HORARY_CACHE.set(cache_key, chart)
+    return chart
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+"""
+Vectorized house cusp and ascendant computation over a time grid for one location.
+
+Instead of one `swe.houses_ex` call per instant, the slowly varying inputs (Greenwich apparent
+sidereal time, true obliquity and ayanamsa) are taken from swe at hourly nodes and interpolated,
+and the cusps are then computed in bulk from ARMC with the closed form ascendant / MC formulas
+and the Placidus semi-arc iteration. The interpolation moves the cusps by well under a milli-arc-second
+(checked against per-instant swe state in `test_suite/house_cusps_test.py`).
+"""
+
+import numpy as np
+import swisseph as swe
+from .ephemeris import SWE_HOUSE_SYSTEM_MAPPING, set_ayanamsa
+from .kp_divisions import DIVISION_EDGES, get_rl_nl_sl_codes
+from .transit_events import boundary_count, solve_crossings, wrap_degrees
+
+## Spacing of the swe evaluations of sidereal time, obliquity and ayanamsa
+SIDEREAL_STATE_NODE_DAYS = 1 / 24
+PLACIDUS_MAX_ITERATIONS = 50
+PLACIDUS_TOLERANCE = 1e-9  # degrees of right ascension
+SECONDS_PER_DAY = 86400
+## Cusps are sampled this often to bracket their division crossings (they only move forward)
+CUSP_SAMPLE_SECONDS = 600.0
+CUSP_RATE_STEP_SECONDS = 10.0
+
+
+def julian_day_grid(jd_start: float, jd_end: float, step_seconds: float = 1.0):
+    """Returns the Julian days from `jd_start` (inclusive) to `jd_end` (exclusive) every `step_seconds`"""
+    step = step_seconds / SECONDS_PER_DAY
+    n_steps = int(np.ceil((jd_end - jd_start) / step))
+    return jd_start + step * np.arange(n_steps)
+
+
+def get_sidereal_state(jd, ayanamsa: str):
+    """
+    Returns the (Greenwich apparent sidereal time, true obliquity, ayanamsa) in degrees for each Julian day.
+    swe is called at most once per hour of the covered time span, or once per instant for sparse inputs.
+    """
+    jd = np.asarray(jd, dtype=np.float64)
+    jd_min, jd_max = float(jd.min()), float(jd.max())
+    n_nodes = int(np.ceil((jd_max - jd_min) / SIDEREAL_STATE_NODE_DAYS)) + 2
+    interpolate = n_nodes < jd.size
+    nodes = jd_min + SIDEREAL_STATE_NODE_DAYS * np.arange(n_nodes) if interpolate else jd.ravel()
+
+    set_ayanamsa(ayanamsa)
+    gast = np.array([swe.sidtime(t) * 15.0 for t in nodes])
+    obliquity = np.array([swe.calc_ut(t, swe.ECL_NUT)[0][0] for t in nodes])
+    ayanamsa_deg = np.array([swe.get_ayanamsa_ex_ut(t, 0)[1] for t in nodes])
+
+    if not interpolate:
+        return gast.reshape(jd.shape), obliquity.reshape(jd.shape), ayanamsa_deg.reshape(jd.shape)
+    gast = np.unwrap(gast, period=360.0)
+    return (
+        np.interp(jd, nodes, gast) % 360.0,
+        np.interp(jd, nodes, obliquity),
+        np.interp(jd, nodes, ayanamsa_deg),
+    )
+
+
+def ascendant_from_armc(armc, obliquity, lat: float):
+    """Tropical ascendant (degrees) from ARMC and obliquity, for an array of instants at one latitude"""
+    armc, eps, phi = np.radians(armc), np.radians(obliquity), np.radians(lat)
+    asc = np.arctan2(np.cos(armc), -(np.sin(armc) * np.cos(eps) + np.tan(phi) * np.sin(eps)))
+    return np.degrees(asc) % 360.0
+
+
+def mc_from_armc(armc, obliquity):
+    """Tropical midheaven (degrees) from ARMC and obliquity"""
+    armc, eps = np.radians(armc), np.radians(obliquity)
+    return np.degrees(np.arctan2(np.sin(armc), np.cos(armc) * np.cos(eps))) % 360.0
+
+
+def _ecliptic_lon_from_ra(ra, eps):
+    ra = np.radians(ra)
+    return np.arctan2(np.sin(ra), np.cos(ra) * np.cos(eps))
+
+
+def _placidus_cusp(armc, obliquity, lat: float, fraction: float, below_horizon: bool):
+    """
+    Placidus cusp trisecting the diurnal (houses 11, 12) or nocturnal (houses 2, 3) semi-arc,
+    found by fixed point iteration on the cusp declination.
+    """
+    eps = np.radians(obliquity)
+    sin_eps, cos_eps = np.sin(eps), np.cos(eps)
+    tan_lat = np.tan(np.radians(lat))
+    ra = armc + (180.0 - fraction * 90.0 if below_horizon else fraction * 90.0)
+    for _ in range(PLACIDUS_MAX_ITERATIONS):
+        ## sin(declination) of the ecliptic point with right ascension `ra`, without the intermediate atan2
+        ra_rad = np.radians(ra)
+        sin_ra = np.sin(ra_rad)
+        sin_dec = sin_eps * sin_ra / np.hypot(sin_ra, np.cos(ra_rad) * cos_eps)
+        tan_dec = sin_dec / np.sqrt(1.0 - sin_dec**2)
+        diurnal_semi_arc = 90.0 + np.degrees(np.arcsin(np.clip(tan_lat * tan_dec, -1.0, 1.0)))
+        if below_horizon:
+            new_ra = armc + 180.0 - fraction * (180.0 - diurnal_semi_arc)
+        else:
+            new_ra = armc + fraction * diurnal_semi_arc
+        converged = np.max(np.abs(new_ra - ra)) < PLACIDUS_TOLERANCE
+        ra = new_ra
+        if converged:
+            break
+    return np.degrees(_ecliptic_lon_from_ra(ra, eps)) % 360.0
+
+
+def compute_tropical_cusps(armc, obliquity, lat, house_system: str = "Placidus"):
+    """
+    Computes the 12 tropical house cusps from ARMC and obliquity, at one latitude or one latitude per instant.
+
+    Returns:
+    - (cusps, asc, mc): cusps is an (n, 12) array with house 1 in column 0
+    """
+    if house_system not in SWE_HOUSE_SYSTEM_MAPPING:
+        raise ValueError(f"Unknown house system '{house_system}'. Choose one of {list(SWE_HOUSE_SYSTEM_MAPPING)}")
+    armc = np.atleast_1d(np.asarray(armc, dtype=np.float64))
+    obliquity = np.broadcast_to(np.asarray(obliquity, dtype=np.float64), armc.shape)
+    asc = ascendant_from_armc(armc, obliquity, lat)
+    mc = mc_from_armc(armc, obliquity)
+
+    if house_system == "Placidus":
+        if np.any(np.abs(lat) >= 90.0 - np.max(obliquity)):
+            raise ValueError("Placidus houses are undefined inside the polar circles")
+        cusp_11 = _placidus_cusp(armc, obliquity, lat, 1 / 3, below_horizon=False)
+        cusp_12 = _placidus_cusp(armc, obliquity, lat, 2 / 3, below_horizon=False)
+        cusp_2 = _placidus_cusp(armc, obliquity, lat, 2 / 3, below_horizon=True)
+        cusp_3 = _placidus_cusp(armc, obliquity, lat, 1 / 3, below_horizon=True)
+        ## Houses 4 - 9 are opposite houses 10, 11, 12, 1, 2, 3
+        opposite = lambda cusp: (cusp + 180.0) % 360.0
+        cusps = np.stack(
+            [
+                asc, cusp_2, cusp_3, opposite(mc), opposite(cusp_11), opposite(cusp_12),
+                opposite(asc), opposite(cusp_2), opposite(cusp_3), mc, cusp_11, cusp_12,
+            ],
+            axis=1,
+        )
+    else:
+        ## Equal houses (both swe variants start at the ascendant); whole sign is resolved after the ayanamsa shift
+        cusps = (asc[:, None] + 30.0 * np.arange(12)[None, :]) % 360.0
+    return cusps, asc, mc
+
+
+def get_house_numbers(planet_lons, cusps):
+    """
+    House (cusp to cusp, as in `get_planet_in_house`) of each planet.
+    planet_lons is shaped (n, k) for k planets at n instants, cusps (n, 12); returns (n, k) house numbers.
+    """
+    offsets = (planet_lons[:, :, None] - cusps[:, None, :]) % 360.0
+    spans = (np.roll(cusps, -1, axis=1) - cusps) % 360.0
+    return np.argmax(offsets < spans[:, None, :], axis=2) + 1
+
+
+def compute_cusps_grid(
+    jd,
+    lat: float,
+    lon: float,
+    house_system: str = "Placidus",
+    ayanamsa: str = "Krishnamurti",
+    with_lords: bool = True,
+):
+    """
+    Computes the sidereal house cusps for many instants at one location.
+
+    Parameters:
+    - jd: array of Julian days (UT), eg: from `julian_day_grid`
+    - lat: latitude of the location
+    - lon: longitude of the location (east positive)
+    - house_system: one of `HOUSE_SYSTEM_MAPPING`
+    - ayanamsa: one of `AYANAMSA_MAPPING`
+    - with_lords: also look up the KP lords of every cusp
+
+    Returns:
+    - dict of NumPy arrays: "jd" (n,), "armc" (n,), "Asc" (n,), "MC" (n,), "cusps" (n, 12) and, when
+      `with_lords` is set, the integer code arrays of `get_rl_nl_sl_codes`, each shaped (n, 12)
+    """
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    gast, obliquity, ayanamsa_deg = get_sidereal_state(jd, ayanamsa)
+    armc = (gast + lon) % 360.0
+
+    cusps, asc, mc = compute_tropical_cusps(armc, obliquity, lat, house_system)
+    cusps = (cusps - ayanamsa_deg[:, None]) % 360.0
+    asc = (asc - ayanamsa_deg) % 360.0
+    mc = (mc - ayanamsa_deg) % 360.0
+    if house_system == "Whole Sign":
+        cusps = (np.floor(asc / 30.0)[:, None] * 30.0 + 30.0 * np.arange(12)[None, :]) % 360.0
+
+    grid = {"jd": jd, "armc": armc, "Asc": asc, "MC": mc, "cusps": cusps}
+    if with_lords:
+        grid.update(get_rl_nl_sl_codes(cusps))
+    return grid
+
+
+def make_cusps_position_func(lat: float, lon: float, house_system: str, ayanamsa: str):
+    """
+    Returns f(jd array, house index array) -> (cusp longitude, rate in degrees/day), the cusp counterpart of
+    `transit_events.make_position_func`. Each Julian day is paired with the 0-based index of its cusp
+    (0 = ascendant). One `compute_cusps_grid` call serves all cusps, so it can be passed to
+    `solve_crossings` with `columns`. The rate is a forward difference over `CUSP_RATE_STEP_SECONDS`.
+    """
+    step = CUSP_RATE_STEP_SECONDS / SECONDS_PER_DAY
+
+    def positions(jd, house_idx):
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        rows = np.arange(jd.size)
+        cusps = compute_cusps_grid(np.concatenate([jd, jd + step]), lat, lon, house_system, ayanamsa, with_lords=False)["cusps"]
+        cusp_lon = cusps[rows, house_idx]
+        return cusp_lon, wrap_degrees(cusps[jd.size + rows, house_idx] - cusp_lon) / step
+
+    return positions
+
+
+def find_cusp_crossings(cusps_func, levels: list, start: float, end: float, tol_days: float, house_nrs: list = None):
+    """
+    Finds the times at which house cusps cross the division edges of the given levels within [start, end].
+
+    The cusps are sampled every `CUSP_SAMPLE_SECONDS` (cusps only move forward, so the samples can be
+    unwrapped), every edge passed between two samples is bracketed, and the brackets of all cusps and
+    levels are root-found together, with one cusp grid evaluation per iteration.
+
+    Parameters:
+    - cusps_func: from `make_cusps_position_func`
+    - levels: keys of `DIVISION_EDGES`, eg: ["sub", "sub_sub"]
+    - start, end: Julian days (UT) of the search range
+    - tol_days: precision of the crossing times
+    - house_nrs: cusps to search (1 = ascendant), defaults to all 12
+
+    Returns:
+    - NumPy array of the crossing Julian days, sorted
+    """
+    house_idx = np.array([house_nr - 1 for house_nr in (house_nrs or range(1, 13))])
+    t = np.linspace(start, end, int(np.ceil((end - start) * SECONDS_PER_DAY / CUSP_SAMPLE_SECONDS)) + 1)
+    cusp_lon, _ = cusps_func(np.repeat(t, house_idx.size), np.tile(house_idx, t.size))
+    cusp_lon = cusp_lon.reshape(t.size, house_idx.size)
+    unwrapped = cusp_lon[0] + np.concatenate([np.zeros((1, house_idx.size)), np.cumsum(np.diff(cusp_lon, axis=0) % 360.0, axis=0)])
+
+    ## Brackets as (sample index, cusp column, target edge), for every cusp and level
+    seg_idx, columns, targets = [], [], []
+    for level in levels:
+        edges = DIVISION_EDGES[level][:-1]
+        for i in range(house_idx.size):
+            counts = boundary_count(unwrapped[:, i], edges).astype(np.int64)
+            n_cross = counts[1:] - counts[:-1]
+            if not n_cross.any():
+                continue
+            seg_idx.append(np.repeat(np.arange(t.size - 1), n_cross))
+            columns.append(np.full(seg_idx[-1].size, i))
+            targets.append(edges[np.concatenate([np.arange(lo, hi) for lo, hi in zip(counts[:-1], counts[1:]) if hi > lo]) % len(edges)])
+    if not seg_idx:
+        return np.empty(0)
+    seg_idx, columns = np.concatenate(seg_idx), np.concatenate(columns)
+    ## The bracket ends are samples, so their longitudes are known already
+    crossings = solve_crossings(
+        cusps_func, t[seg_idx], t[seg_idx + 1], np.concatenate(targets), tol_days, house_idx[columns],
+        bracket_angles=(cusp_lon[seg_idx, columns], cusp_lon[seg_idx + 1, columns]),
+    )
+    return np.sort(crossings)
@@ -0,0 +1,137 @@
+"""
+Vectorized KP division lookups.
+
+The sign, nakshatra, pada, sub and sub-sub divisions of the zodiac are precomputed into sorted
+boundary arrays, so the lords of any number of sidereal longitudes are found with a single
+`np.searchsorted` per level, instead of one `VedicHoroscopeData.get_rl_nl_sl_data` call per degree.
+Lords are returned as integer codes into `VIMSHOTTARI_LORDS` (rasi lords included), signs as codes
+into `RASHIS` and nakshatras as codes into `NAKSHATRAS`; `decode_codes` converts them back to names.
+Nakshatra and pada edges use the exact 13°20' arc, where `get_rl_nl_sl_data` uses 13.3333, so the two
+can only disagree within ~0.001° below a nakshatra edge.
+"""
+
+import os
+import numpy as np
+import polars as pl
+from .utils import dms_to_decdeg
+from .VedicAstro import RASHIS, NAKSHATRAS, SIGN_LORDS
+
+## Vimshottari order and years, as used by `get_rl_nl_sl_data` and `compute_vimshottari_dasa`
+VIMSHOTTARI_LORDS = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+VIMSHOTTARI_YEARS = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+LORD_CODES = {lord: code for code, lord in enumerate(VIMSHOTTARI_LORDS)}
+
+NAKSHATRA_SPAN = 360 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+# Determine the absolute path to the directory where this script is located
+current_dir = os.path.abspath(os.path.dirname(__file__))
+csv_file_path = os.path.join(current_dir, "data", "KP_SL_Divisions.csv")
+## Read KP SubLord Divisions CSV File
+KP_SL_DMS_DATA = pl.read_csv(csv_file_path)
+KP_SL_DMS_DATA = KP_SL_DMS_DATA\
+                .with_columns(pl.arange(1, KP_SL_DMS_DATA.height + 1).alias("SL_Div_Nr"))\
+                .with_columns([
+                    pl.col('From_DMS').map_elements(dms_to_decdeg, return_dtype=pl.Float64).alias('From_DecDeg'),
+                    pl.col('To_DMS').map_elements(dms_to_decdeg, return_dtype=pl.Float64).alias('To_DecDeg'),
+                    pl.col("From_DMS").str.replace_all(":", "").cast(pl.Int32).alias("From_DMS_int"),
+                    pl.col("To_DMS").str.replace_all(":", "").cast(pl.Int32).alias("To_DMS_int")
+                ])
+
+
+def _dms_to_deg_exact(dms_str: str):
+    """Unrounded counterpart of `dms_to_decdeg`, so the boundaries line up exactly with the sign edges"""
+    degrees, minutes, seconds = map(int, dms_str.split(":")[:3])
+    return degrees + minutes / 60 + seconds / 3600
+
+
+## Sub divisions: the 249 rows of the KP SubLord Divisions table (subs split at sign edges), indexed by SL_Div_Nr - 1
+SUB_EDGES = np.append(
+    np.array(
+        [
+            RASHIS.index(sign) * 30 + _dms_to_deg_exact(from_dms)
+            for sign, from_dms in KP_SL_DMS_DATA.select(["Sign", "From_DMS"]).iter_rows()
+        ]
+    ),
+    360.0,
+)
+SUB_LORD_CODES = np.array([LORD_CODES[lord] for lord in KP_SL_DMS_DATA["SubLord"]], dtype=np.int8)
+
+
+def _sub_sub_divisions():
+    """Walks nakshatra -> sub -> sub-sub in Vimshottari order, exactly like `get_rl_nl_sl_data`"""
+    edges, codes, start = [], [], 0.0
+    for nakshatra_index in range(27):
+        star_lord = nakshatra_index % 9
+        for j in range(9):
+            sub_lord = (star_lord + j) % 9
+            sub_span = NAKSHATRA_SPAN * VIMSHOTTARI_YEARS[sub_lord] / 120
+            for k in range(9):
+                sub_sub_lord = (sub_lord + k) % 9
+                edges.append(start)
+                codes.append(sub_sub_lord)
+                start += sub_span * VIMSHOTTARI_YEARS[sub_sub_lord] / 120
+    return np.append(np.array(edges), 360.0), np.array(codes, dtype=np.int8)
+
+
+SUB_SUB_EDGES, SUB_SUB_LORD_CODES = _sub_sub_divisions()
+SIGN_LORD_CODES = np.array([LORD_CODES[lord] for lord in SIGN_LORDS], dtype=np.int8)
+
+## Boundary longitudes of each division level, each array starting at 0 and ending at 360
+DIVISION_EDGES = {
+    "sign": np.arange(13) * 30.0,
+    "nakshatra": np.arange(28) * NAKSHATRA_SPAN,
+    "pada": np.arange(109) * PADA_SPAN,
+    "sub": SUB_EDGES,
+    "sub_sub": SUB_SUB_EDGES,
+}
+
+
+def get_division_index(lons, level: str):
+    """Returns the index of the `level` division (see `DIVISION_EDGES`) containing each sidereal longitude"""
+    edges = DIVISION_EDGES[level]
+    lons = np.asarray(lons, dtype=np.float64) % 360.0
+    return np.clip(np.searchsorted(edges, lons, side="right") - 1, 0, len(edges) - 2)
+
+
+def get_rl_nl_sl_codes(lons):
+    """
+    Vectorized counterpart of `VedicHoroscopeData.get_rl_nl_sl_data`.
+
+    Parameters:
+    - lons: scalar or array of sidereal longitudes in degrees, of any shape
+
+    Returns:
+    - dict of integer arrays shaped like `lons`, with keys "Rasi", "Nakshatra", "Pada",
+      "RasiLord", "NakshatraLord", "SubLord", "SubSubLord" and "SL_Div_Nr" (the horary number)
+    """
+    sign = get_division_index(lons, "sign")
+    nakshatra = get_division_index(lons, "nakshatra")
+    pada = get_division_index(lons, "pada") % 4 + 1
+    sub_div = get_division_index(lons, "sub")
+    sub_sub_div = get_division_index(lons, "sub_sub")
+    return {
+        "Rasi": sign,
+        "Nakshatra": nakshatra,
+        "Pada": pada,
+        "RasiLord": SIGN_LORD_CODES[sign],
+        "NakshatraLord": nakshatra % 9,
+        "SubLord": SUB_LORD_CODES[sub_div],
+        "SubSubLord": SUB_SUB_LORD_CODES[sub_sub_div],
+        "SL_Div_Nr": sub_div + 1,
+    }
+
+
+def decode_codes(codes: dict):
+    """Converts the integer arrays from `get_rl_nl_sl_codes` into arrays of names (Pada and SL_Div_Nr stay numeric)"""
+    names = {"Rasi": RASHIS, "Nakshatra": NAKSHATRAS}
+    lords = np.array(VIMSHOTTARI_LORDS)
+    decoded = {}
+    for key, values in codes.items():
+        if key in names:
+            decoded[key] = np.array(names[key])[values]
+        elif key in ("RasiLord", "NakshatraLord", "SubLord", "SubSubLord"):
+            decoded[key] = lords[values]
+        else:
+            decoded[key] = values
+    return decoded
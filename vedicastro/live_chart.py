@@ -0,0 +1,190 @@
+"""
+Incremental "live sky" chart for one location, advanced tick by tick.
+
+A full chart rebuild evaluates every object at every tick, although the grahas move so slowly that
+their sign, nakshatra and lords stay the same for minutes (Moon) to months (outer planets). Each
+object here keeps its last ephemeris evaluation (longitude, speed and acceleration) together with a
+horizon: a conservative bound on the time it needs to reach the nearest division boundary (sub-sub
+lord, pada, ...) or a station. Until the horizon is reached its position is extrapolated from that
+evaluation; only objects past their horizon are evaluated again. The ascendant and cusps move about
+a degree every 4 minutes and are recomputed at every tick from the sidereal time (see `house_cusps`).
+Each update reports exactly the table fields that changed.
+"""
+
+import collections
+import time
+import numpy as np
+import polars as pl
+import swisseph as swe
+from .chart_variants import VARIANT_COLS
+from .ephemeris import GRAHAS
+from .house_cusps import compute_tropical_cusps, get_house_numbers, get_sidereal_state
+from .kp_divisions import DIVISION_EDGES, decode_codes, get_rl_nl_sl_codes
+from .timezones import UNIX_EPOCH_JD
+from .transit_events import make_position_func
+from .VedicAstro import ROMAN_HOUSE_NUMBERS
+
+## Step used to estimate the acceleration of an object when it is evaluated
+ACCELERATION_STEP_DAYS = 1 / 24
+## Fraction of the estimated time to the next boundary / station used as horizon
+HORIZON_SAFETY = 0.5
+## Objects are evaluated again at least this often
+MAX_HORIZON_DAYS = 1.0
+
+## Every boundary at which one of the tracked fields can change
+ALL_EDGES = np.unique(np.concatenate(list(DIVISION_EDGES.values())))
+LIVE_FIELDS = ["Rasi", "Nakshatra", "Pada", "RasiLord", "NakshatraLord", "SubLord", "SubSubLord", "HouseNr", "isRetroGrade"]
+LIVE_CHART_COLS = VARIANT_COLS[2:]
+
+LiveChartChange = collections.namedtuple("LiveChartChange", ["JulianDay", "Object", "Field", "From", "To"])
+
+
+def current_jd():
+    """Julian day (UT) of the current system time"""
+    return UNIX_EPOCH_JD + time.time() / 86400.0
+
+
+def _time_to_reach(distance, speed, acceleration):
+    """Smallest t >= 0 with |speed| t + |acceleration| t^2 / 2 = distance, i.e a lower bound on the time to move `distance`"""
+    speed, acceleration = np.abs(speed), np.abs(acceleration)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quadratic = (np.sqrt(speed**2 + 2.0 * acceleration * distance) - speed) / acceleration
+        linear = distance / speed
+    return np.where(acceleration > 0, quadratic, linear)
+
+
+class LiveChart:
+    """
+    Chart of one location that is advanced incrementally with `update`.
+
+    Parameters:
+    - latitude, longitude: location of the chart (east longitude positive)
+    - jd: Julian day (UT) of the first chart, defaults to now
+    - ayanamsa: name from `AYANAMSA_MAPPING`
+    - house_system: name from `HOUSE_SYSTEM_MAPPING`
+    - objects: graha names, defaults to all of `GRAHAS`
+    - ephemeris_cache: optional `EphemerisCache` for the graha positions
+    - flags: swe ephemeris flags
+
+    Attributes:
+    - jd: Julian day of the last update
+    - recomputed: objects whose positions were evaluated again in the last update
+    - evaluations: total number of ephemeris evaluations of the objects
+    """
+
+    def __init__(
+        self,
+        latitude: float,
+        longitude: float,
+        jd: float = None,
+        ayanamsa: str = "Krishnamurti",
+        house_system: str = "Placidus",
+        objects: list = None,
+        ephemeris_cache=None,
+        flags: int = swe.FLG_SWIEPH,
+    ):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.ayanamsa = ayanamsa
+        self.house_system = house_system
+        self.objects = list(objects or GRAHAS)
+        self.names = ["Asc"] + self.objects + list(ROMAN_HOUSE_NUMBERS.values())
+        self._position_funcs = [make_position_func(obj, ayanamsa, ephemeris_cache, flags) for obj in self.objects]
+
+        n = len(self.objects)
+        self._eval_jd = np.zeros(n)
+        self._lon = np.zeros(n)
+        self._speed = np.zeros(n)
+        self._acceleration = np.zeros(n)
+        self._horizon_forward = np.full(n, -np.inf)
+        self._horizon_backward = np.full(n, -np.inf)
+        self.evaluations = 0
+        self.recomputed = []
+        self.jd = None
+        self.lons = self.speeds = self.codes = None
+        self.update(current_jd() if jd is None else jd)
+
+    def _evaluate(self, idx: int, jd: float):
+        """Evaluates one object at `jd` and sets its horizons"""
+        lon, speed = self._position_funcs[idx](np.array([jd, jd + ACCELERATION_STEP_DAYS]))
+        self.evaluations += 1
+        v, a = speed[0], (speed[1] - speed[0]) / ACCELERATION_STEP_DAYS
+        self._eval_jd[idx], self._lon[idx], self._speed[idx], self._acceleration[idx] = jd, lon[0], v, a
+
+        ## Distances to the nearest boundaries ahead of and behind the object
+        k = np.searchsorted(ALL_EDGES, lon[0], side="right")
+        ahead, behind = ALL_EDGES[min(k, len(ALL_EDGES) - 1)] - lon[0], lon[0] - ALL_EDGES[k - 1]
+        forward_distance, backward_distance = (ahead, behind) if v >= 0 else (behind, ahead)
+        ## Going forward in time the speed changes sign after |v| / |a| days when the acceleration opposes it
+        forward_station = abs(v / a) if a * v < 0 else np.inf
+        backward_station = abs(v / a) if a * v > 0 else np.inf
+        self._horizon_forward[idx] = HORIZON_SAFETY * min(_time_to_reach(forward_distance, v, a), forward_station, MAX_HORIZON_DAYS)
+        self._horizon_backward[idx] = HORIZON_SAFETY * min(_time_to_reach(backward_distance, v, a), backward_station, MAX_HORIZON_DAYS)
+
+    def update(self, jd: float = None):
+        """
+        Advances the chart to `jd` (defaults to now), evaluating only the objects past their horizon.
+
+        Returns:
+        - list of `LiveChartChange` namedtuples, one per (object, field) whose value changed since the last update
+        """
+        jd = float(current_jd() if jd is None else jd)
+        dt = jd - self._eval_jd
+        stale = np.flatnonzero((dt > self._horizon_forward) | (-dt > self._horizon_backward))
+        for idx in stale:
+            self._evaluate(idx, jd)
+        self.recomputed = [self.objects[idx] for idx in stale]
+
+        dt = jd - self._eval_jd
+        planet_lons = (self._lon + self._speed * dt + 0.5 * self._acceleration * dt**2) % 360.0
+        planet_speeds = self._speed + self._acceleration * dt
+
+        gast, obliquity, ayanamsa_deg = (float(x[0]) for x in get_sidereal_state(np.array([jd]), self.ayanamsa))
+        tropical_cusps, asc, _ = compute_tropical_cusps((gast + self.longitude) % 360.0, obliquity, self.latitude, self.house_system)
+        asc = (asc[0] - ayanamsa_deg) % 360.0
+        cusps = (tropical_cusps[0] - ayanamsa_deg) % 360.0
+        if self.house_system == "Whole Sign":
+            cusps = (np.floor(asc / 30.0) * 30.0 + 30.0 * np.arange(12)) % 360.0
+
+        lons = np.concatenate([[asc], planet_lons, cusps])
+        codes = get_rl_nl_sl_codes(lons)
+        codes["HouseNr"] = np.concatenate([[1], get_house_numbers(planet_lons[None, :], cusps[None, :])[0], np.arange(1, 13)])
+        ## -1 for the ascendant and cusps, which have no retrograde flag
+        codes["isRetroGrade"] = np.concatenate([[-1], (planet_speeds < 0).astype(np.int64), np.full(12, -1)])
+
+        changes = []
+        if self.codes is not None:
+            for field in LIVE_FIELDS:
+                for idx in np.flatnonzero(codes[field] != self.codes[field]):
+                    changes.append(
+                        LiveChartChange(jd, self.names[idx], field, self._field_value(field, self.codes, idx), self._field_value(field, codes, idx))
+                    )
+        self.jd, self.lons, self.speeds, self.codes = jd, lons, planet_speeds, codes
+        return changes
+
+    @staticmethod
+    def _field_value(field: str, codes: dict, idx: int):
+        value = codes[field][idx]
+        if field == "isRetroGrade":
+            return None if value < 0 else bool(value)
+        if field in ("Pada", "HouseNr"):
+            return int(value)
+        return str(decode_codes({field: np.array([value])})[field][0])
+
+    def get_chart_data(self):
+        """
+        Returns the current chart as a polars DataFrame with `LIVE_CHART_COLS` (the columns of
+        `chart_variants.VARIANT_COLS` without Ayanamsa / HouseSystem): the ascendant, the objects and the cusps I - XII
+        """
+        names = decode_codes({key: value for key, value in self.codes.items() if key not in ("HouseNr", "isRetroGrade")})
+        retro = self.codes["isRetroGrade"]
+        columns = {
+            "Object": self.names,
+            "HouseNr": self.codes["HouseNr"],
+            "Rasi": names["Rasi"],
+            "isRetroGrade": [None if flag < 0 else bool(flag) for flag in retro],
+            "LonDecDeg": np.round(self.lons, 6),
+            "SignLonDecDeg": np.round(self.lons % 30.0, 6),
+            **{key: names[key] for key in ["Nakshatra", "Pada", "RasiLord", "NakshatraLord", "SubLord", "SubSubLord"]},
+        }
+        return pl.DataFrame({col: columns[col] for col in LIVE_CHART_COLS})
@@ -0,0 +1,202 @@
+"""
+Electional (muhurta) time-window search with hierarchical pruning.
+
+The search range is narrowed one condition at a time, slowest objects first: each planet condition only
+needs the planet's ingress / station events (see `transit_events`) inside the intervals that are still
+alive, so by the time the Moon and then the cusps are evaluated the remaining intervals are usually a
+small fraction of the range. Cusp conditions use the same boundary crossing enumeration on the
+vectorized cusps of `house_cusps`, and house occupancy is sampled and bisected last, on whatever is left.
+"""
+
+import collections
+import logging
+import numpy as np
+import swisseph as swe
+from .ephemeris import GRAHAS, jd_to_datetime
+from .house_cusps import compute_cusps_grid, find_cusp_crossings, get_house_numbers, make_cusps_position_func
+from .kp_divisions import LORD_CODES, get_rl_nl_sl_codes
+from .transit_events import EVENT_LEVELS, find_object_events, make_position_func
+from .VedicAstro import RASHIS, NAKSHATRAS
+
+logger = logging.getLogger(__name__)
+
+## Graha order used for pruning, slowest mean motion first
+PRUNING_ORDER = ["Pluto", "Neptune", "Uranus", "Rahu", "Ketu", "Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+NATURAL_MALEFICS = ["Sun", "Mars", "Saturn", "Rahu", "Ketu"]
+
+## Condition field -> event level of `transit_events` at which the field can change
+FIELD_EVENTS = {
+    "Rasi": "Rasi",
+    "RasiLord": "Rasi",
+    "Nakshatra": "Nakshatra",
+    "NakshatraLord": "Nakshatra",
+    "Pada": "Pada",
+    "SubLord": "SubLord",
+    "SubSubLord": "SubSubLord",
+    "Retrograde": "Station",
+}
+## House occupancy is sampled this often, then its changes are bisected
+OCCUPANCY_SAMPLE_SECONDS = 60.0
+
+MuhurtaWindow = collections.namedtuple(
+    "MuhurtaWindow", ["StartJulianDay", "EndJulianDay", "Start", "End", "DurationMinutes"]
+)
+
+
+def _allowed_codes(field: str, values):
+    """Converts the allowed names of a condition field into the codes of `get_rl_nl_sl_codes`"""
+    if field not in FIELD_EVENTS:
+        raise ValueError(f"Unknown condition field '{field}'. Choose one of {list(FIELD_EVENTS)}")
+    values = [values] if isinstance(values, (str, int, bool)) else list(values)
+    if field == "Retrograde" or field == "Pada":
+        return np.array(values)
+    lookup = {"Rasi": RASHIS, "Nakshatra": NAKSHATRAS}.get(field, list(LORD_CODES))
+    unknown = [value for value in values if value not in lookup]
+    if unknown:
+        raise ValueError(f"Unknown {field} value(s) {unknown}")
+    return np.array([lookup.index(value) for value in values])
+
+
+def merge_intervals(intervals, gap_days: float = 0.0):
+    """Merges overlapping (or closer than `gap_days`) (start, end) intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + gap_days:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _filter_intervals(intervals, crossings_func, values_func, allowed):
+    """
+    Splits each interval at the instants where the condition value may change and keeps the pieces
+    whose value (evaluated at the piece midpoint) is allowed.
+    """
+    kept = []
+    for start, end in intervals:
+        cuts = np.sort(np.asarray(crossings_func(start, end), dtype=np.float64))
+        edges = np.concatenate([[start], cuts[(cuts > start) & (cuts < end)], [end]])
+        ok = np.isin(values_func((edges[:-1] + edges[1:]) / 2), allowed)
+        kept.extend((lo, hi) for lo, hi, keep in zip(edges[:-1], edges[1:], ok) if keep)
+    return merge_intervals(kept)
+
+
+def _planet_filter(obj, field, allowed, intervals, position_func, tol_days):
+    event = FIELD_EVENTS[field]
+    crossings = lambda start, end: [found[0] for found in find_object_events(obj, start, end, [event], position_func, tol_days)]
+    if field == "Retrograde":
+        values = lambda jd: position_func(jd)[1] < 0
+    else:
+        values = lambda jd: get_rl_nl_sl_codes(position_func(jd)[0])[field]
+    return _filter_intervals(intervals, crossings, values, allowed)
+
+
+def _occupancy_filter(avoid_in_houses, intervals, lat, lon, house_system, ayanamsa, position_funcs, tol_days):
+    objects = sorted({obj for objs in avoid_in_houses.values() for obj in objs})
+
+    def ok(jd):
+        cusps = compute_cusps_grid(jd, lat, lon, house_system, ayanamsa, with_lords=False)["cusps"]
+        houses = get_house_numbers(np.stack([position_funcs[obj](jd)[0] for obj in objects], axis=1), cusps)
+        bad = np.zeros(jd.shape, dtype=bool)
+        for house_nr, house_objects in avoid_in_houses.items():
+            columns = [objects.index(obj) for obj in house_objects]
+            bad |= np.any(houses[:, columns] == house_nr, axis=1)
+        return ~bad
+
+    def changes(start, end):
+        t = np.linspace(start, end, int(np.ceil((end - start) * 86400 / OCCUPANCY_SAMPLE_SECONDS)) + 1)
+        state = ok(t)
+        flips = np.flatnonzero(state[:-1] != state[1:])
+        t_lo, t_hi = t[flips], t[flips + 1]
+        while t_lo.size and np.max(t_hi - t_lo) > tol_days:
+            mid = (t_lo + t_hi) / 2
+            same = ok(mid) == state[flips]
+            t_lo, t_hi = np.where(same, mid, t_lo), np.where(same, t_hi, mid)
+        return (t_lo + t_hi) / 2
+
+    return _filter_intervals(intervals, changes, lambda jd: ok(np.atleast_1d(jd)), [True])
+
+
+def find_muhurta_windows(
+    jd_start: float,
+    jd_end: float,
+    lat: float,
+    lon: float,
+    planet_conditions: dict = None,
+    cusp_conditions: dict = None,
+    avoid_in_houses: dict = None,
+    house_system: str = "Placidus",
+    ayanamsa: str = "Krishnamurti",
+    precision_seconds: float = 1.0,
+    min_duration_seconds: float = 0.0,
+    ephemeris_cache=None,
+    flags: int = swe.FLG_SWIEPH,
+):
+    """
+    Finds the time windows in which all the given conditions hold.
+
+    Parameters:
+    - jd_start, jd_end: Julian days (UT) of the search range
+    - lat, lon: location of the election
+    - planet_conditions: dict of graha -> {field: allowed value(s)}, where field is one of `FIELD_EVENTS`,
+      eg: {"Moon": {"Nakshatra": ["Rohini", "Hasta"]}, "Jupiter": {"Retrograde": False}}
+    - cusp_conditions: dict of house number -> {field: allowed value(s)}, house 1 being the ascendant,
+      eg: {1: {"SubLord": "Jupiter"}}
+    - avoid_in_houses: dict of house number -> grahas that must not occupy it, eg: {7: NATURAL_MALEFICS}
+    - house_system: one of `HOUSE_SYSTEM_MAPPING`
+    - ayanamsa: one of `AYANAMSA_MAPPING`
+    - precision_seconds: precision of the window edges
+    - min_duration_seconds: drop windows shorter than this
+    - ephemeris_cache: optional `EphemerisCache` to read the planet positions from instead of swe
+    - flags: swe ephemeris flags used when not reading from the cache
+
+    Returns:
+    - list of MuhurtaWindow named tuples sorted by time; `Start` and `End` are in UTC
+    """
+    planet_conditions = planet_conditions or {}
+    cusp_conditions = cusp_conditions or {}
+    avoid_in_houses = avoid_in_houses or {}
+    unknown = [obj for obj in planet_conditions if obj not in GRAHAS]
+    unknown += [obj for objs in avoid_in_houses.values() for obj in objs if obj not in GRAHAS]
+    if unknown:
+        raise ValueError(f"Unknown object(s) {unknown}. Choose from {GRAHAS}")
+
+    tol_days = precision_seconds / 86400
+    position_funcs = {obj: make_position_func(obj, ayanamsa, ephemeris_cache, flags) for obj in GRAHAS}
+    intervals = [(jd_start, jd_end)]
+
+    ## 1) Planets, slowest first, each evaluated only inside the surviving intervals
+    for obj in sorted(planet_conditions, key=PRUNING_ORDER.index):
+        for field, values in planet_conditions[obj].items():
+            allowed = _allowed_codes(field, values)
+            intervals = _planet_filter(obj, field, allowed, intervals, position_funcs[obj], tol_days)
+            logger.debug("%s %s: %d intervals left", obj, field, len(intervals))
+
+    ## 2) House cusps, ascendant first
+    cusps_func = make_cusps_position_func(lat, lon, house_system, ayanamsa)
+    for house_nr in sorted(cusp_conditions):
+        if not 1 <= house_nr <= 12:
+            raise ValueError(f"Invalid house number {house_nr}")
+        for field, values in cusp_conditions[house_nr].items():
+            if field == "Retrograde":
+                raise ValueError("Retrograde is not a cusp condition")
+            allowed = _allowed_codes(field, values)
+            level = EVENT_LEVELS[FIELD_EVENTS[field]]
+            crossings = lambda start, end: find_cusp_crossings(cusps_func, [level], start, end, tol_days, [house_nr])
+            values_func = lambda jd: get_rl_nl_sl_codes(cusps_func(jd, house_nr - 1)[0])[field]
+            intervals = _filter_intervals(intervals, crossings, values_func, allowed)
+            logger.debug("House %d %s: %d intervals left", house_nr, field, len(intervals))
+
+    ## 3) House occupancy
+    if avoid_in_houses and intervals:
+        intervals = _occupancy_filter(avoid_in_houses, intervals, lat, lon, house_system, ayanamsa, position_funcs, tol_days)
+
+    return [
+        MuhurtaWindow(
+            float(start), float(end), jd_to_datetime(float(start), 0.0), jd_to_datetime(float(end), 0.0),
+            round(float(end - start) * 1440, 2),
+        )
+        for start, end in merge_intervals(intervals, tol_days)
+        if (end - start) * 86400 >= min_duration_seconds
+    ]
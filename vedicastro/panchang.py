@@ -0,0 +1,200 @@
+"""
+Batch panchang (tithi, nakshatra, yoga, karana, vara) over date ranges and many locations.
+
+Tithi, karana, nakshatra and yoga are divisions of angles that only ever increase: the Moon - Sun elongation
+(30 tithis of 12°, 60 karanas of 6°), the sidereal Moon (27 nakshatras) and the sidereal Moon + Sun (27 yogas).
+Their transition instants are the same everywhere on earth, so they are found once for the whole date range:
+the angles are sampled every `SAMPLE_DAYS`, each boundary crossed between two samples is bracketed, and all
+crossings are refined together with `transit_events.solve_crossings`. Each (location, day) then only needs
+two `np.searchsorted` lookups per element, at the local start of the day, to read the element in force and
+the instant it ends.
+"""
+
+import numpy as np
+import polars as pl
+import swisseph as swe
+from .sunrise import DAY_LORDS, DAY_STARTS, get_sun_times, local_date_range, weekday_indices
+from .timezones import julian_days_to_local, local_to_julian_days
+from .transit_events import make_position_func, solve_crossings, wrap_degrees
+from .VedicAstro import NAKSHATRAS
+
+## Angle sampling step; the elongation moves at most ~15.4° per day, so samples are far apart compared to a tithi
+SAMPLE_DAYS = 0.5
+## Days of transitions found beyond both ends of the range, so the element in force at each day start has a start and an end
+MARGIN_DAYS = 2.0
+
+TITHI_NAMES = ["Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami", "Shashthi", "Saptami", "Ashtami",
+               "Navami", "Dashami", "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi"]
+## 30 tithis of the lunar month, from Shukla Pratipada to Amavasya
+TITHIS = TITHI_NAMES + ["Purnima"] + TITHI_NAMES + ["Amavasya"]
+PAKSHAS = ["Shukla", "Krishna"]
+YOGAS = ["Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda", "Sukarma", "Dhriti", "Shula",
+         "Ganda", "Vriddhi", "Dhruva", "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata", "Variyana", "Parigha",
+         "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti"]
+## 60 karanas (half tithis): Kimstughna, the 7 movable karanas 8 times over, then Shakuni, Chatushpada and Naga
+MOVABLE_KARANAS = ["Bava", "Balava", "Kaulava", "Taitila", "Garaja", "Vanija", "Vishti"]
+KARANAS = ["Kimstughna"] + MOVABLE_KARANAS * 8 + ["Shakuni", "Chatushpada", "Naga"]
+## Vara of each weekday, indexed by `datetime.weekday()` (Monday = 0), like `sunrise.DAY_LORDS`
+VARAS = ["Somavara", "Mangalavara", "Budhavara", "Guruvara", "Shukravara", "Shanivara", "Ravivara"]
+
+## Element -> (angle, names of its divisions in order)
+PANCHANG_ELEMENTS = {
+    "Tithi": ("elongation", TITHIS),
+    "Karana": ("elongation", KARANAS),
+    "Nakshatra": ("moon", NAKSHATRAS),
+    "Yoga": ("moon_sun", YOGAS),
+}
+PANCHANG_TABLE_COLS = [
+    "LocationIdx",
+    "Date",
+    "DayStartJulianDay",
+    "Vara",
+    "VaraLord",
+    "Paksha",
+    "Tithi",
+    "TithiEnd",
+    "Nakshatra",
+    "NakshatraEnd",
+    "Yoga",
+    "YogaEnd",
+    "Karana",
+    "KaranaEnd",
+]
+
+
+def _angle_funcs(ayanamsa: str, ephemeris_cache=None, flags: int = swe.FLG_SWIEPH):
+    """f(jd array) -> (angle, rate) of each panchang angle"""
+    sun = make_position_func("Sun", ayanamsa, ephemeris_cache, flags)
+    moon = make_position_func("Moon", ayanamsa, ephemeris_cache, flags)
+
+    def elongation(jd):
+        (sun_lon, sun_speed), (moon_lon, moon_speed) = sun(jd), moon(jd)
+        return (moon_lon - sun_lon) % 360.0, moon_speed - sun_speed
+
+    def moon_sun(jd):
+        (sun_lon, sun_speed), (moon_lon, moon_speed) = sun(jd), moon(jd)
+        return (moon_lon + sun_lon) % 360.0, moon_speed + sun_speed
+
+    return {"elongation": elongation, "moon": moon, "moon_sun": moon_sun}
+
+
+def _element_crossings(angle_func, jd_start: float, jd_end: float, n_divisions: int, tol_days: float):
+    """
+    Transitions of an increasing angle between `n_divisions` equal divisions within a date range.
+
+    Returns:
+    - (crossing Julian days, index of the division entered at each crossing, index of the division at `jd_start`)
+    """
+    n_samples = int(np.ceil((jd_end - jd_start) / SAMPLE_DAYS)) + 1
+    t = np.linspace(jd_start, jd_end, n_samples)
+    angle, _ = angle_func(t)
+    unwrapped = angle[0] + np.concatenate([[0.0], np.cumsum(wrap_degrees(np.diff(angle)))])
+    span = 360.0 / n_divisions
+    counts = np.floor(unwrapped / span).astype(np.int64)
+    ## The angle only increases, so the boundaries crossed are consecutive; each lies in the first segment reaching it
+    boundary = np.arange(counts[0] + 1, counts[-1] + 1)
+    seg_idx = np.searchsorted(counts, boundary, side="left") - 1
+    crossing_jds = solve_crossings(angle_func, t[seg_idx], t[seg_idx + 1], (boundary * span) % 360.0, tol_days)
+    return crossing_jds, boundary % n_divisions, int(counts[0] % n_divisions)
+
+
+def _find_crossings(jd_start: float, jd_end: float, ayanamsa: str, precision_seconds: float, ephemeris_cache, flags):
+    angle_funcs = _angle_funcs(ayanamsa, ephemeris_cache, flags)
+    return {
+        element: _element_crossings(angle_funcs[angle], jd_start, jd_end, len(names), precision_seconds / 86400)
+        for element, (angle, names) in PANCHANG_ELEMENTS.items()
+    }
+
+
+def find_panchang_transitions(
+    jd_start: float,
+    jd_end: float,
+    ayanamsa: str = "Lahiri",
+    precision_seconds: float = 1.0,
+    ephemeris_cache=None,
+    flags: int = swe.FLG_SWIEPH,
+):
+    """
+    Every tithi, karana, nakshatra and yoga transition within a date range.
+
+    Parameters:
+    - jd_start, jd_end: Julian days (UT) of the search range
+    - ayanamsa: name from `AYANAMSA_MAPPING`; it shifts nakshatra and yoga, not tithi and karana
+    - precision_seconds: precision of the transition times
+    - ephemeris_cache: optional `EphemerisCache` to read the Sun and Moon from instead of swe
+    - flags: swe ephemeris flags used when not reading from the cache
+
+    Returns:
+    - polars DataFrame with columns JulianDay, Element, From, To, sorted by time
+    """
+    crossings = _find_crossings(jd_start, jd_end, ayanamsa, precision_seconds, ephemeris_cache, flags)
+    frames = []
+    for element, (jds, entered, _) in crossings.items():
+        names = np.array(PANCHANG_ELEMENTS[element][1])
+        frames.append(pl.DataFrame({"JulianDay": jds, "Element": element, "From": names[(entered - 1) % len(names)], "To": names[entered]}))
+    transitions = pl.concat(frames).sort("JulianDay", maintain_order=True)
+    return transitions.filter(pl.col("JulianDay").is_between(jd_start, jd_end))
+
+
+def compute_panchang(
+    start_date,
+    end_date,
+    locations: list,
+    ayanamsa: str = "Lahiri",
+    precision_seconds: float = 1.0,
+    ephemeris_cache=None,
+    flags: int = swe.FLG_SWIEPH,
+    day_start: str = "midnight",
+):
+    """
+    Daily panchang of every location over a date range.
+
+    Parameters:
+    - start_date, end_date: first and last local dates, as `datetime.date` or (year, month, day) tuples
+    - locations: list of (lat, lon, timezone) tuples; timezone is a zone name (eg: Asia/Kolkata) or an
+      offset string (eg: "+05:30")
+    - ayanamsa, precision_seconds, ephemeris_cache, flags: as for `find_panchang_transitions`
+    - day_start: one of `DAY_STARTS`; "sunrise" reads the elements at the local sunrise (from `sunrise.get_sun_times`),
+      falling back to midnight on days without one (polar day / night)
+
+    Returns:
+    - polars DataFrame with `PANCHANG_TABLE_COLS`, one row per (location, date): the vara of the date, the
+      tithi, nakshatra, yoga and karana in force at the local start of the day and the local time each of
+      them ends, which may fall on the next date
+    """
+    if day_start not in DAY_STARTS:
+        raise ValueError(f"Unknown day start '{day_start}'. Choose one of {DAY_STARTS}")
+    dates = local_date_range(start_date, end_date)
+    if not locations:
+        raise ValueError("No locations given")
+
+    midnights = {tz: local_to_julian_days(dates.astype("datetime64[us]"), tz) for tz in {tz for _, _, tz in locations}}
+    day_starts = [midnights[tz] for _, _, tz in locations]
+    if day_start == "sunrise":
+        sunrises, _, _ = get_sun_times(dates, locations, flags=flags)
+        day_starts = [np.where(np.isnan(sunrise), midnight, sunrise) for sunrise, midnight in zip(sunrises, day_starts)]
+    all_starts = np.concatenate(day_starts)
+    crossings = _find_crossings(all_starts.min() - MARGIN_DAYS, all_starts.max() + MARGIN_DAYS, ayanamsa, precision_seconds,
+                                ephemeris_cache, flags)
+
+    weekdays = weekday_indices(dates)
+    frames = []
+    for location_idx, (_, _, tz) in enumerate(locations):
+        starts = day_starts[location_idx]
+        columns = {
+            "LocationIdx": np.full(dates.size, location_idx),
+            "Date": dates,
+            "DayStartJulianDay": starts,
+            "Vara": np.array(VARAS)[weekdays],
+            "VaraLord": np.array(DAY_LORDS)[weekdays],
+        }
+        for element, (jds, entered, first) in crossings.items():
+            ## Index of the first transition after each day start; the division in force is the one entered before it
+            idx = np.searchsorted(jds, starts, side="right")
+            division = np.concatenate([[first], entered])[idx]
+            columns[element] = np.array(PANCHANG_ELEMENTS[element][1])[division]
+            columns[f"{element}End"] = julian_days_to_local(jds[idx], tz)
+            if element == "Tithi":
+                columns["Paksha"] = np.array(PAKSHAS)[division // 15]
+        frames.append(pl.DataFrame(columns))
+    return pl.concat(frames).select(PANCHANG_TABLE_COLS)
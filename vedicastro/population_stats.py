@@ -0,0 +1,237 @@
+"""
+Streaming aggregation of population statistics over chart collections.
+
+A `PopulationStats` holds one fixed-size NumPy count array per statistic, eg: Moon nakshatra x 7th cusp
+sub lord, or house of every graha x birth decade. Charts are consumed in batches of columns (the
+`ChartTable` layout: "Moon.Nakshatra", "House7.SubLord", ...) and every batch only adds a `np.bincount`
+to the arrays, so memory stays bounded by one batch, however many charts go through. Partial results
+of parallel workers are combined with `merge`; `aggregate_batch_output` does that over the Parquet
+parts written by `batch_cli`.
+"""
+
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import polars as pl
+from .chart_search import CATEGORY_DICTIONARIES, MISSING_CODE, ChartTable
+from .ephemeris import GRAHAS
+
+## Object placeholder of a dimension key (eg: "*.HouseNr"); the statistic then gets an "Object" axis
+WILDCARD = "*"
+## Bin edges of the numeric fields of the planets / houses tables, when a dimension does not give its own
+DEFAULT_EDGES = {
+    "HouseNr": np.arange(1, 14),
+    "LonDecDeg": np.arange(0, 361),
+}
+DEFAULT_BATCH_SIZE = 5000
+
+
+class _Dimension:
+    """One axis of a statistic: a column key and how its values map to bins"""
+
+    def __init__(self, spec):
+        key, edges = spec if isinstance(spec, tuple) else (spec, None)
+        field = key.split(".", 1)[1] if "." in key else None
+        self.key = key
+        self.name = field if key.startswith(WILDCARD + ".") else key
+        self.is_wildcard = key.startswith(WILDCARD + ".")
+        if edges is None and field in CATEGORY_DICTIONARIES:
+            self.edges = None
+            self.labels = list(CATEGORY_DICTIONARIES[field])
+            return
+        if edges is None:
+            if field not in DEFAULT_EDGES:
+                raise ValueError(
+                    f"Dimension '{key}' needs bin edges; only {list(CATEGORY_DICTIONARIES) + list(DEFAULT_EDGES)} have defaults"
+                )
+            edges = DEFAULT_EDGES[field]
+        self.edges = np.asarray(edges, dtype=np.float64)
+        if self.edges.size < 2 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError(f"Bin edges of '{key}' must be increasing")
+        lower = self.edges[:-1]
+        ## Bins are labelled by their lower edge
+        self.labels = lower.astype(np.int64).tolist() if np.all(lower == np.round(lower)) else lower.tolist()
+
+    @property
+    def size(self):
+        return len(self.labels)
+
+    def bin_indices(self, columns: dict, n_rows: int, obj: str = None):
+        """Bin of every row, -1 where the value is missing or outside the edges"""
+        values = columns.get(self.key.replace(WILDCARD, obj, 1) if self.is_wildcard else self.key)
+        if values is None:
+            return np.full(n_rows, -1, dtype=np.int64)
+        if self.edges is None:
+            codes = np.asarray(values).astype(np.int64)
+            return np.where((codes == MISSING_CODE) | (codes >= self.size), -1, codes)
+        values = np.asarray(values, dtype=np.float64)
+        idx = np.searchsorted(self.edges, values, side="right") - 1
+        return np.where(np.isnan(values) | (idx >= self.size), -1, idx)
+
+
+class PopulationStats:
+    def __init__(self, spec: dict, objects: list = None):
+        """
+        Fixed-size counters and histograms over a population of charts, updated one batch at a time.
+
+        Parameters
+        ==========
+        spec: dict of statistic name -> list of dimensions. A dimension is a column key of `ChartTable`
+              ("Moon.Nakshatra", "House7.SubLord", "Sun.LonDecDeg"), the same with "*" for every object of
+              `objects` ("*.HouseNr"), or the name of a per-chart attribute passed with the batches ("year").
+              Numeric columns and attributes take bin edges as a (key, edges) tuple; HouseNr and LonDecDeg
+              default to one bin per house / degree.
+              Eg: {"moon_star_7th_sub": ["Moon.Nakshatra", "House7.SubLord"],
+                   "houses_by_decade": [("year", range(1900, 2031, 10)), "*.HouseNr"]}
+        objects: objects the "*" dimensions run over, defaults to `GRAHAS`
+        """
+        self.spec = {name: list(dims) for name, dims in spec.items()}
+        self.objects = list(objects or GRAHAS)
+        self._dimensions = {}
+        self._counts = {}
+        for name, dims in self.spec.items():
+            dimensions = [_Dimension(dim) for dim in dims]
+            if any(dim.is_wildcard for dim in dimensions):
+                dimensions.insert(next(i for i, dim in enumerate(dimensions) if dim.is_wildcard), None)
+            self._dimensions[name] = dimensions
+            self._counts[name] = np.zeros([len(self.objects) if dim is None else dim.size for dim in dimensions], dtype=np.int64)
+        self.n_charts = 0
+        ## Charts (or chart x object pairs) left out of each statistic for a missing / out of range value
+        self.n_skipped = dict.fromkeys(self.spec, 0)
+
+    def dimension_names(self, name: str):
+        return ["Object" if dim is None else dim.name for dim in self._dimensions[name]]
+
+    def counts(self, name: str):
+        """Count array of a statistic, one axis per dimension (see `dimension_names`)"""
+        return self._counts[name]
+
+    def update_columns(self, columns: dict, n_rows: int = None):
+        """
+        Adds a batch of charts given as columns, one value per chart: the `ChartTable.columns` layout plus any
+        per-chart attribute arrays named in the spec.
+        """
+        n_rows = len(next(iter(columns.values()))) if n_rows is None else n_rows
+        for name, dimensions in self._dimensions.items():
+            counts = self._counts[name]
+            shared = [None if dim is None or dim.is_wildcard else dim.bin_indices(columns, n_rows) for dim in dimensions]
+            for obj_idx, obj in enumerate(self.objects if None in dimensions else [None]):
+                idx = [
+                    np.full(n_rows, obj_idx) if dim is None else dim.bin_indices(columns, n_rows, obj) if dim.is_wildcard else bins
+                    for dim, bins in zip(dimensions, shared)
+                ]
+                valid = np.all([bins >= 0 for bins in idx], axis=0)
+                flat = np.ravel_multi_index(tuple(bins[valid] for bins in idx), counts.shape)
+                counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+                self.n_skipped[name] += int(n_rows - np.count_nonzero(valid))
+        self.n_charts += n_rows
+        return self
+
+    def update_table(self, table: ChartTable, attributes: dict = None):
+        """Adds the charts of a `ChartTable`, with optional per-chart attribute arrays aligned to its rows"""
+        return self.update_columns({**table.columns, **(attributes or {})}, table.n_rows)
+
+    def consume(self, charts, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Adds the charts of an iterable of (planets_data, houses_data) or (planets_data, houses_data, attributes)
+        tuples, as returned by `get_planets_data_from_chart` / `get_houses_data_from_chart` (houses_data may be
+        None, attributes is a dict of per-chart values such as {"year": 1987}). Only `batch_size` charts are
+        held at a time.
+        """
+        batch, attributes = [], []
+        for item in charts:
+            batch.append(item[:2])
+            attributes.append(item[2] if len(item) > 2 else {})
+            if len(batch) == batch_size:
+                self._update_batch(batch, attributes)
+                batch, attributes = [], []
+        if batch:
+            self._update_batch(batch, attributes)
+        return self
+
+    def _update_batch(self, batch: list, attributes: list):
+        keys = {key for attrs in attributes for key in attrs}
+        columns = {key: np.array([attrs.get(key, np.nan) for attrs in attributes], dtype=np.float64) for key in keys}
+        self.update_table(ChartTable.from_charts(batch), columns)
+
+    def consume_frames(self, planets_df: pl.DataFrame, houses_df: pl.DataFrame = None, attributes: pl.DataFrame = None,
+                       chart_id_col: str = "ChartId"):
+        """
+        Adds the charts of long planets / houses DataFrames (eg: one part of the `batch_cli` output), with an
+        optional DataFrame of per-chart attributes keyed by `chart_id_col`.
+        """
+        table = ChartTable.from_frames(planets_df, houses_df, chart_id_col)
+        columns = {}
+        if attributes is not None:
+            aligned = pl.DataFrame({chart_id_col: table.chart_ids}).join(attributes, on=chart_id_col, how="left")
+            columns = {col: aligned[col].cast(pl.Float64).to_numpy() for col in attributes.columns if col != chart_id_col}
+        return self.update_table(table, columns)
+
+    def consume_batch_output(self, output_dir: str, attributes: pl.DataFrame = None, part_paths: list = None):
+        """
+        Adds the charts of a `batch_cli` output directory, one Parquet part at a time.
+
+        Parameters:
+        - output_dir: directory written by `batch_cli.run_batch`
+        - attributes: optional DataFrame with a ChartId column and per-chart attribute columns, eg: the input
+          records with their birth year
+        - part_paths: only these planets parts (default: all of them)
+        """
+        for planets_path in batch_output_parts(output_dir) if part_paths is None else part_paths:
+            houses_path = os.path.join(output_dir, "houses", os.path.basename(planets_path))
+            houses_df = pl.read_parquet(houses_path) if os.path.exists(houses_path) else None
+            self.consume_frames(pl.read_parquet(planets_path), houses_df, attributes)
+        return self
+
+    def merge(self, other: "PopulationStats"):
+        """Adds the counts of another `PopulationStats` with the same spec, eg: from another worker"""
+        if other.spec != self.spec or other.objects != self.objects:
+            raise ValueError("Can only merge PopulationStats built with the same spec and objects")
+        for name in self._counts:
+            self._counts[name] += other._counts[name]
+            self.n_skipped[name] += other.n_skipped[name]
+        self.n_charts += other.n_charts
+        return self
+
+    def to_frame(self, name: str, drop_zero: bool = True):
+        """
+        Returns a statistic as a long polars DataFrame: one column per dimension (bin labels, numeric bins by their
+        lower edge) and a Count column, without the empty cells unless `drop_zero` is False.
+        """
+        counts = self._counts[name]
+        labels = [self.objects if dim is None else dim.labels for dim in self._dimensions[name]]
+        cells = np.indices(counts.shape).reshape(counts.ndim, -1)
+        keep = counts.reshape(-1) > 0 if drop_zero else np.ones(counts.size, dtype=bool)
+        columns = {col: np.array(axis_labels)[cell[keep]] for col, axis_labels, cell in zip(self.dimension_names(name), labels, cells)}
+        return pl.DataFrame({**columns, "Count": counts.reshape(-1)[keep]})
+
+
+def batch_output_parts(output_dir: str):
+    """Sorted paths of the planets Parquet parts in a `batch_cli` output directory"""
+    return sorted(glob.glob(os.path.join(output_dir, "planets", "part-*.parquet")))
+
+
+def _aggregate_parts(spec: dict, objects: list, output_dir: str, attributes: pl.DataFrame, part_paths: list):
+    return PopulationStats(spec, objects).consume_batch_output(output_dir, attributes, part_paths)
+
+
+def aggregate_batch_output(output_dir: str, spec: dict, attributes: pl.DataFrame = None, objects: list = None,
+                           workers: int = None):
+    """
+    Computes a `PopulationStats` over a `batch_cli` output directory with several worker processes, each
+    aggregating its share of the Parquet parts; only the partial count arrays come back and are merged.
+    """
+    parts = batch_output_parts(output_dir)
+    workers = max(1, min(workers or os.cpu_count(), len(parts)))
+    shares = [parts[i::workers] for i in range(workers)]
+    result = PopulationStats(spec, objects)
+    if workers == 1:
+        return result.consume_batch_output(output_dir, attributes, parts)
+    ## Spawned, not forked: polars' thread pool does not survive a fork once it has been used in the parent
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for partial_stats in executor.map(partial(_aggregate_parts, spec, objects, output_dir, attributes), shares):
+            result.merge(partial_stats)
+    return result
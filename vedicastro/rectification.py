@@ -0,0 +1,114 @@
+"""
+Birth-time rectification scan: the instants around a recorded birth time at which any cusp lord changes.
+
+Instead of rebuilding a chart every few seconds across the window, each of the 12 cusps is sampled
+sparsely and every sub (and sub-sub) division edge it crosses is bracketed; the brackets of all cusps are
+root-found together (see `house_cusps.find_cusp_crossings`). The crossings split the window into segments
+in which every cusp keeps its rasi, star, sub and sub-sub lords; the lords of each segment are read once,
+at its midpoint, from the vectorized cusps of `house_cusps`.
+"""
+
+import numpy as np
+import polars as pl
+from .house_cusps import compute_cusps_grid, find_cusp_crossings, make_cusps_position_func
+from .kp_divisions import VIMSHOTTARI_LORDS
+from .timezones import julian_days_to_local
+
+## Finest lord level the segments resolve -> division levels whose edges are searched. Sign and nakshatra
+## edges are also sub edges, so the rasi and star lords are constant within every segment too.
+RECTIFICATION_LEVELS = {
+    "SubLord": ["sub"],
+    "SubSubLord": ["sub", "sub_sub"],
+}
+LORD_FIELDS = ["RasiLord", "NakshatraLord", "SubLord", "SubSubLord"]
+DEFAULT_WINDOW_MINUTES = 120.0
+
+SEGMENT_COLS = [
+    "StartJulianDay",
+    "EndJulianDay",
+    "Start",
+    "End",
+    "StartOffsetSeconds",
+    "DurationSeconds",
+    "ContainsBirthTime",
+    "Changes",
+]
+
+
+def _lord_fields(level: str):
+    return LORD_FIELDS[: LORD_FIELDS.index(level) + 1]
+
+
+def find_rectification_segments(
+    jd_birth: float,
+    lat: float,
+    lon: float,
+    tz: str = "UTC",
+    window_minutes: float = DEFAULT_WINDOW_MINUTES,
+    level: str = "SubSubLord",
+    house_system: str = "Placidus",
+    ayanamsa: str = "Krishnamurti",
+    precision_seconds: float = 0.1,
+):
+    """
+    Splits the window around a recorded birth time into the segments of constant cusp lords.
+
+    Parameters:
+    - jd_birth: Julian day (UT) of the recorded birth time
+    - lat, lon: birth place (east longitude positive)
+    - tz: zone name (eg: Asia/Kolkata) or offset string (eg: "+05:30") of the local Start / End times
+    - window_minutes: the window runs from `window_minutes` before to `window_minutes` after the birth time
+    - level: finest lord level that starts a new segment, one of `RECTIFICATION_LEVELS`
+    - house_system: one of `HOUSE_SYSTEM_MAPPING`
+    - ayanamsa: one of `AYANAMSA_MAPPING`
+    - precision_seconds: precision of the segment edges; transitions closer than this are merged
+
+    Returns:
+    - polars DataFrame with `SEGMENT_COLS` followed by the `Cusp{n}{field}` lord columns of the 12 cusps for each
+      field of `LORD_FIELDS` down to `level`, one row per segment sorted by time. `Changes` lists what changed at
+      the start of the segment (eg: "Cusp 7 SubSubLord: Venus -> Sun"), empty for the first one.
+    """
+    if level not in RECTIFICATION_LEVELS:
+        raise ValueError(f"Unknown level '{level}'. Choose one of {list(RECTIFICATION_LEVELS)}")
+    if window_minutes <= 0:
+        raise ValueError("window_minutes must be positive")
+    tol_days = precision_seconds / 86400
+    start, end = jd_birth - window_minutes / 1440, jd_birth + window_minutes / 1440
+
+    cusps_func = make_cusps_position_func(lat, lon, house_system, ayanamsa)
+    cuts = find_cusp_crossings(cusps_func, RECTIFICATION_LEVELS[level], start, end, tol_days)
+    ## A sub edge is found again as a sub-sub edge (up to the arc-second rounding of the KP table); keep one cut each
+    cuts = cuts[(cuts > start + tol_days) & (cuts < end - tol_days)]
+    cuts = cuts[np.concatenate([[True], np.diff(cuts) > tol_days])] if cuts.size else cuts
+    edges = np.concatenate([[start], cuts, [end]])
+
+    fields = _lord_fields(level)
+    grid = compute_cusps_grid((edges[:-1] + edges[1:]) / 2, lat, lon, house_system, ayanamsa)
+    config = np.concatenate([grid[field] for field in fields], axis=1)
+    ## Sub edges split at sign edges without a lord change; only keep the edges where some lord changes
+    changed = np.concatenate([[True], np.any(config[1:] != config[:-1], axis=1)])
+    starts, config = edges[:-1][changed], config[changed]
+    ends = np.append(starts[1:], end)
+
+    ## One label per changed (segment, lord), joined per segment
+    labels = np.array([f"Cusp {house_nr} {field}: " for field in fields for house_nr in range(1, 13)], dtype=object)
+    lords = np.array(VIMSHOTTARI_LORDS, dtype=object)
+    rows, cols = np.nonzero(config[1:] != config[:-1])
+    descriptions = labels[cols] + lords[config[rows, cols]] + " -> " + lords[config[rows + 1, cols]]
+    changes = [""] + [", ".join(part) for part in np.split(descriptions, np.searchsorted(rows, np.arange(1, len(config) - 1)))]
+    columns = {
+        "StartJulianDay": starts,
+        "EndJulianDay": ends,
+        "Start": julian_days_to_local(starts, tz),
+        "End": julian_days_to_local(ends, tz),
+        "StartOffsetSeconds": (starts - jd_birth) * 86400,
+        "DurationSeconds": (ends - starts) * 86400,
+        "ContainsBirthTime": (starts <= jd_birth) & (jd_birth < ends),
+        "Changes": changes,
+    }
+    ## Lord names are gathered by polars from the codes, instead of building NumPy string arrays
+    lord_names = pl.Series(VIMSHOTTARI_LORDS)
+    for i, field in enumerate(fields):
+        for house_nr in range(1, 13):
+            columns[f"Cusp{house_nr}{field}"] = lord_names.gather(config[:, i * 12 + house_nr - 1])
+    return pl.DataFrame(columns)
@@ -0,0 +1,143 @@
+"""
+Single-flight deduplication and micro-batching of concurrent requests.
+
+Requests are submitted with a key identifying their result. While a request is in flight, every other
+request with the same key awaits the same future instead of starting a computation of its own. Distinct
+requests are collected into batches that are computed by one call of the batch function (in an executor,
+so the event loop keeps accepting requests meanwhile) and the results are handed back to each caller.
+
+When no batch is running, pending requests are dispatched on the next event loop iteration, so an
+isolated request is not delayed. While batches are running, new requests wait up to `max_delay_ms` (or
+until `max_batch_size` of them are pending) for a free batch slot; under load the batches grow by
+themselves while the previous ones compute, and the per-call overhead is paid once per batch.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_DELAY_MS = 2.0
+
+
+class RequestAggregator:
+    """
+    Shares and batches the computations of concurrent requests.
+
+    Parameters:
+    - batch_func: called with a list of items, returns a list with one result per item in the same order;
+      a result that is an `Exception` instance is raised to the callers of that item only
+    - max_batch_size: largest number of items passed to one `batch_func` call
+    - max_delay_ms: longest time a request waits for more requests to join its batch while other batches run
+    - executor: `concurrent.futures` executor running `batch_func`, None to run it on the event loop
+    - max_concurrent_batches: number of batches computed at the same time (eg: the executor's workers)
+    """
+
+    def __init__(
+        self,
+        batch_func,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_delay_ms: float = DEFAULT_MAX_DELAY_MS,
+        executor=None,
+        max_concurrent_batches: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        if max_delay_ms < 0:
+            raise ValueError(f"max_delay_ms must not be negative, got {max_delay_ms}")
+        if max_concurrent_batches < 1:
+            raise ValueError(f"max_concurrent_batches must be at least 1, got {max_concurrent_batches}")
+        self.batch_func = batch_func
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+        self.executor = executor
+        self.max_concurrent_batches = max_concurrent_batches
+        self._in_flight = {}
+        self._pending = []
+        self._timer = None
+        self._running = 0
+        self.n_requests = 0
+        self.n_shared = 0
+        self.n_batches = 0
+        self.n_batched_items = 0
+        self.largest_batch = 0
+
+    async def submit(self, key, item):
+        """
+        Returns the result of `item`, computed in a batch or shared with an in-flight request of the same `key`.
+        `key` must be hashable and equal for items with the same result.
+        """
+        self.n_requests += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.n_shared += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._in_flight[key] = loop.create_future()
+            self._pending.append((key, item, future))
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None and len(self._pending) == 1:
+                delay = self.max_delay_ms / 1000.0 if self._running else 0.0
+                self._timer = loop.call_later(delay, self._on_timer)
+        ## A caller that goes away must not cancel the computation the others are waiting for
+        return await asyncio.shield(future)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self):
+        """Starts batches of the pending requests while a batch slot is free"""
+        loop = asyncio.get_running_loop()
+        while self._pending and self._running < self.max_concurrent_batches:
+            batch, self._pending = self._pending[: self.max_batch_size], self._pending[self.max_batch_size :]
+            self._running += 1
+            loop.create_task(self._run_batch(batch))
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _run_batch(self, batch: list):
+        items = [item for _, item, _ in batch]
+        self.n_batches += 1
+        self.n_batched_items += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+        try:
+            if self.executor is None:
+                results = self.batch_func(items)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(self.executor, self.batch_func, items)
+            if len(results) != len(items):
+                raise ValueError(f"batch_func returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.exception("Batch of %d requests failed", len(items))
+            results = [e] * len(items)
+        finally:
+            self._running -= 1
+            for key, _, _ in batch:
+                self._in_flight.pop(key, None)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        ## Requests that arrived while all slots were busy and whose wait is over
+        if self._pending and self._timer is None:
+            self._dispatch()
+
+    def stats(self):
+        """Request, sharing and batch counters since the aggregator was created"""
+        return {
+            "requests": self.n_requests,
+            "shared": self.n_shared,
+            "batches": self.n_batches,
+            "mean_batch_size": self.n_batched_items / self.n_batches if self.n_batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "in_flight": len(self._in_flight),
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,168 @@
+"""
+Response encoding for the API payloads.
+
+The data tables (lists of namedtuples) are converted with field lists computed once per namedtuple
+type, instead of FastAPI's generic encoder walking every value, and payloads are serialized with
+orjson when it is installed. Clients can negotiate compact formats through the `Accept` header:
+MessagePack for whole payloads and Arrow IPC streams for a single tabular section.
+"""
+
+import io
+import json
+from datetime import date, datetime
+import numpy as np
+import polars as pl
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+## Sections whose namedtuple rows are sent as objects; other namedtuples (eg: significators) are sent as arrays
+TABLE_SECTIONS = {"planets_data", "houses_data"}
+
+## Field names of each namedtuple type seen so far, ie: the precomputed schema of each data table
+_SCHEMAS = {}
+
+
+def get_schema(row_type):
+    """Returns the field names of a namedtuple type, computed once per type"""
+    fields = _SCHEMAS.get(row_type)
+    if fields is None:
+        fields = _SCHEMAS[row_type] = tuple(row_type._fields)
+    return fields
+
+
+def to_records(rows: list):
+    """Converts a data table (list of namedtuples) into a list of dicts, like `[row._asdict() for row in rows]`"""
+    if not rows or not hasattr(rows[0], "_fields"):
+        return rows
+    fields = get_schema(type(rows[0]))
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def to_frame(rows: list):
+    """Converts a data table (list of namedtuples or dicts) into a polars DataFrame"""
+    if rows and hasattr(rows[0], "_fields"):
+        return pl.DataFrame([tuple(row) for row in rows], schema=list(get_schema(type(rows[0]))), orient="row")
+    return pl.DataFrame(rows)
+
+
+def _default(obj):
+    """Fallback for the types the serializers do not handle natively"""
+    if isinstance(obj, tuple):
+        ## namedtuples (eg: significators) are sent as arrays, as FastAPI's encoder does
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+def encode_json(payload):
+    """Serializes a payload to JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def encode_msgpack(payload):
+    """Serializes a payload to MessagePack bytes (needs the optional `msgpack` package)"""
+    if msgpack is None:
+        raise ImportError("MessagePack encoding requires the `msgpack` package")
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def encode_arrow(rows: list):
+    """Serializes one data table to an Arrow IPC stream"""
+    buffer = io.BytesIO()
+    to_frame(rows).write_ipc_stream(buffer)
+    return buffer.getvalue()
+
+
+def available_media_types():
+    """Media types that can be produced with the installed packages, in order of preference"""
+    media_types = [JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE]
+    if msgpack is not None:
+        media_types.insert(1, MSGPACK_MEDIA_TYPE)
+    return media_types
+
+
+def negotiate_media_type(accept: str, available: list = None):
+    """
+    Picks the response media type from an `Accept` header.
+
+    Returns the acceptable media type with the highest q value (ties broken by the order of
+    `available`). Clients that ignore content negotiation still get JSON: it is returned when the header
+    is empty, accepts anything, or only names types this service never produces (eg: "text/plain").
+    None is returned only when the header explicitly asks for MessagePack / Arrow and none of the
+    requested types can be produced (eg: `msgpack` is not installed).
+    """
+    available = available or available_media_types()
+    if not accept or not accept.strip():
+        return JSON_MEDIA_TYPE
+    best, best_rank = None, None
+    binary_requested = False
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality <= 0:
+            continue
+        if media_type in ("*/*", "application/*"):
+            candidates = [JSON_MEDIA_TYPE]
+        elif media_type in ("application/x-msgpack", "application/vnd.msgpack"):
+            candidates = [MSGPACK_MEDIA_TYPE]
+        else:
+            candidates = [media_type]
+        binary_requested |= any(candidate in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE) for candidate in candidates)
+        for candidate in candidates:
+            if candidate in available:
+                rank = (-quality, available.index(candidate))
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = candidate, rank
+    if best is None and not binary_requested:
+        return JSON_MEDIA_TYPE
+    return best
+
+
+def encode_payload(payload: dict, media_type: str, section: str = None):
+    """
+    Encodes an API payload in the negotiated media type.
+
+    Parameters:
+    - payload: dict of section name -> data; data tables may be lists of namedtuples
+    - media_type: one of `JSON_MEDIA_TYPE`, `MSGPACK_MEDIA_TYPE`, `ARROW_MEDIA_TYPE`
+    - section: for Arrow, the name of the tabular section to send
+
+    Returns:
+    - bytes of the encoded payload
+    """
+    if media_type == ARROW_MEDIA_TYPE:
+        rows = payload.get(section)
+        if not isinstance(rows, list):
+            tables = [key for key, value in payload.items() if isinstance(value, list)]
+            raise ValueError(f"Arrow responses need `section` set to one of the tabular sections {tables}")
+        return encode_arrow(rows)
+    ## Data tables of named rows go out as lists of dicts, like `_asdict()`
+    payload = {key: to_records(value) if key in TABLE_SECTIONS else value for key, value in payload.items()}
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return encode_msgpack(payload)
+    return encode_json(payload)
@@ -0,0 +1,112 @@
+"""
+KP ruling planets at the moment of judgment.
+
+The ruling planets are the day lord and the sign / star / sub lords of the Ascendant and of the Moon; the lord
+of the hora (see `sunrise`) is given alongside.
+Instead of a full chart, they are computed from one swe Moon position and the closed form ascendant
+(see `house_cusps`). Results are for the start of the UTC minute at the location rounded to
+`RULING_LOCATION_DECIMALS`, and cached per (minute, rounded location, timezone, ayanamsa, day start), so every
+consultation at one place within the same minute shares one computation. As in KP, the day lord changes at sunrise
+by default.
+"""
+
+import collections
+import math
+import numpy as np
+from datetime import datetime
+from functools import lru_cache
+from .ephemeris import calc_sidereal_positions
+from .house_cusps import ascendant_from_armc, get_sidereal_state
+from .kp_divisions import decode_codes, get_rl_nl_sl_codes
+from .live_chart import current_jd
+from .sunrise import DAY_LORDS, DAY_STARTS, get_day_and_hora_lords
+from .timezones import UNIX_EPOCH_JD, local_to_julian_days
+from .utils import get_local_time
+
+## Decimals kept of the latitude / longitude in the cache key (~1 km), so consultations at one place share results
+RULING_LOCATION_DECIMALS = 2
+RULING_CACHE_SIZE = 4096
+MINUTES_PER_DAY = 1440
+
+RulingPlanets = collections.namedtuple(
+    "RulingPlanets",
+    [
+        "JulianDay",
+        "LocalTime",
+        "DayLord",
+        "AscRasiLord",
+        "AscNakshatraLord",
+        "AscSubLord",
+        "MoonRasiLord",
+        "MoonNakshatraLord",
+        "MoonSubLord",
+        "AscLonDecDeg",
+        "MoonLonDecDeg",
+        "HoraLord",
+    ],
+)
+
+
+def _utc_minute(jd: float):
+    """Index of the UTC minute containing a Julian day; rounded to 1 ms first so whole minutes are not lost to float error"""
+    return math.floor(round((jd - UNIX_EPOCH_JD) * MINUTES_PER_DAY * 60_000) / 60_000)
+
+
+@lru_cache(maxsize=RULING_CACHE_SIZE)
+def _ruling_planets_at_minute(minute: int, latitude: float, longitude: float, tz: str, ayanamsa: str, day_start: str):
+    jd = UNIX_EPOCH_JD + minute / MINUTES_PER_DAY
+    moon_lon = float(calc_sidereal_positions(jd, "Moon", ayanamsa)[0])
+    gast, obliquity, ayanamsa_deg = (float(x[0]) for x in get_sidereal_state(np.array([jd]), ayanamsa))
+    asc_lon = float((ascendant_from_armc((gast + longitude) % 360.0, obliquity, latitude) - ayanamsa_deg) % 360.0)
+    lords = decode_codes(get_rl_nl_sl_codes(np.array([asc_lon, moon_lon])))
+    local_time, _ = get_local_time(jd, tz)
+    vedic_day_lord, _, hora_lord = (x[0] for x in get_day_and_hora_lords(np.array([jd]), latitude, longitude, tz))
+    return RulingPlanets(
+        JulianDay=jd,
+        LocalTime=local_time.isoformat(timespec="minutes"),
+        DayLord=str(vedic_day_lord) if day_start == "sunrise" else DAY_LORDS[local_time.weekday()],
+        AscRasiLord=str(lords["RasiLord"][0]),
+        AscNakshatraLord=str(lords["NakshatraLord"][0]),
+        AscSubLord=str(lords["SubLord"][0]),
+        MoonRasiLord=str(lords["RasiLord"][1]),
+        MoonNakshatraLord=str(lords["NakshatraLord"][1]),
+        MoonSubLord=str(lords["SubLord"][1]),
+        AscLonDecDeg=round(asc_lon, 3),
+        MoonLonDecDeg=round(moon_lon, 3),
+        HoraLord=hora_lord,
+    )
+
+
+def get_ruling_planets(time: datetime, latitude: float, longitude: float, tz: str = "UTC", ayanamsa: str = "Krishnamurti",
+                       day_start: str = "sunrise"):
+    """
+    KP ruling planets for a moment and location.
+
+    Parameters:
+    - time: naive local datetime in `tz`, a timezone aware datetime, or None for now
+    - latitude, longitude: location (east longitude positive)
+    - tz: zone name (eg: Asia/Kolkata) or offset string (eg: "+05:30"), used for the local time and the day lord
+    - ayanamsa: name from `AYANAMSA_MAPPING`
+    - day_start: one of `DAY_STARTS`; KP counts the day from the local sunrise, "midnight" changes the day lord
+      at local midnight instead
+
+    Returns:
+    - `RulingPlanets` namedtuple for the start of the minute containing `time`, computed at the location rounded to
+      `RULING_LOCATION_DECIMALS` (the cache key); HoraLord is None where the Sun does not rise or set that day
+    """
+    if day_start not in DAY_STARTS:
+        raise ValueError(f"Unknown day start '{day_start}'. Choose one of {DAY_STARTS}")
+    if time is None:
+        jd = current_jd()
+    elif time.tzinfo is not None:
+        jd = UNIX_EPOCH_JD + time.timestamp() / 86400.0
+    else:
+        jd = float(local_to_julian_days([time], tz)[0])
+    ## The rounded location is both the cache key and the place the result is computed for
+    latitude, longitude = round(latitude, RULING_LOCATION_DECIMALS), round(longitude, RULING_LOCATION_DECIMALS)
+    return _ruling_planets_at_minute(_utc_minute(jd), latitude, longitude, tz, ayanamsa, day_start)
+
+
+def ruling_planets_cache_info():
+    """Hits, misses and size of the per-minute ruling planets cache"""
+    return _ruling_planets_at_minute.cache_info()
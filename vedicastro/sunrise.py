@@ -0,0 +1,335 @@
+"""
+Vectorized sunrise / sunset and planetary hora tables for many dates and locations.
+
+Instead of one `swe.rise_trans` call per day and place, the Sun's apparent right ascension and declination and the
+Greenwich apparent sidereal time are taken from swe every `SUN_NODE_DAYS` and interpolated, and the rise and set
+of every (location, date) are solved together: starting from the local solar transit, each instant is corrected
+until the Sun's hour angle equals the semi-diurnal arc of `altitude_deg`. Results are cached per (location, year),
+so later queries for the same places are array lookups. The Vedic day runs from one sunrise to the next; its 24
+horas are twelve equal parts of the day (sunrise - sunset) and twelve of the night (sunset - next sunrise).
+"""
+
+import collections
+import threading
+import numpy as np
+import polars as pl
+import swisseph as swe
+from datetime import date
+from .timezones import julian_days_to_local, local_to_julian_days
+
+## Lord of each weekday, indexed by `datetime.weekday()` (Monday = 0)
+DAY_LORDS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+## Chaldean order; the first hora of a day belongs to the day lord and each next hora to the following planet
+HORA_LORDS = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+HORAS_PER_DAY = 24
+## Where a day (and so its weekday lord) starts, for the code that offers both conventions
+DAY_STARTS = ["midnight", "sunrise"]
+
+## Refraction at the horizon used by `swe.rise_trans` (1013.25 hPa, 15°C); sunrise / sunset are when the Sun's
+## upper limb is this far below the true horizon
+HORIZON_REFRACTION_ARCMIN = 36.6
+## Semi-diameter of the Sun at 1 AU
+SUN_SEMIDIAMETER_ARCSEC_AU = 959.63
+## Spacing of the swe evaluations of the Sun's equatorial position and the sidereal time
+SUN_NODE_DAYS = 0.25
+## The Sun's hour angle grows by ~360° per day
+HOUR_ANGLE_RATE = 360.0
+MAX_SOLVER_ITERATIONS = 10
+SOLVER_TOLERANCE_DAYS = 0.01 / 86400
+## Decimals kept of the latitude / longitude in the cache key (~1 km), as for the ruling planets
+SUN_LOCATION_DECIMALS = 2
+SUN_TIMES_CACHE_SIZE = 1024  # (location, year) tables of ~3 KB each
+
+SUN_TIMES_COLS = ["LocationIdx", "Date", "Weekday", "DayLord", "SunriseJulianDay", "SunsetJulianDay", "Sunrise", "Sunset", "DayLengthHours"]
+HORA_TABLE_COLS = ["LocationIdx", "Date", "Hora", "Lord", "StartJulianDay", "EndJulianDay", "Start", "End"]
+
+_SUN_TIMES_CACHE = collections.OrderedDict()
+_SUN_TIMES_LOCK = threading.Lock()
+_SUN_TIMES_STATS = {"hits": 0, "misses": 0}
+
+
+def local_date_range(start_date, end_date):
+    """
+    Local dates from `start_date` to `end_date` (inclusive), as a numpy datetime64[D] array.
+    The dates are `datetime.date` objects or (year, month, day) tuples.
+    """
+    start, end = (value if isinstance(value, date) else date(*value) for value in (start_date, end_date))
+    dates = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    if dates.size == 0:
+        raise ValueError("end_date is before start_date")
+    return dates
+
+
+def weekday_indices(dates):
+    """`datetime.weekday()` (Monday = 0) of a datetime64[D] array; 1970-01-01 was a Thursday"""
+    return (np.asarray(dates, dtype="datetime64[D]").astype(np.int64) + 3) % 7
+
+
+def _sun_equatorial_state(jd_min: float, jd_max: float, flags: int):
+    """
+    f(jd array) -> (right ascension, declination, Greenwich apparent sidereal time, semi-diameter) of the Sun in
+    degrees, interpolated
+    """
+    nodes = jd_min + SUN_NODE_DAYS * np.arange(int(np.ceil((jd_max - jd_min) / SUN_NODE_DAYS)) + 2)
+    equatorial = np.array([swe.calc_ut(t, swe.SUN, flags | swe.FLG_EQUATORIAL)[0][:3] for t in nodes])
+    ra = np.unwrap(equatorial[:, 0], period=360.0)
+    dec = equatorial[:, 1]
+    semidiameter = SUN_SEMIDIAMETER_ARCSEC_AU / 3600 / equatorial[:, 2]
+    gast = np.unwrap([swe.sidtime(t) * 15.0 for t in nodes], period=360.0)
+
+    def state(jd):
+        return tuple(np.interp(jd, nodes, values) for values in (ra, dec, gast, semidiameter))
+
+    return state
+
+
+def solve_sun_events(midnight_jds, lats, lons, altitude_deg: float = None, flags: int = swe.FLG_SWIEPH):
+    """
+    Sunrise and sunset of many (local midnight, location) pairs at once.
+
+    Parameters:
+    - midnight_jds: Julian days (UT) of the local midnights starting each date
+    - lats, lons: latitude and longitude (east positive) of each date, arrays shaped like `midnight_jds`
+    - altitude_deg: altitude of the Sun's centre at rise / set (eg: -18 for astronomical twilight); None for the
+      upper limb on the horizon with `HORIZON_REFRACTION_ARCMIN` of refraction, like `swe.rise_trans`
+    - flags: swe ephemeris flags, i.e `swe.FLG_SWIEPH` or `swe.FLG_MOSEPH`
+
+    Returns:
+    - (sunrise, sunset): Julian days of the rise before and the set after the first solar transit (local noon) after
+      each midnight; NaN where the Sun does not cross `altitude_deg` that day (polar day / night)
+    """
+    midnight_jds = np.asarray(midnight_jds, dtype=np.float64)
+    lats, lons = np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    if midnight_jds.size == 0:
+        return midnight_jds.copy(), midnight_jds.copy()
+    state = _sun_equatorial_state(float(midnight_jds.min()) - 1.0, float(midnight_jds.max()) + 2.0, flags)
+    sin_lat, cos_lat = np.sin(np.radians(lats)), np.cos(np.radians(lats))
+
+    ra, _, gast, _ = state(midnight_jds)
+    transit = midnight_jds + ((ra - gast - lons) % 360.0) / HOUR_ANGLE_RATE
+    events = []
+    for direction in (-1.0, 1.0):
+        t = transit.copy()
+        for _ in range(MAX_SOLVER_ITERATIONS):
+            ra, dec, gast, semidiameter = state(t)
+            altitude = -HORIZON_REFRACTION_ARCMIN / 60 - semidiameter if altitude_deg is None else altitude_deg
+            sin_alt, dec = np.sin(np.radians(altitude)), np.radians(dec)
+            cos_arc = (sin_alt - sin_lat * np.sin(dec)) / (cos_lat * np.cos(dec))
+            ## Semi-diurnal arc; NaN once the Sun stays above / below the altitude all day
+            arc = np.where(np.abs(cos_arc) <= 1.0, np.degrees(np.arccos(np.clip(cos_arc, -1.0, 1.0))), np.nan)
+            hour_angle = gast + lons - ra
+            step = ((direction * arc - hour_angle + 180.0) % 360.0 - 180.0) / HOUR_ANGLE_RATE
+            t = t + step
+            if not (np.abs(step) > SOLVER_TOLERANCE_DAYS).any():
+                break
+        events.append(t)
+    return events[0], events[1]
+
+
+def _location_key(location, altitude_deg: float, flags: int, year: int):
+    lat, lon, tz = location
+    return (round(lat, SUN_LOCATION_DECIMALS), round(lon, SUN_LOCATION_DECIMALS), tz, year, altitude_deg, flags)
+
+
+def _fill_cache(keys: list):
+    """Solves the sunrise / sunset tables of every missing (location, year) key in one vectorized call"""
+    midnights, lats, lons, sizes = [], [], [], []
+    for lat, lon, tz, year, _, _ in keys:
+        ## Every date of the year and Jan 1 of the next, whose sunrise ends the night of Dec 31
+        dates = np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-02"))
+        midnights.append(local_to_julian_days(dates.astype("datetime64[us]"), tz))
+        lats.append(np.full(dates.size, lat))
+        lons.append(np.full(dates.size, lon))
+        sizes.append(dates.size)
+    by_settings = collections.defaultdict(list)
+    for i, key in enumerate(keys):
+        by_settings[key[4:]].append(i)
+    for (altitude_deg, flags), idx in by_settings.items():
+        rise, set_ = solve_sun_events(
+            np.concatenate([midnights[i] for i in idx]), np.concatenate([lats[i] for i in idx]),
+            np.concatenate([lons[i] for i in idx]), altitude_deg, flags,
+        )
+        bounds = np.cumsum([0] + [sizes[i] for i in idx])
+        with _SUN_TIMES_LOCK:
+            for i, start, end in zip(idx, bounds[:-1], bounds[1:]):
+                _SUN_TIMES_CACHE[keys[i]] = (rise[start:end], set_[start:end])
+                _SUN_TIMES_CACHE.move_to_end(keys[i])
+            while len(_SUN_TIMES_CACHE) > SUN_TIMES_CACHE_SIZE:
+                _SUN_TIMES_CACHE.popitem(last=False)
+
+
+def get_sun_times(dates, locations: list, altitude_deg: float = None, flags: int = swe.FLG_SWIEPH):
+    """
+    Sunrise, sunset and next day's sunrise of every location on every date, from the per (location, year) cache.
+
+    Parameters:
+    - dates: array-like of local dates (`datetime.date` or numpy datetime64)
+    - locations: list of (lat, lon, timezone) tuples; timezone is a zone name (eg: Asia/Kolkata) or an
+      offset string (eg: "+05:30")
+    - altitude_deg, flags: as for `solve_sun_events`
+
+    Returns:
+    - (sunrise, sunset, next_sunrise): float64 Julian day arrays shaped (len(locations), len(dates)), NaN where there
+      is no such event
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]").ravel()
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    unique_years = np.unique(years)
+    keys = {(i, year): _location_key(location, altitude_deg, flags, int(year)) for i, location in enumerate(locations) for year in unique_years}
+
+    with _SUN_TIMES_LOCK:
+        missing = list(dict.fromkeys(key for key in keys.values() if key not in _SUN_TIMES_CACHE))
+        _SUN_TIMES_STATS["misses"] += len(missing)
+        _SUN_TIMES_STATS["hits"] += len(set(keys.values())) - len(missing)
+    if missing:
+        _fill_cache(missing)
+
+    day_of_year = (dates - dates.astype("datetime64[Y]").astype("datetime64[D]")).astype(np.int64)
+    results = np.full((3, len(locations), dates.size), np.nan)
+    for (i, year), key in keys.items():
+        with _SUN_TIMES_LOCK:
+            ## A concurrent fill may have evicted the table; solve it again
+            tables = _SUN_TIMES_CACHE.get(key)
+        if tables is None:
+            _fill_cache([key])
+            tables = _SUN_TIMES_CACHE[key]
+        rise, set_ = tables
+        in_year = years == year
+        results[0, i, in_year] = rise[day_of_year[in_year]]
+        results[1, i, in_year] = set_[day_of_year[in_year]]
+        results[2, i, in_year] = rise[day_of_year[in_year] + 1]
+    return results[0], results[1], results[2]
+
+
+def sun_times_cache_info():
+    """Hits, misses (per (location, year) table) and current size of the sunrise cache"""
+    with _SUN_TIMES_LOCK:
+        return dict(_SUN_TIMES_STATS, size=len(_SUN_TIMES_CACHE))
+
+
+def clear_sun_times_cache():
+    with _SUN_TIMES_LOCK:
+        _SUN_TIMES_CACHE.clear()
+        _SUN_TIMES_STATS.update(hits=0, misses=0)
+
+
+def _local_or_nat(jds, tz: str):
+    """Local datetimes of Julian days, NaT where the Julian day is NaN"""
+    jds = np.asarray(jds, dtype=np.float64)
+    local = julian_days_to_local(np.nan_to_num(jds), tz)
+    return np.where(np.isnan(jds), np.datetime64("NaT"), local)
+
+
+def compute_sun_times(start_date, end_date, locations: list, altitude_deg: float = None, flags: int = swe.FLG_SWIEPH):
+    """
+    Daily sunrise and sunset of every location over a date range.
+
+    Parameters:
+    - start_date, end_date: first and last local dates, as `datetime.date` or (year, month, day) tuples
+    - locations, altitude_deg, flags: as for `get_sun_times`
+
+    Returns:
+    - polars DataFrame with `SUN_TIMES_COLS`, one row per (location, date), with the rise / set times as Julian days and
+      local datetimes (null during polar day / night)
+    """
+    dates = local_date_range(start_date, end_date)
+    if not locations:
+        raise ValueError("No locations given")
+    sunrise, sunset, _ = get_sun_times(dates, locations, altitude_deg, flags)
+    weekdays = weekday_indices(dates)
+    frames = []
+    for location_idx, (_, _, tz) in enumerate(locations):
+        frames.append(pl.DataFrame({
+            "LocationIdx": np.full(dates.size, location_idx),
+            "Date": dates,
+            "Weekday": weekdays,
+            "DayLord": np.array(DAY_LORDS)[weekdays],
+            "SunriseJulianDay": sunrise[location_idx],
+            "SunsetJulianDay": sunset[location_idx],
+            "Sunrise": _local_or_nat(sunrise[location_idx], tz),
+            "Sunset": _local_or_nat(sunset[location_idx], tz),
+            "DayLengthHours": (sunset[location_idx] - sunrise[location_idx]) * 24,
+        }, nan_to_null=True))
+    return pl.concat(frames).select(SUN_TIMES_COLS)
+
+
+def hora_lord_indices(weekdays, hora_numbers):
+    """Index into `HORA_LORDS` of the lord of hora `hora_numbers` (0 - 23) of days with the given weekdays"""
+    day_lord_idx = np.array([HORA_LORDS.index(lord) for lord in DAY_LORDS])[np.asarray(weekdays)]
+    return (day_lord_idx + np.asarray(hora_numbers)) % len(HORA_LORDS)
+
+
+def _hora_bounds(sunrise, sunset, next_sunrise):
+    """Julian days of the 25 hora boundaries of each day, shaped (..., 25)"""
+    parts = np.linspace(0.0, 1.0, HORAS_PER_DAY // 2 + 1)
+    day = sunrise[..., None] + (sunset - sunrise)[..., None] * parts
+    night = sunset[..., None] + (next_sunrise - sunset)[..., None] * parts[1:]
+    return np.concatenate([day, night], axis=-1)
+
+
+def compute_horas(start_date, end_date, locations: list, altitude_deg: float = None, flags: int = swe.FLG_SWIEPH):
+    """
+    The 24 planetary horas of every location and Vedic day over a date range.
+
+    Parameters:
+    - start_date, end_date, locations, altitude_deg, flags: as for `compute_sun_times`
+
+    Returns:
+    - polars DataFrame with `HORA_TABLE_COLS`, 24 rows per (location, date) with hora numbers 1 - 24: the day horas
+      from the sunrise of the date to sunset, then the night horas up to the next sunrise. Days without a sunrise
+      or sunset (polar day / night) have no rows.
+    """
+    dates = local_date_range(start_date, end_date)
+    if not locations:
+        raise ValueError("No locations given")
+    bounds = _hora_bounds(*get_sun_times(dates, locations, altitude_deg, flags))
+    lords = np.array(HORA_LORDS)[hora_lord_indices(weekday_indices(dates)[:, None], np.arange(HORAS_PER_DAY))]
+    frames = []
+    for location_idx, (_, _, tz) in enumerate(locations):
+        valid = ~np.isnan(bounds[location_idx]).any(axis=1)
+        starts, ends = bounds[location_idx, valid, :-1].ravel(), bounds[location_idx, valid, 1:].ravel()
+        n_days = np.count_nonzero(valid)
+        frames.append(pl.DataFrame({
+            "LocationIdx": np.full(n_days * HORAS_PER_DAY, location_idx),
+            "Date": np.repeat(dates[valid], HORAS_PER_DAY),
+            "Hora": np.tile(np.arange(1, HORAS_PER_DAY + 1), n_days),
+            "Lord": lords[valid].ravel(),
+            "StartJulianDay": starts,
+            "EndJulianDay": ends,
+            "Start": julian_days_to_local(starts, tz),
+            "End": julian_days_to_local(ends, tz),
+        }))
+    return pl.concat(frames).select(HORA_TABLE_COLS)
+
+
+def get_day_and_hora_lords(jds, latitude: float, longitude: float, tz: str, altitude_deg: float = None,
+                           flags: int = swe.FLG_SWIEPH):
+    """
+    Vedic day lord (the day starting at sunrise) and hora of moments at one location.
+
+    Parameters:
+    - jds: Julian days (UT)
+    - latitude, longitude, tz: location, as in the `locations` tuples of `get_sun_times`
+    - altitude_deg, flags: as for `solve_sun_events`
+
+    Returns:
+    - (day_lords, hora_numbers, hora_lords): arrays shaped like `jds`; hora numbers are 1 - 24. Where the Sun does
+      not rise or set, the day lord is that of the civil date and the hora number is 0 with lord None.
+    """
+    jds = np.asarray(jds, dtype=np.float64)
+    civil_dates = julian_days_to_local(jds, tz).astype("datetime64[D]")
+    ## Moments before the sunrise of their civil date belong to the previous Vedic day
+    candidates = np.stack([civil_dates - 1, civil_dates])
+    unique_dates, inverse = np.unique(candidates, return_inverse=True)
+    bounds = _hora_bounds(*(times[0] for times in get_sun_times(unique_dates, [(latitude, longitude, tz)], altitude_deg, flags)))
+    bounds = bounds[inverse.reshape(candidates.shape)]
+    after_sunrise = jds >= bounds[1, ..., 0]
+    vedic_dates = np.where(after_sunrise, civil_dates, civil_dates - 1)
+    day_bounds = np.where(after_sunrise[..., None], bounds[1], bounds[0])
+    valid = ~np.isnan(day_bounds).any(axis=-1)
+
+    hora_idx = np.clip((day_bounds[..., 1:] <= jds[..., None]).sum(axis=-1), 0, HORAS_PER_DAY - 1)
+    weekdays = weekday_indices(np.where(valid, vedic_dates, civil_dates))
+    day_lords = np.array(DAY_LORDS)[weekdays]
+    hora_lords = np.array(HORA_LORDS, dtype=object)[hora_lord_indices(weekdays, hora_idx)]
+    return day_lords, np.where(valid, hora_idx + 1, 0), np.where(valid, hora_lords, None)
@@ -0,0 +1,175 @@
+"""
+Vectorized local time -> UTC conversion from pytz transition tables.
+
+`get_utc_offset` localizes one datetime at a time and returns the offset as a "+05:30" string, which
+flatlib parses back. For batches, each zone's UTC transition table (transition instants, UTC offsets
+and DST flags) is read from pytz once and cached, and arrays of naive local datetimes are converted
+with two `np.searchsorted` calls. Local times that fall in a DST gap (nonexistent) or overlap
+(ambiguous) are resolved by the explicit `nonexistent` / `ambiguous` policies; the defaults give the
+same result as `pytz.timezone(...).localize(dt)`, i.e `is_dst=False`.
+
+Like pytz, the tables end at the last transition pytz knows about (2037 for most zones) and that
+offset is used for any later date.
+"""
+
+import numpy as np
+from datetime import datetime
+from functools import lru_cache
+from .utils import resolve_timezone
+
+UNIX_EPOCH_JD = 2440587.5
+US_PER_DAY = 86400 * 1_000_000
+## timedelta // _US gives whole microseconds
+_US = datetime(1970, 1, 1, 0, 0, 0, 1) - datetime(1970, 1, 1)
+
+## Policies for local times that occur twice (DST overlap)
+## standard: the non-DST reading (pytz `is_dst=False`), dst: the DST reading (pytz `is_dst=True`),
+## earliest / latest: the earlier / later UTC instant, raise: ValueError, nan: NaN in the result
+AMBIGUOUS_POLICIES = ["standard", "dst", "earliest", "latest", "raise", "nan"]
+## Policies for local times that do not occur (DST gap)
+## before: read with the offset in force before the gap (pytz `is_dst=False`), after: with the offset after it
+## (pytz `is_dst=True`), raise: ValueError, nan: NaN in the result
+NONEXISTENT_POLICIES = ["before", "after", "raise", "nan"]
+
+
+@lru_cache(maxsize=None)
+def get_transition_table(timezone_loc: str):
+    """
+    UTC transition table of a timezone, as used by pytz.
+
+    Parameters:
+    - timezone_loc: zone name (eg: America/New_York) or fixed offset string (eg: "+05:30"), as for `get_utc_offset`
+
+    Returns:
+    - (transitions, offsets, dst): int64 arrays of the UTC instants (microseconds since the Unix epoch) from which
+      each offset applies, the UTC offsets in microseconds, and a bool array of the DST flags.
+      The first transition is the start of the `datetime` range.
+    """
+    tz = resolve_timezone(timezone_loc)
+    if not hasattr(tz, "_utc_transition_times"):
+        ## pytz.utc, StaticTzInfo and FixedOffset zones have a single offset
+        offset = tz.utcoffset(datetime(2000, 1, 1))
+        return (
+            np.array([np.iinfo(np.int64).min]),
+            np.array([offset // _US]),
+            np.array([False]),
+        )
+    transitions = np.array(tz._utc_transition_times, dtype="datetime64[us]").astype(np.int64)
+    offsets = np.array([info[0] // _US for info in tz._transition_info], dtype=np.int64)
+    dst = np.array([bool(info[1]) for info in tz._transition_info])
+    return transitions, offsets, dst
+
+
+def _to_local_us(local_datetimes):
+    """Naive local datetimes (list of `datetime`, numpy datetime64 array, ...) as int64 microseconds since the epoch"""
+    return np.asarray(local_datetimes, dtype="datetime64[us]").astype(np.int64)
+
+
+def _zone_offsets(local_us: np.ndarray, timezone_loc: str, ambiguous: str, nonexistent: str):
+    transitions, offsets, dst = get_transition_table(timezone_loc)
+    n = len(transitions)
+    result = np.empty(local_us.shape, dtype=np.float64)
+    if n == 1:
+        result[:] = offsets[0]
+        return result
+
+    ## Index of the latest period whose local start is not after each local time
+    local_starts = transitions + offsets
+    local_starts[0] = np.iinfo(np.int64).min
+    k = np.clip(np.searchsorted(local_starts, local_us, side="right") - 1, 0, n - 1)
+    prev = np.maximum(k - 1, 0)
+
+    def is_valid(idx):
+        utc = local_us - offsets[idx]
+        upper = np.where(idx + 1 < n, transitions[np.minimum(idx + 1, n - 1)], np.iinfo(np.int64).max)
+        return ((utc >= transitions[idx]) | (idx == 0)) & (utc < upper)
+
+    valid_k, valid_prev = is_valid(k), is_valid(prev) & (k > 0)
+    result[:] = np.where(valid_k, offsets[k], offsets[prev])
+
+    ## Overlap: both the previous period (earlier UTC instant, larger offset) and the current one are valid
+    overlap = valid_k & valid_prev
+    if overlap.any():
+        if ambiguous == "raise":
+            raise ValueError(f"{np.count_nonzero(overlap)} local times are ambiguous in {timezone_loc}")
+        first, second = prev[overlap], k[overlap]
+        earliest = np.where(offsets[first] >= offsets[second], first, second)
+        latest = np.where(offsets[first] >= offsets[second], second, first)
+        if ambiguous in ("standard", "dst"):
+            want_dst = ambiguous == "dst"
+            unique = dst[first] != dst[second]
+            by_flag = np.where(dst[first] == want_dst, first, second)
+            ## Same as pytz when both readings have the same DST flag: is_dst=False takes the later instant
+            chosen = np.where(unique, by_flag, earliest if want_dst else latest)
+        else:
+            chosen = earliest if ambiguous == "earliest" else latest
+        result[overlap] = np.where(ambiguous == "nan", np.nan, offsets[chosen])
+
+    ## Gap: neither period is valid; `k` is the period before the gap
+    gap = ~valid_k & ~valid_prev
+    if gap.any():
+        if nonexistent == "raise":
+            raise ValueError(f"{np.count_nonzero(gap)} local times do not exist in {timezone_loc}")
+        before = k[gap]
+        after = np.minimum(before + 1, n - 1)
+        result[gap] = np.nan if nonexistent == "nan" else offsets[before if nonexistent == "before" else after]
+    return result
+
+
+def _utc_offsets_us(local_us: np.ndarray, timezones, ambiguous: str, nonexistent: str):
+    if ambiguous not in AMBIGUOUS_POLICIES:
+        raise ValueError(f"Unknown ambiguous policy '{ambiguous}'. Choose one of {AMBIGUOUS_POLICIES}")
+    if nonexistent not in NONEXISTENT_POLICIES:
+        raise ValueError(f"Unknown nonexistent policy '{nonexistent}'. Choose one of {NONEXISTENT_POLICIES}")
+    if isinstance(timezones, str):
+        return _zone_offsets(local_us, timezones, ambiguous, nonexistent)
+    timezones = np.asarray(timezones, dtype=object)
+    if timezones.shape != local_us.shape:
+        raise ValueError(f"Got {timezones.shape} timezones for {local_us.shape} datetimes")
+    offsets = np.empty(local_us.shape, dtype=np.float64)
+    for timezone_loc in set(timezones.ravel().tolist()):
+        mask = timezones == timezone_loc
+        offsets[mask] = _zone_offsets(local_us[mask], timezone_loc, ambiguous, nonexistent)
+    return offsets
+
+
+def get_utc_offsets(local_datetimes, timezones, ambiguous: str = "standard", nonexistent: str = "before"):
+    """
+    UTC offsets of naive local datetimes.
+
+    Parameters:
+    - local_datetimes: array-like of naive local datetimes (`datetime` objects or numpy datetime64)
+    - timezones: one zone name / offset string for all, or an array-like of them, one per datetime
+    - ambiguous: policy for local times in a DST overlap, one of `AMBIGUOUS_POLICIES`
+    - nonexistent: policy for local times in a DST gap, one of `NONEXISTENT_POLICIES`
+
+    Returns:
+    - float64 array of the UTC offsets in hours (NaN where a policy is "nan")
+    """
+    return _utc_offsets_us(_to_local_us(local_datetimes), timezones, ambiguous, nonexistent) / 3600e6
+
+
+def local_to_julian_days(local_datetimes, timezones, ambiguous: str = "standard", nonexistent: str = "before"):
+    """
+    Converts naive local datetimes to UTC Julian days in one vectorized call.
+    Takes the same parameters as `get_utc_offsets`.
+
+    Returns:
+    - float64 array of Julian days (UT); the microseconds of the input are kept up to float64 precision (~40 us)
+    """
+    local_us = _to_local_us(local_datetimes)
+    utc_us = local_us - _utc_offsets_us(local_us, timezones, ambiguous, nonexistent)
+    return UNIX_EPOCH_JD + utc_us / US_PER_DAY
+
+
+def julian_days_to_local(jds, timezone_loc: str):
+    """
+    Converts UTC Julian days to naive local datetimes of one timezone in one vectorized call.
+
+    Returns:
+    - numpy datetime64[us] array shaped like `jds`
+    """
+    utc_us = np.round((np.asarray(jds, dtype=np.float64) - UNIX_EPOCH_JD) * US_PER_DAY).astype(np.int64)
+    transitions, offsets, _ = get_transition_table(timezone_loc)
+    k = np.clip(np.searchsorted(transitions, utc_us, side="right") - 1, 0, len(transitions) - 1)
+    return (utc_us + offsets[k]).astype("datetime64[us]")
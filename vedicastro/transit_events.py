@@ -0,0 +1,256 @@
+"""
+Root-finding ingress and station event calendar.
+
+Each object is sampled once per `SAMPLE_DAYS` to bracket its stations (sign changes of the speed),
+which are then refined by bisection. Between two consecutive samples / stations the longitude is
+monotonic, so every division boundary lying between the two longitudes is crossed exactly once, and
+each crossing is refined by a safeguarded Newton iteration on the longitude (using the swe speed).
+This needs about one ephemeris call per object per day plus a handful per event, instead of one
+call per minute when sampling `get_transit_details`.
+"""
+
+import collections
+import logging
+import numpy as np
+import swisseph as swe
+from .ephemeris import GRAHAS, calc_sidereal_positions, jd_to_datetime
+from .kp_divisions import DIVISION_EDGES, SUB_LORD_CODES, SUB_SUB_LORD_CODES, VIMSHOTTARI_LORDS
+from .VedicAstro import RASHIS, NAKSHATRAS
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_DAYS = 1.0
+## Objects that never change direction (Rahu / Ketu are the mean nodes, always retrograde)
+NO_STATIONS = {"Sun", "Moon", "Rahu", "Ketu"}
+MAX_NEWTON_ITERATIONS = 30
+
+## Event levels, named after the planets data table column that changes at the boundary
+EVENT_LEVELS = {
+    "Rasi": "sign",
+    "Nakshatra": "nakshatra",
+    "Pada": "pada",
+    "SubLord": "sub",
+    "SubSubLord": "sub_sub",
+}
+DEFAULT_EVENTS = ["Rasi", "Nakshatra", "Pada", "SubLord", "Station"]
+
+TransitEvent = collections.namedtuple(
+    "TransitEvent",
+    ["JulianDay", "Timestamp", "Object", "Event", "From", "To", "LonDecDeg"],
+)
+
+
+def wrap_degrees(deg):
+    """Wraps angle differences into [-180, 180)"""
+    return (np.asarray(deg) + 180.0) % 360.0 - 180.0
+
+
+def make_position_func(obj: str, ayanamsa: str, ephemeris_cache=None, flags: int = swe.FLG_SWIEPH):
+    """Returns f(jd array) -> (lon, speed), served from `ephemeris_cache` when it covers the request, else from swe"""
+
+    def positions(jd):
+        if ephemeris_cache is not None and ephemeris_cache.covers(jd):
+            lon, _, speed = ephemeris_cache.positions(obj, jd)
+        else:
+            lon, _, speed = calc_sidereal_positions(jd, obj, ayanamsa, flags)
+        return lon, speed
+
+    return positions
+
+
+def solve_crossings(position_func, t_lo, t_hi, targets, tol_days: float, columns=None, bracket_angles=None):
+    """
+    Finds, for each bracket, the time at which a monotonic angle reaches its target, all brackets at once.
+
+    Parameters:
+    - position_func: f(jd array) -> (angle, rate) in degrees and degrees/day
+    - t_lo, t_hi: arrays of bracket start / end Julian days, each containing exactly one crossing
+    - targets: array of target angles in degrees
+    - tol_days: stop once every time step is smaller than this
+    - columns: optional array with the angle of each bracket (eg: a cusp index); `position_func` is then called
+      as f(jd array, columns array), so that several angles are solved with one evaluation per iteration
+    - bracket_angles: optional (angle at t_lo, angle at t_hi) arrays, when the caller already sampled them
+
+    Returns:
+    - array of crossing Julian days
+    """
+    t_lo, t_hi = np.array(t_lo, dtype=np.float64), np.array(t_hi, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    if t_lo.size == 0:
+        return t_lo
+    if columns is None:
+        evaluate = lambda jd, mask: position_func(jd)
+    else:
+        columns = np.asarray(columns)
+        evaluate = lambda jd, mask: position_func(jd, columns[mask])
+    everything = np.ones(t_lo.shape, dtype=bool)
+    if bracket_angles is None:
+        angle_lo, angle_hi = evaluate(t_lo, everything)[0], evaluate(t_hi, everything)[0]
+    else:
+        angle_lo, angle_hi = (np.asarray(angles, dtype=np.float64) for angles in bracket_angles)
+    ## +1 where the angle increases through the target, -1 where it decreases
+    direction = np.where(wrap_degrees(angle_hi - angle_lo) >= 0, 1.0, -1.0)
+
+    ## Start from linear interpolation inside the bracket
+    span = wrap_degrees(angle_hi - angle_lo)
+    frac = np.clip(np.divide(wrap_degrees(targets - angle_lo), span, out=np.full_like(span, 0.5), where=span != 0), 0, 1)
+    t = t_lo + frac * (t_hi - t_lo)
+    active = everything.copy()
+    for _ in range(MAX_NEWTON_ITERATIONS):
+        angle, rate = evaluate(t[active], active)
+        diff = wrap_degrees(angle - targets[active])
+        past = diff * direction[active] > 0
+        t_lo[active] = np.where(past, t_lo[active], t[active])
+        t_hi[active] = np.where(past, t[active], t_hi[active])
+
+        newton = t[active] - np.divide(diff, rate, out=np.full_like(diff, np.inf), where=rate != 0)
+        inside = (newton >= t_lo[active]) & (newton <= t_hi[active])
+        new_t = np.where(inside, newton, (t_lo[active] + t_hi[active]) / 2)
+        step = np.abs(new_t - t[active])
+        t[active] = new_t
+        still_active = (step > tol_days) & (t_hi[active] - t_lo[active] > tol_days)
+        active[np.flatnonzero(active)[~still_active]] = False
+        if not active.any():
+            break
+    return t
+
+
+def _find_stations(speed_func, t_lo, t_hi, tol_days: float):
+    """Bisects the sign change of the speed inside each bracket"""
+    t_lo, t_hi = np.array(t_lo, dtype=np.float64), np.array(t_hi, dtype=np.float64)
+    if t_lo.size == 0:
+        return t_lo
+    sign_lo = np.sign(speed_func(t_lo))
+    while np.max(t_hi - t_lo) > tol_days:
+        mid = (t_lo + t_hi) / 2
+        same = np.sign(speed_func(mid)) == sign_lo
+        t_lo = np.where(same, mid, t_lo)
+        t_hi = np.where(same, t_hi, mid)
+    return (t_lo + t_hi) / 2
+
+
+def _division_names(event: str):
+    """Names of the divisions of a level, in the order of `DIVISION_EDGES`"""
+    if event == "Rasi":
+        return RASHIS
+    if event == "Nakshatra":
+        return NAKSHATRAS
+    if event == "Pada":
+        return [f"{nakshatra} {pada}" for nakshatra in NAKSHATRAS for pada in range(1, 5)]
+    codes = SUB_LORD_CODES if event == "SubLord" else SUB_SUB_LORD_CODES
+    return [VIMSHOTTARI_LORDS[code] for code in codes]
+
+
+def boundary_count(unwrapped_lon, edges):
+    """
+    Number of boundaries of `edges` (repeating every 360°) at or below each unwrapped longitude.
+    The difference of the counts at two samples is the number of boundaries crossed between them, which is
+    how the samples of a monotonic angle are turned into `solve_crossings` brackets.
+    """
+    turns = np.floor(unwrapped_lon / 360.0)
+    return turns * len(edges) + np.searchsorted(edges, unwrapped_lon - turns * 360.0, side="right")
+
+
+def find_object_events(obj: str, jd_start: float, jd_end: float, events: list, position_func, tol_days: float):
+    """
+    Finds the `events` (see `EVENT_LEVELS`, plus "Station") of one object within a date range.
+
+    Parameters:
+    - obj: graha name, one of `GRAHAS`
+    - jd_start, jd_end: Julian days (UT) of the search range
+    - events: event names, eg: ["Nakshatra", "Station"]
+    - position_func: f(jd array) -> (lon, speed), eg: from `make_position_func`
+    - tol_days: precision of the event times in days
+
+    Returns:
+    - unsorted list of (jd, obj, event, from, to, lon) tuples
+    """
+    n_samples = int(np.ceil((jd_end - jd_start) / SAMPLE_DAYS)) + 1
+    t = np.linspace(jd_start, jd_end, n_samples)
+    lon, speed = position_func(t)
+    found = []
+
+    ## Stations split the samples into segments where the longitude is monotonic
+    if obj not in NO_STATIONS:
+        flips = np.flatnonzero(np.sign(speed[:-1]) != np.sign(speed[1:]))
+        station_jds = _find_stations(lambda jd: position_func(jd)[1], t[flips], t[flips + 1], tol_days)
+        if station_jds.size:
+            station_lon, _ = position_func(station_jds)
+            if "Station" in events:
+                for jd, was_retro, lon_deg in zip(station_jds, speed[flips] < 0, station_lon):
+                    motion = ("Retrograde", "Direct") if was_retro else ("Direct", "Retrograde")
+                    found.append((jd, obj, "Station", *motion, lon_deg))
+            order = np.argsort(np.concatenate([t, station_jds]))
+            t = np.concatenate([t, station_jds])[order]
+            lon = np.concatenate([lon, station_lon])[order]
+
+    unwrapped = lon[0] + np.concatenate([[0.0], np.cumsum(wrap_degrees(np.diff(lon)))])
+    for event in events:
+        if event not in EVENT_LEVELS:
+            continue  # "Station", found above
+        edges = DIVISION_EDGES[EVENT_LEVELS[event]][:-1]
+        names = _division_names(event)
+        counts = boundary_count(unwrapped, edges).astype(np.int64)
+        ## Each segment crosses the boundaries between its two counts, once each
+        seg_lo, seg_hi = np.minimum(counts[:-1], counts[1:]), np.maximum(counts[:-1], counts[1:])
+        n_cross = seg_hi - seg_lo
+        seg_idx = np.repeat(np.arange(len(n_cross)), n_cross)
+        if seg_idx.size == 0:
+            continue
+        boundary = np.concatenate([np.arange(lo, hi) for lo, hi in zip(seg_lo[n_cross > 0], seg_hi[n_cross > 0])])
+        edge_idx = boundary % len(edges)
+        targets = edges[edge_idx]
+        crossing_jds = solve_crossings(position_func, t[seg_idx], t[seg_idx + 1], targets, tol_days)
+
+        forward = counts[seg_idx + 1] > counts[seg_idx]
+        division_after = np.where(forward, edge_idx, edge_idx - 1) % len(edges)
+        division_before = np.where(forward, edge_idx - 1, edge_idx) % len(edges)
+        for jd, before, after, target in zip(crossing_jds, division_before, division_after, targets):
+            ## Sub divisions are split at the sign edges, where the sub lord itself does not change
+            if names[before] != names[after]:
+                found.append((jd, obj, event, names[before], names[after], target))
+    return found
+
+
+def find_transit_events(
+    jd_start: float,
+    jd_end: float,
+    objects: list = None,
+    events: list = None,
+    ayanamsa: str = "Krishnamurti",
+    precision_seconds: float = 1.0,
+    ephemeris_cache=None,
+    flags: int = swe.FLG_SWIEPH,
+):
+    """
+    Finds every sign, nakshatra, pada, sub lord (and optionally sub-sub lord) change and every
+    retrograde / direct station of the given objects within a date range.
+
+    Parameters:
+    - jd_start, jd_end: Julian days (UT) of the search range
+    - objects: graha names, defaults to all of `GRAHAS`
+    - events: any of "Rasi", "Nakshatra", "Pada", "SubLord", "SubSubLord", "Station"; defaults to `DEFAULT_EVENTS`
+    - ayanamsa: ayanamsa name, one of `AYANAMSA_MAPPING`
+    - precision_seconds: precision of the event times
+    - ephemeris_cache: optional `EphemerisCache` to read the positions from instead of swe
+    - flags: swe ephemeris flags used when not reading from the cache
+
+    Returns:
+    - list of TransitEvent named tuples sorted by time; `Timestamp` is in UTC
+    """
+    objects = objects or GRAHAS
+    events = events or DEFAULT_EVENTS
+    unknown = [event for event in events if event not in list(EVENT_LEVELS) + ["Station"]]
+    if unknown:
+        raise ValueError(f"Unknown event(s) {unknown}. Choose from {list(EVENT_LEVELS) + ['Station']}")
+    tol_days = precision_seconds / 86400
+    found = []
+    for obj in objects:
+        position_func = make_position_func(obj, ayanamsa, ephemeris_cache, flags)
+        found.extend(find_object_events(obj, jd_start, jd_end, events, position_func, tol_days))
+    found.sort(key=lambda event: event[0])
+    return [
+        TransitEvent(float(jd), jd_to_datetime(float(jd), 0.0), obj, event, before, after, round(float(lon), 4))
+        for jd, obj, event, before, after, lon in found
+        if jd_start <= jd <= jd_end
+    ]
@@ -0,0 +1,157 @@
+"""
+Server-push transit streams, computed once per key and fanned out to every subscriber.
+
+Each (location, ayanamsa, house system) key with at least one subscriber has one background task
+that advances a `LiveChart` every `TRANSIT_TICK_SECONDS` and encodes each Server-Sent Event once:
+the full transit table ("transits" events) and the fields that changed since the previous tick
+("changes" events). The chart update and the encoding run in the loop's default executor, so the
+event loop keeps serving requests meanwhile; only the fan-out runs on the loop. The same encoded bytes are put on every subscriber's queue, so the server cost
+per tick does not grow with the number of clients. A subscriber that does not keep up loses its
+oldest undelivered events, and the task stops when the last subscriber leaves.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from .live_chart import LiveChart
+from .response_encoding import encode_json
+from .timezones import UNIX_EPOCH_JD
+
+logger = logging.getLogger(__name__)
+
+TRANSIT_TICK_SECONDS = 1.0
+## Events kept per subscriber before the oldest ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 16
+## Decimals kept of the latitude / longitude in the stream key, so that nearby clients share a stream (~10 m)
+LOCATION_DECIMALS = 4
+STREAM_MODES = ["full", "diff"]
+## Idle subscribers get an SSE comment this often, so proxies keep the connection open
+HEARTBEAT_SECONDS = 15.0
+HEARTBEAT_EVENT = b": keep-alive\n\n"
+
+
+def format_sse(event: str, payload: dict):
+    """Encodes one Server-Sent Event"""
+    return b"event: " + event.encode() + b"\ndata: " + encode_json(payload) + b"\n\n"
+
+
+def _timestamp(jd: float):
+    return (datetime(1970, 1, 1) + timedelta(days=jd - UNIX_EPOCH_JD)).isoformat(timespec="seconds") + "Z"
+
+
+class TransitStream:
+    """The background task and subscribers of one stream key"""
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.subscribers = {mode: set() for mode in STREAM_MODES}
+        self.ticks = 0
+        self.task = None
+        self.live_chart = None
+        self._transits_event = None
+
+    def _encode_transits(self):
+        live = self.live_chart
+        payload = {"jd": live.jd, "timestamp": _timestamp(live.jd), "rows": live.get_chart_data().to_dicts()}
+        return format_sse("transits", payload)
+
+    def transits_event(self):
+        """The "transits" event of the current tick; before the first tick it is encoded on first use"""
+        if self._transits_event is None:
+            self._transits_event = self._encode_transits()
+        return self._transits_event
+
+    def advance(self):
+        """
+        Advances the chart one tick and encodes its events, without touching the subscribers, so it can run off
+        the event loop. Returns the "transits" event and the "changes" event (None when nothing changed).
+        """
+        changes = self.live_chart.update()
+        live = self.live_chart
+        changes_event = None
+        if changes:
+            payload = {"jd": live.jd, "timestamp": _timestamp(live.jd), "changes": [change._asdict() for change in changes]}
+            changes_event = format_sse("changes", payload)
+        return self._encode_transits(), changes_event
+
+    def publish(self, transits_event: bytes, changes_event: bytes):
+        """Fans the events of one tick out to the subscribers; runs on the event loop"""
+        self.ticks += 1
+        self._transits_event = transits_event
+        if self.subscribers["full"]:
+            self.broadcast("full", transits_event)
+        if changes_event is not None and self.subscribers["diff"]:
+            self.broadcast("diff", changes_event)
+
+    def tick(self):
+        self.publish(*self.advance())
+
+    def broadcast(self, mode: str, event: bytes):
+        for queue in self.subscribers[mode]:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def n_subscribers(self):
+        return sum(len(queues) for queues in self.subscribers.values())
+
+
+class TransitStreamHub:
+    """
+    Registry of the running transit streams.
+
+    `subscribe` returns an `asyncio.Queue` of encoded events, starting with the current transit table; the caller must
+    `unsubscribe` it when the client goes away.
+    """
+
+    def __init__(self, tick_seconds: float = TRANSIT_TICK_SECONDS):
+        self.tick_seconds = tick_seconds
+        self.streams = {}
+
+    @staticmethod
+    def make_key(latitude: float, longitude: float, ayanamsa: str, house_system: str):
+        return (round(latitude, LOCATION_DECIMALS), round(longitude, LOCATION_DECIMALS), ayanamsa, house_system)
+
+    def subscribe(self, latitude: float, longitude: float, ayanamsa: str = "Krishnamurti",
+                  house_system: str = "Placidus", mode: str = "diff"):
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unknown stream mode '{mode}'. Choose one of {STREAM_MODES}")
+        key = self.make_key(latitude, longitude, ayanamsa, house_system)
+        stream = self.streams.get(key)
+        if stream is None:
+            live_chart = LiveChart(key[0], key[1], ayanamsa=ayanamsa, house_system=house_system)
+            stream = self.streams[key] = TransitStream(key)
+            stream.live_chart = live_chart
+            stream.task = asyncio.get_running_loop().create_task(self._run(stream))
+            logger.info("Started transit stream %s", key)
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        queue.put_nowait(stream.transits_event())
+        stream.subscribers[mode].add(queue)
+        return key, queue
+
+    def unsubscribe(self, key: tuple, queue: asyncio.Queue):
+        stream = self.streams.get(key)
+        if stream is None:
+            return
+        for queues in stream.subscribers.values():
+            queues.discard(queue)
+        if not stream.n_subscribers():
+            stream.task.cancel()
+            del self.streams[key]
+            logger.info("Stopped transit stream %s after %d ticks", key, stream.ticks)
+
+    async def _run(self, stream: TransitStream):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += self.tick_seconds
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            try:
+                events = await loop.run_in_executor(None, stream.advance)
+                stream.publish(*events)
+            except Exception:
+                logger.exception("Transit stream %s failed to tick", stream.key)
+
+    def stats(self):
+        """Number of subscribers and ticks of each running stream"""
+        return {str(key): {"subscribers": stream.n_subscribers(), "ticks": stream.ticks} for key, stream in self.streams.items()}
@@ -124,7 +124,8 @@ def compute_new_date(start_date : tuple, diff_value : float, direction: str):
 
     return new_date
 
-def get_utc_offset(timezone_loc: str, date: datetime):
+def resolve_timezone(timezone_loc: str):
+    """Returns the pytz timezone for a zone name (eg: Asia/Kolkata) or a fixed offset string (eg: "+05:30", "UTC-4")"""
     from pytz import timezone, FixedOffset, UnknownTimeZoneError
 
     try:
@@ -161,17 +162,37 @@ def get_utc_offset(timezone_loc: str, date: datetime):
 
             offset_minutes = sign * (hrs * 60 + mins)
             tz = FixedOffset(offset_minutes)
+    return tz
 
-    localized_date = tz.localize(date)
-    utc_offset_sec = localized_date.utcoffset().total_seconds()
+def format_utc_offset(utc_offset_sec: float) -> str:
     hours, remainder = divmod(abs(utc_offset_sec), 3600)
     minutes = remainder // 60
     sign = "+" if utc_offset_sec >= 0 else "-"
-    utc_offset_str = f"{sign}{int(hours):02}:{int(minutes):02}"    
+    return f"{sign}{int(hours):02}:{int(minutes):02}"
+
+def get_utc_offset(timezone_loc: str, date: datetime):
+    tz = resolve_timezone(timezone_loc)
+    localized_date = tz.localize(date)
+    utc_offset_sec = localized_date.utcoffset().total_seconds()
+    utc_offset_str = format_utc_offset(utc_offset_sec)
     utc_offset = timedelta(seconds=utc_offset_sec)
 
     return utc_offset_str, utc_offset
 
+def get_local_time(jd_ut: float, timezone_loc: str):
+    """
+    Local (naive) datetime and UTC offset string of a Julian day (UT) in a timezone.
+    The local time is shifted by the offset string itself (whole minutes), so the two stay consistent.
+    """
+    from .timezones import UNIX_EPOCH_JD  # timezones imports this module
+
+    utc_time = datetime(1970, 1, 1) + timedelta(days=jd_ut - UNIX_EPOCH_JD)
+    tz = resolve_timezone(timezone_loc)
+    utc_offset_sec = pytz.utc.localize(utc_time).astimezone(tz).utcoffset().total_seconds()
+    utc_offset_str = format_utc_offset(utc_offset_sec)
+    local_time = utc_time + timedelta(hours=utc_offset_str_to_float(utc_offset_str))
+    return local_time, utc_offset_str
+
 def calculate_pada_from_zodiac(sidereal_degree: float) -> int:
     
     nakshatra_starts = [
@@ -0,0 +1,179 @@
+"""
+Vectorized divisional (varga) charts.
+
+Each varga splits every sign into parts and maps (sign, part) to a divisional sign, following the
+Parashara rules. The part edges and the (12, parts) sign tables are built once at import, so the 16
+shodasavarga placements of any number of longitudes are a `np.searchsorted` and a table lookup per
+varga; no ephemeris calls are needed. The divisional longitude is the divisional sign plus the
+position within the part scaled to 30°, and its nakshatra is looked up like for the rasi chart.
+"""
+
+import numpy as np
+import polars as pl
+from .kp_divisions import NAKSHATRA_SPAN, SIGN_LORD_CODES, VIMSHOTTARI_LORDS
+from .VedicAstro import RASHIS, NAKSHATRAS
+
+VARGA_NAMES = {
+    "D1": "Rasi",
+    "D2": "Hora",
+    "D3": "Drekkana",
+    "D4": "Chaturthamsa",
+    "D7": "Saptamsa",
+    "D9": "Navamsa",
+    "D10": "Dasamsa",
+    "D12": "Dwadasamsa",
+    "D16": "Shodasamsa",
+    "D20": "Vimsamsa",
+    "D24": "Chaturvimsamsa",
+    "D27": "Saptavimsamsa",
+    "D30": "Trimsamsa",
+    "D40": "Khavedamsa",
+    "D45": "Akshavedamsa",
+    "D60": "Shashtiamsa",
+}
+
+## Columns of the varga table; the shared names follow `PLANETS_TABLE_COLS`
+VARGA_TABLE_COLS = ["Object", "Varga", "Rasi", "LonDecDeg", "SignLonDecDeg", "Nakshatra", "RasiLord", "NakshatraLord"]
+
+## Trimsamsa parts (degrees within the sign) and their signs, for odd and even signs
+TRIMSAMSA_EDGES = ([0, 5, 10, 18, 25, 30], [0, 5, 12, 20, 25, 30])
+TRIMSAMSA_SIGNS = (["Aries", "Aquarius", "Sagittarius", "Gemini", "Libra"], ["Taurus", "Virgo", "Pisces", "Capricorn", "Scorpio"])
+
+
+def _first_sign(varga: str, sign: int):
+    """Sign of the first part of `sign` (0 = Aries) in the equal-part vargas"""
+    odd = sign % 2 == 0  # Aries, the first sign, is odd
+    modality = sign % 3  # 0 movable, 1 fixed, 2 dual
+    if varga in ("D1", "D3", "D4", "D12", "D60"):
+        return sign
+    if varga == "D7":
+        return sign if odd else sign + 6
+    if varga == "D9":
+        return sign * 9
+    if varga == "D10":
+        return sign if odd else sign + 8
+    if varga in ("D16", "D45"):
+        return [0, 4, 8][modality]
+    if varga == "D20":
+        return [0, 8, 4][modality]
+    if varga == "D24":
+        return 4 if odd else 3
+    if varga == "D27":
+        return sign * 27
+    if varga == "D40":
+        return 0 if odd else 6
+    raise ValueError(f"Unknown varga '{varga}'")
+
+
+## Steps (in signs) between consecutive parts, where they are not 1
+PART_STEPS = {"D3": 4, "D4": 3}
+
+
+def _build_varga_table(varga: str):
+    """Returns the part edges for odd / even signs, shaped (2, parts + 1), and the (12, parts) divisional sign table"""
+    if varga == "D2":
+        ## Hora: odd signs Sun (Leo) then Moon (Cancer), even signs the reverse
+        edges = np.array([[0.0, 15.0, 30.0]] * 2)
+        table = np.array([[4, 3] if sign % 2 == 0 else [3, 4] for sign in range(12)])
+        return edges, table
+    if varga == "D30":
+        edges = np.array(TRIMSAMSA_EDGES, dtype=np.float64)
+        odd, even = ([RASHIS.index(sign) for sign in signs] for signs in TRIMSAMSA_SIGNS)
+        table = np.array([odd if sign % 2 == 0 else even for sign in range(12)])
+        return edges, table
+    n_parts = int(varga[1:])
+    edges = np.array([np.linspace(0.0, 30.0, n_parts + 1)] * 2)
+    step = PART_STEPS.get(varga, 1)
+    table = np.array([[(_first_sign(varga, sign) + step * part) % 12 for part in range(n_parts)] for sign in range(12)])
+    return edges, table
+
+
+VARGA_TABLES = {varga: _build_varga_table(varga) for varga in VARGA_NAMES}
+
+
+def get_varga_codes(lons, varga: str):
+    """
+    Divisional sign and longitude of sidereal longitudes in one varga.
+
+    Parameters:
+    - lons: scalar or array of sidereal longitudes in degrees, of any shape
+    - varga: one of `VARGA_NAMES`, eg: "D9"
+
+    Returns:
+    - dict with "Rasi" (integer codes into `RASHIS`), "LonDecDeg" (divisional longitude), "Nakshatra" (codes into
+      `NAKSHATRAS`), "RasiLord" and "NakshatraLord" (codes into `VIMSHOTTARI_LORDS`), each shaped like `lons`
+    """
+    if varga not in VARGA_TABLES:
+        raise ValueError(f"Unknown varga '{varga}'. Choose one of {list(VARGA_NAMES)}")
+    edges, table = VARGA_TABLES[varga]
+    lons = np.asarray(lons, dtype=np.float64) % 360.0
+    sign = np.minimum((lons // 30.0).astype(np.int64), 11)
+    deg = lons - sign * 30.0
+    parity = sign % 2
+    n_parts = table.shape[1]
+    ## Part index within the sign, per odd / even edges
+    part = np.empty(lons.shape, dtype=np.int64)
+    for p in (0, 1):
+        mask = parity == p
+        part[mask] = np.clip(np.searchsorted(edges[p], deg[mask], side="right") - 1, 0, n_parts - 1)
+    part_lo, part_hi = edges[parity, part], edges[parity, part + 1]
+    varga_sign = table[sign, part]
+    varga_lon = varga_sign * 30.0 + (deg - part_lo) / (part_hi - part_lo) * 30.0
+    nakshatra = np.minimum((varga_lon // NAKSHATRA_SPAN).astype(np.int64), 26)
+    return {
+        "Rasi": varga_sign,
+        "LonDecDeg": varga_lon,
+        "Nakshatra": nakshatra,
+        "RasiLord": SIGN_LORD_CODES[varga_sign],
+        "NakshatraLord": nakshatra % 9,
+    }
+
+
+def compute_vargas(lons, objects: list, vargas: list = None):
+    """
+    Computes the divisional placements of one chart or a batch of charts.
+
+    Parameters:
+    - lons: sidereal longitudes, shaped (n_objects,) for one chart or (n_charts, n_objects) for a batch
+    - objects: names of the objects, one per column of `lons` (eg: "Asc", "Sun", ... or house names "I" - "XII")
+    - vargas: names from `VARGA_NAMES`, defaults to all 16 shodasavargas
+
+    Returns:
+    - polars DataFrame with `VARGA_TABLE_COLS` (plus "ChartIndex" first for a batch), one row per
+      (chart, varga, object), in the order of `vargas` then `objects`
+    """
+    vargas = vargas or list(VARGA_NAMES)
+    lons = np.asarray(lons, dtype=np.float64)
+    batch = lons.ndim == 2
+    lons = np.atleast_2d(lons)
+    n_charts, n_objects = lons.shape
+    if n_objects != len(objects):
+        raise ValueError(f"Got {len(objects)} object names for {n_objects} longitude columns")
+
+    codes = [get_varga_codes(lons, varga) for varga in vargas]
+    ## Stack as (chart, varga, object)
+    stack = lambda key: np.stack([c[key] for c in codes], axis=1).ravel()
+    rashis, nakshatras, lords = np.array(RASHIS), np.array(NAKSHATRAS), np.array(VIMSHOTTARI_LORDS)
+    varga_lon = stack("LonDecDeg")
+    data = {
+        "Object": np.tile(np.array(objects), n_charts * len(vargas)),
+        "Varga": np.tile(np.repeat(np.array(vargas), n_objects), n_charts),
+        "Rasi": rashis[stack("Rasi")],
+        "LonDecDeg": np.round(varga_lon, 3),
+        "SignLonDecDeg": np.round(varga_lon % 30.0, 3),
+        "Nakshatra": nakshatras[stack("Nakshatra")],
+        "RasiLord": lords[stack("RasiLord")],
+        "NakshatraLord": lords[stack("NakshatraLord")],
+    }
+    if batch:
+        data = {"ChartIndex": np.repeat(np.arange(n_charts), len(vargas) * n_objects), **data}
+    return pl.DataFrame(data)
+
+
+def get_varga_data(planets_data: list, houses_data: list = None, vargas: list = None):
+    """
+    Divisional placements of the objects (and optionally the house cusps) of one chart, from the tables
+    returned by `get_planets_data_from_chart` / `get_houses_data_from_chart`.
+    """
+    rows = list(planets_data) + list(houses_data or [])
+    return compute_vargas([row.LonDecDeg for row in rows], [row.Object for row in rows], vargas)